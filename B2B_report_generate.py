@@ -1,13 +1,20 @@
 import pandas as pd
+import numpy as np
 import datetime
 import os
 import re
+import json
+import hashlib
 import logging
 from pathlib import Path
 import folium
 from folium.plugins import MiniMap, Fullscreen, MeasureControl, HeatMap
 import branca.element
 import shutil # Added for file copying
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from functools import partial
+import threading
+from jinja2 import Environment, DictLoader, FileSystemBytecodeCache, Template
 
 # --- Configuration Constants ---
 # Define the base directory for your B2B project.
@@ -20,6 +27,13 @@ EXCEL_SHEET_NAME = 'Records'
 HTML_REPORT_DIR = BASE_DIR / 'ME' / 'To Do'
 GALLERY_DIR = BASE_DIR / 'Gallery'
 
+# Worker pool size for grouped report rendering (None or 1 = sequential)
+GROUPED_REPORT_MAX_WORKERS = min(8, os.cpu_count() or 1)
+# Evidence photos: accepted extensions, per-case index file and copy/hash threads
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+PHOTO_MANIFEST_NAME = 'manifest.json'
+PHOTO_INGEST_MAX_WORKERS = 8
+
 # Configure logging for better output management
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
@@ -48,6 +62,263 @@ MAP_POPUP_KEY_COLUMNS = [
     "DT_RANGE", "DT_DAYS", "DT_WEEKS", "REPORTED"
 ]
 
+# Labels, colors and filename/title patterns for the grouped HTML reports, keyed by grouping column
+GROUPED_REPORT_LAYOUTS = {
+    "TOWNSHIP": {
+        "label": "Township",
+        "color": "#1565c0",
+        "filename": "{group}_{status}_{from_str}_to_{to_str}.html",
+        "title": "B2B Accomplishment Report - {group} ({status})",
+    },
+    "PIC": {
+        "label": "PIC",
+        "color": "#6d4c41",
+        "filename": "PIC_{group}_Status_{status}_{from_str}_to_{to_str}.html",
+        "title": "B2B Accomplishment Report - PIC: {group} (Status: {status})",
+    },
+}
+
+# Heatmap pre-binning: at or above this many points the heatmap is aggregated server-side
+HEATMAP_BINNING_MIN_POINTS = 2000
+# (min zoom, max zoom) bands; each band gets its own grid, sized for the band's deepest zoom
+HEATMAP_ZOOM_BANDS = [(0, 8), (9, 11), (12, 14), (15, 18)]
+# Grid cell edge in screen pixels at that deepest zoom (well under the heatmap radius of 18px)
+HEATMAP_BIN_PIXELS = 8
+# A band is only binned if that leaves at most this fraction of the points
+HEATMAP_MIN_REDUCTION = 0.5
+
+# --- HTML Report Templates ---
+# Shared stylesheet/script are written once per output directory (see ensure_report_assets)
+# and linked from every generated report instead of being repeated in each file.
+REPORT_ASSET_DIR_NAME = 'assets'
+
+SINGLE_REPORT_CSS = """\
+body { font-family: 'Segoe UI', Arial, sans-serif; background: #f5f7fa; margin: 0; padding: 20px; }
+.header { background: #1976d2; color: #fff; padding: 18px 24px 10px 24px; border-radius: 10px 10px 0 0; font-size: 22px; font-weight: bold; box-shadow: 0 2px 8px #0002; margin-bottom: 0; letter-spacing: 1px; text-align: center; }
+.info-bar { background: #f5f7fa; color: #1976d2; padding: 10px 24px 14px 24px; border-radius: 0 0 10px 10px; font-size: 15px; margin-bottom: 18px; border-bottom: 2px solid #1976d2; box-shadow: 0 2px 8px #0001; text-align: center; }
+.section-title { color: #1976d2; font-weight: 700; font-size: 20px; margin: 28px 0 12px 0; letter-spacing: 1px; border-left: 6px solid #1976d2; padding-left: 10px; background: linear-gradient(90deg,#f5f7fa 60%,#e3eaf2 100%); border-radius: 6px; }
+.case-box { background: #f5f7fa; color: #222; margin: 14px 0; padding: 16px 24px; border-left: 6px solid #1976d2; border-radius: 8px; box-shadow: 0 2px 8px #0001; font-size: 15px; line-height: 1.7; }
+.case-box.other { border-left: 6px solid #90a4ae; background: linear-gradient(90deg,#f8f9fa 80%,#e3eaf2 100%); }
+.case-label { font-weight: bold; color: #1976d2; }
+.case-label.status { color: #d84315; } .case-label.township { color: #1565c0; } .case-label.pic { color: #6d4c41; } .case-label.complaint { color: #1976d2; }
+.case-label.range, .case-label.days, .case-label.weeks { color: #607d8b; }
+.case-label.follow { color: #ff9800; background: #ff9800; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}
+.case-label.remark { color: #607d8b; background: #607d8b; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}
+.case-title { font-size: 17px; color: #1976d2; font-weight: 700; margin-bottom: 4px; word-break: break-all; }
+.case-title.other { color: #607d8b; }
+.summary-box { margin: 18px 0 24px 0; padding: 18px 24px; background: linear-gradient(90deg,#e3eaf2 0,#f5f7fa 100%); border-radius: 12px; box-shadow: 0 2px 8px #0001; font-size: 15px; }
+.summary-label { color: #1976d2; font-size: 16px; font-weight: bold; }
+.summary-label.township { color: #607d8b; }
+.summary-count { color: #1976d2; font-weight: 600; }
+.summary-count.township { color: #607d8b; }
+.toggle-btn { margin-top: 8px; background: #e3eaf2; color: #1976d2; border: none; border-radius: 4px; padding: 4px 12px; cursor: pointer; font-size: 13px; }
+.recent-conv { display: none; margin-top: 8px; color: #607d8b; font-size: 13px; background: #e3eaf2; padding: 10px; border-radius: 4px; white-space: pre-wrap; word-break: break-all; }
+"""
+
+GROUPED_REPORT_CSS = """\
+body { font-family: 'Segoe UI', Arial, sans-serif; background: #f5f7fa; margin: 0; padding: 20px; }
+.header { background: #1976d2; color: #fff; padding: 18px 24px 10px 24px; border-radius: 10px; font-size: 24px; font-weight: bold; box-shadow: 0 4px 10px rgba(0,0,0,0.2); margin-bottom: 20px; text-align: center; letter-spacing: 1px; }
+.info-bar { background: #e3eaf2; color: #1976d2; padding: 15px 25px; border-radius: 8px; font-size: 16px; margin-bottom: 30px; border: 1px solid #c0d9ed; box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-align: center; }
+.group-section { margin-bottom: 40px; border: 1px solid #d0e0f0; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.1); background-color: #ffffff; }
+.group-header { background: linear-gradient(90deg, #1976d2 0%, #2196f3 100%); color: #fff; padding: 15px 25px; font-size: 20px; font-weight: bold; border-bottom: 2px solid #1565c0; display: flex; justify-content: space-between; align-items: center; }
+.group-header.status-group { background: linear-gradient(90deg, #d84315 0%, #ff5722 100%); border-bottom: 2px solid #bf360c; }
+.group-header span { flex-grow: 1; }
+.group-header .count { background-color: rgba(255,255,255,0.2); padding: 5px 10px; border-radius: 5px; font-size: 16px; }
+.case-box { background: #fdfdfd; color: #333; margin: 15px 25px; padding: 18px 25px; border-left: 6px solid #2196f3; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.08); font-size: 14px; line-height: 1.6; }
+.case-box.status-group { border-left: 6px solid #ff5722; }
+.case-title { font-size: 18px; color: #1976d2; font-weight: 700; margin-bottom: 8px; word-break: break-all; }
+.case-title.status-group { color: #d84315; }
+.case-label { font-weight: bold; color: #424242; margin-right: 5px; }
+.case-label.status { color: #d84315; } .case-label.township { color: #1565c0; } .case-label.pic { color: #6d4c41; } .case-label.time { color: #00796b; }
+.case-label.range, .case-label.days, .case-label.weeks { color: #607d8b; }
+.case-label.follow { color: #ff9800; background: #ff9800; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}
+.case-label.remark { color: #607d8b; background: #607d8b; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}
+.detail-row { margin-bottom: 5px; }
+.toggle-btn { margin-top: 10px; background: #e0e0e0; color: #333; border: none; border-radius: 5px; padding: 6px 15px; cursor: pointer; font-size: 13px; transition: background-color 0.3s ease; }
+.toggle-btn:hover { background-color: #d0d0d0; }
+.recent-conv { display: none; margin-top: 10px; color: #555; font-size: 13px; background: #f0f0f0; padding: 12px; border-radius: 5px; white-space: pre-wrap; word-break: break-all; border: 1px dashed #ccc; }
+"""
+
+REPORT_JS = """\
+function toggleConv(btn) {
+    var d = btn.nextElementSibling;
+    d.style.display = d.style.display === 'block' ? 'none' : 'block';
+}
+"""
+
+# Asset file name -> content
+REPORT_ASSETS = {
+    'b2b_single_report.css': SINGLE_REPORT_CSS,
+    'b2b_grouped_report.css': GROUPED_REPORT_CSS,
+    'b2b_report.js': REPORT_JS,
+}
+
+_NA_HTML = '<span style="color:#bbb;">N/A</span>'
+
+REPORT_TEMPLATES = {
+    # Shared case card macros; each card is one dict from iter_case_cards()
+    'cards.html': """\
+{% macro single_card(card, variant) %}
+            <div class='case-box{{ " " ~ variant if variant }}'>
+                <div class='case-title{{ " " ~ variant if variant }}'>{{ card.title }}</div>
+                <div>
+                    <span class='case-label status'>Status:</span> <b{{ " style='color:#607d8b'" if variant }}>{{ card.status }}</b> &nbsp;
+                    <span class='case-label township'>Township:</span> {{ card.township }} &nbsp;
+                    <span class='case-label pic'>PIC:</span> {{ card.pic }}
+                </div>
+                <div>
+                    <span class='case-label complaint'>Complaint Time:</span> {{ card.complaint_time }} &nbsp;
+                    <span class='case-label complaint'>Recovery Time:</span> {{ card.recovery_time }} &nbsp;
+                    <span class='case-label complaint'>Duration:</span> {{ card.duration }} &nbsp;
+                    <span class='case-label range'>DT_RANGE:</span> {{ card.dt_range }} &nbsp;
+                    <span class='case-label weeks'>DT_WEEKS:</span> {{ card.dt_weeks }}
+                </div>
+                <div>
+                    <span class='case-label'>Address:</span> {{ card.address }}
+                </div>
+                <div>
+                    <span class='case-label follow'>Follow Up:</span>
+                    <span style='color:#ff9800; font-weight:600;'>{{ card.follow_up }}</span>
+                </div>
+                <div>
+                    <span class='case-label remark'>Remark:</span>
+                    <span style='color:#607d8b; font-weight:600;'>{{ card.remark }}</span>
+                </div>
+{% if card.recent_conv %}
+                <button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{{ card.recent_conv }}</div>
+{% endif %}
+            </div>
+{% endmacro %}
+{% macro grouped_card(card) %}
+            <div class='case-box status-group'>
+                <div class='case-title status-group'>{{ card.title }}</div>
+                <div class='detail-row'>
+                    <span class='case-label'>Circuit ID:</span> {{ card.circuit_id }} &nbsp;
+                    <span class='case-label pic'>PIC:</span> {{ card.pic }}
+                </div>
+                <div class='detail-row'>
+                    <span class='case-label time'>Complaint Time:</span> {{ card.complaint_time }} &nbsp;
+                    <span class='case-label time'>Recovery Time:</span> {{ card.recovery_time }} &nbsp;
+                    <span class='case-label time'>Duration:</span> {{ card.duration }}
+                </div>
+                <div class='detail-row'>
+                    <span class='case-label range'>DT_RANGE:</span> {{ card.dt_range }} &nbsp;
+                    <span class='case-label days'>DT_DAYS:</span> {{ card.dt_days }} &nbsp;
+                    <span class='case-label weeks'>DT_WEEKS:</span> {{ card.dt_weeks }}
+                </div>
+                <div class='detail-row'>
+                    <span class='case-label'>Address:</span> {{ card.address }}
+                </div>
+                <div class='detail-row'>
+                    <span class='case-label follow'>Follow Up:</span>
+                    <span style='color:#ff9800; font-weight:600;'>{{ card.follow_up }}</span>
+                </div>
+                <div class='detail-row'>
+                    <span class='case-label remark'>Remark:</span>
+                    <span style='color:#607d8b; font-weight:600;'>{{ card.remark }}</span>
+                </div>
+{% if card.recent_conv %}
+                <button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{{ card.recent_conv }}</div>
+{% endif %}
+            </div>
+{% endmacro %}
+""",
+    'single_report.html': """\
+{% import 'cards.html' as cards %}
+<html>
+<head>
+    <meta charset='utf-8'>
+    <title>B2B ACCOMPLISHMENT REPORT</title>
+    <link rel='stylesheet' href='{{ asset_dir }}/b2b_single_report.css'>
+    <script src='{{ asset_dir }}/b2b_report.js'></script>
+</head>
+<body>
+    <div class='header'>B2B ACCOMPLISHMENT REPORT</div>
+    <div class='info-bar'>
+        <b>Date Range:</b> <span style='color:#1976d2;'>{{ from_dt }}</span> &rarr;
+        <span style='color:#1976d2;'>{{ to_dt }}</span><br>
+        <b>Reported:</b> <span style='color:#388e3c;'>{{ reported_val }}</span> &nbsp;
+        <b>Status:</b> <span style='color:#d84315;'>{{ status_val }}</span> &nbsp;
+        <b>Township:</b> <span style='color:#1565c0;'>{{ township_val }}</span> &nbsp;
+        <b>PIC:</b> <span style='color:#6d4c41;'>{{ pic_val }}</span> &nbsp;
+        <b>Circuit ID:</b> <span style='color:#8e24aa;'>{{ circuit_val }}</span><br>
+        <span style='color:#607d8b;'>{{ case_count }} case(s) in this report</span>
+    </div>
+{% if priority_cards is none %}
+    <div style='color:#888;font-size:16px;margin:18px 0;text-align:center;'>No priority (ME, Pending/Ongoing) cases in this date range.</div>
+{% else %}
+    <div class='section-title'>Priority List (REPORTED = ME, Status = Pending/Ongoing)</div>
+{% for card in priority_cards %}{{ cards.single_card(card, '') }}{% endfor %}
+{% endif %}
+{% if other_cards is none %}
+    <div style='color:#888;font-size:16px;margin:18px 0;text-align:center;'>No other cases in this date range.</div>
+{% else %}
+    <div class='summary-box'>
+        <div style='margin-bottom:6px;'>
+            <span class='summary-label'>Status Summary:</span>
+            <span style='margin-left:8px;'>
+                {%+ for k, v in status_counts %}{{ k }}: <span class='summary-count'>{{ v }}</span>{{ " | " if not loop.last }}{% endfor %}
+
+            </span>
+        </div>
+        <div>
+            <span class='summary-label township'>Township Summary:</span>
+            <span style='margin-left:8px;'>
+                {%+ for k, v in township_counts %}{{ k }}: <span class='summary-count township'>{{ v }}</span>{{ " | " if not loop.last }}{% endfor %}
+
+            </span>
+        </div>
+    </div>
+    <div class='section-title' style='color:#607d8b;border-left:6px solid #90a4ae;'>Other List (Handovered)</div>
+{% for card in other_cards %}{{ cards.single_card(card, 'other') }}{% endfor %}
+{% endif %}
+</body></html>
+""",
+    'grouped_report.html': """\
+{% import 'cards.html' as cards %}
+<html>
+<head>
+    <meta charset='utf-8'>
+    <title>{{ report_title }}</title>
+    <link rel='stylesheet' href='{{ asset_dir }}/b2b_grouped_report.css'>
+    <script src='{{ asset_dir }}/b2b_report.js'></script>
+</head>
+<body>
+    <div class='header'>{{ report_title }}</div>
+    <div class='info-bar'>
+        <b>Date Range:</b> <span style='color:#1976d2;'>{{ from_dt }}</span> &rarr;
+        <span style='color:#1976d2;'>{{ to_dt }}</span><br>
+        <b>{{ group_label }}:</b> <span style='color:{{ group_color }};'>{{ group_value }}</span> &nbsp;
+        <b>Status:</b> <span style='color:#d84315;'>{{ status_value }}</span> &nbsp;
+        <span style='color:#607d8b;'>{{ case_count }} case(s) in this report</span>
+    </div>
+    <div class='group-section'>
+        <div class='group-header'>
+            <span>{{ group_label }}: {{ group_value }}</span>
+            <span class='count'>{{ case_count }} Cases</span>
+        </div>
+        <div class='group-header status-group'>
+            <span>Status: {{ status_value }}</span>
+            <span class='count'>{{ case_count }} Cases</span>
+        </div>
+{% for card in cards_iter %}{{ cards.grouped_card(card) }}{% endfor %}
+    </div>
+</body></html>
+""",
+}
+
+# Templates are compiled once per process; the bytecode cache lets short CLI runs
+# and pool workers skip Jinja's parse/compile step as well.
+_TEMPLATE_ENV = Environment(
+    loader=DictLoader(REPORT_TEMPLATES),
+    bytecode_cache=FileSystemBytecodeCache(),
+    autoescape=False,  # Case fields are embedded as-is, as the original f-string reports did
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+_written_asset_dirs: set[Path] = set()
+_asset_lock = threading.Lock()
+
 # --- Helper Functions ---
 
 def normalize_header(text: str) -> str:
@@ -88,6 +359,98 @@ def fmt_dt(dt: any) -> str:
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     return str(dt)
 
+def ensure_report_assets(output_dir: Path) -> str:
+    """
+    Writes the shared report stylesheet/script once into output_dir/assets.
+
+    Args:
+        output_dir (Path): Directory the HTML reports are written to.
+
+    Returns:
+        str: The asset directory path relative to the reports, for use in <link>/<script> tags.
+    """
+    asset_dir = output_dir / REPORT_ASSET_DIR_NAME
+    with _asset_lock:
+        if asset_dir not in _written_asset_dirs:
+            asset_dir.mkdir(parents=True, exist_ok=True)
+            for filename, content in REPORT_ASSETS.items():
+                asset_path = asset_dir / filename
+                if not asset_path.exists() or asset_path.read_text(encoding="utf-8") != content:
+                    asset_path.write_text(content, encoding="utf-8")
+            _written_asset_dirs.add(asset_dir)
+    return REPORT_ASSET_DIR_NAME
+
+def _column_or_default(df: pd.DataFrame, col: str) -> pd.Series:
+    """Returns df[col], or an all-NA column when the sheet does not have it."""
+    if col in df.columns:
+        return df[col]
+    return pd.Series(None, index=df.index, dtype=object)
+
+def _display_datetime(series: pd.Series) -> list[str]:
+    """Vectorised fmt_dt(): formats a whole column, 'N/A' for missing values."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d %H:%M:%S").fillna("N/A").tolist()
+    return [fmt_dt(v) for v in series]
+
+def _display_value(series: pd.Series, missing: str = "", require_text: bool = False) -> list[str]:
+    """Stringifies a column, substituting `missing` for NA (and for blank strings if require_text)."""
+    present = series.notna()
+    text = series.astype(str)
+    if require_text:
+        present &= text.str.strip() != ""
+    return text.where(present, missing).tolist()
+
+def case_card_columns(df: pd.DataFrame) -> dict[str, list[str]]:
+    """
+    Pre-formats every field shown on a case card, one column at a time.
+
+    Args:
+        df (pd.DataFrame): Cases to render.
+
+    Returns:
+        dict[str, list[str]]: Display strings keyed by card field, each aligned with df's rows.
+    """
+    recent_conv = _column_or_default(df, "RECENT_CONVER")
+    return {
+        "title": _display_value(_column_or_default(df, "CASE TITLE")),
+        "circuit_id": _display_value(_column_or_default(df, "CIRCUIT ID")),
+        "status": _display_value(_column_or_default(df, "STATUS")),
+        "township": _display_value(_column_or_default(df, "TOWNSHIP")),
+        "pic": _display_value(_column_or_default(df, "PIC")),
+        "complaint_time": _display_datetime(_column_or_default(df, "COMPLAINT ISSUE TIME")),
+        "recovery_time": _display_datetime(_column_or_default(df, "RECOVERY TIME")),
+        "duration": _display_value(_column_or_default(df, "DURATION"), missing="N/A"),
+        "dt_range": _display_value(_column_or_default(df, "DT_RANGE")),
+        "dt_days": _display_value(_column_or_default(df, "DT_DAYS")),
+        "dt_weeks": _display_value(_column_or_default(df, "DT_WEEKS")),
+        "address": _display_value(_column_or_default(df, "ADDRESS"), missing=_NA_HTML, require_text=True),
+        "follow_up": _display_value(_column_or_default(df, "FOLLOW_UP_CONDITION"), missing=_NA_HTML, require_text=True),
+        "remark": _display_value(_column_or_default(df, "REMARK"), missing=_NA_HTML, require_text=True),
+        "recent_conv": [v.replace("\n", "<br>") for v in _display_value(recent_conv, require_text=True)],
+    }
+
+def iter_case_cards(columns: dict[str, list[str]]):
+    """Yields one card dict per row from the column arrays built by case_card_columns()."""
+    keys = tuple(columns)
+    for values in zip(*columns.values()):
+        yield dict(zip(keys, values))
+
+def _stream_template_to_file(template_name: str, html_path: Path, **context) -> bool:
+    """
+    Renders a report template straight into html_path, chunk by chunk.
+
+    Returns:
+        bool: True if the file was written, False on OSError (already logged).
+    """
+    template = _TEMPLATE_ENV.get_template(template_name)
+    try:
+        with open(html_path, "w", encoding="utf-8") as f:
+            template.stream(**context).dump(f)
+        return True
+    except OSError as e:
+        logging.error(f"Failed to export '{html_path.name}'. Error: {e}")
+        return False
+
 # --- Core Data Processing Functions ---
 
 def load_and_preprocess_data(file_path: Path, sheet_name: str) -> pd.DataFrame:
@@ -177,7 +540,198 @@ def load_and_preprocess_data(file_path: Path, sheet_name: str) -> pd.DataFrame:
     logging.info("Data preprocessing complete.")
     return df
 
-def generate_b2b_map(df: pd.DataFrame, user_status: str, reported_filter: str, output_dir: Path):
+def build_map_popups(df: pd.DataFrame) -> pd.Series:
+    """
+    Builds the popup body for every case column-wise (one vectorised pass per popup column).
+
+    Args:
+        df (pd.DataFrame): Cases to be placed on the map.
+
+    Returns:
+        pd.Series: Popup HTML ("<b>COL:</b> value<br>" per MAP_POPUP_KEY_COLUMNS entry), aligned with df.
+    """
+    popups = pd.Series("", index=df.index, dtype=object)
+    for col in MAP_POPUP_KEY_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+            if pd.api.types.is_datetime64_any_dtype(values):
+                values = values.dt.strftime("%Y-%m-%d %H:%M:%S")
+            values = values.astype(str).where(values.notna(), "")
+        else:
+            values = ""
+        popups = popups + f"<b>{col}:</b> " + values + "<br>"
+    return popups
+
+class _RawScriptElement(branca.element.Element):
+    """
+    Pre-rendered script text for the map figure.
+
+    branca wraps every rendered macro in Element(template=...), which re-parses the whole
+    script as a Jinja template; for large inline data arrays that parse dominates map
+    generation, so data is handed over through this element instead.
+    """
+    def __init__(self, script: str):
+        super().__init__()
+        self.script = script
+
+    def render(self, **kwargs) -> str:
+        return self.script
+
+class CaseMarkerLayer(folium.map.Layer):
+    """
+    One Leaflet feature group holding every case marker.
+
+    Markers, popups and tooltips are created in the browser from a single compact JSON
+    array of [lat, long, popup body, case title] rows, instead of one folium Marker,
+    Popup and Tooltip object (and one block of generated JavaScript) per case.
+    """
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                var data = {{ this.get_name() }}_data;
+                var group = L.featureGroup();
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i];
+                    L.marker([row[0], row[1]])
+                        .bindPopup(
+                            "<div style='font-size:15px; color:#222; background:#fff; padding:8px 12px;'>" + row[2] + "</div>",
+                            {maxWidth: 400}
+                        )
+                        .bindTooltip(
+                            "<span style='font-size:15px; color:#fff; background:#d9534f; padding:4px 8px; border-radius:5px;'>" + row[3] + "</span>",
+                            {sticky: true}
+                        )
+                        .addTo(group);
+                }
+                return group;
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, data: list, name: str = "Cases", overlay: bool = True, control: bool = True, show: bool = True):
+        super().__init__(name=name, overlay=overlay, control=control, show=show)
+        self._name = "CaseMarkerLayer"
+        self.data = data
+
+    def render(self, **kwargs):
+        # Only "</" needs escaping to keep the JSON from closing the <script> block early
+        data_json = json.dumps(self.data, ensure_ascii=False).replace("</", "<\\/")
+        data_script = f"var {self.get_name()}_data = {data_json};"
+        self.get_root().script.add_child(_RawScriptElement(data_script), name=self.get_name() + "_data")
+        super().render(**kwargs)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, **kwargs) -> "CaseMarkerLayer":
+        """Builds the layer rows from LAT/LONG, the vectorised popups and CASE TITLE."""
+        titles = _column_or_default(df, "CASE TITLE")
+        titles = titles.astype(str).where(titles.notna(), "")
+        data = list(zip(
+            df['LAT'].astype(float).tolist(),
+            df['LONG'].astype(float).tolist(),
+            build_map_popups(df).tolist(),
+            titles.tolist(),
+        ))
+        return cls(data, **kwargs)
+
+def bin_heatmap_points(lat: np.ndarray, lon: np.ndarray, cell_size_deg: float) -> list[list[float]]:
+    """
+    Aggregates points onto a regular lat/long grid.
+
+    Args:
+        lat (np.ndarray): Point latitudes.
+        lon (np.ndarray): Point longitudes.
+        cell_size_deg (float): Grid cell edge in degrees.
+
+    Returns:
+        list[list[float]]: One [lat, long, count] row per occupied cell, placed at the mean
+        position of the points that fell into it.
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    cells = np.stack([np.floor(lat / cell_size_deg), np.floor(lon / cell_size_deg)], axis=1).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    mean_lat = np.bincount(inverse, weights=lat) / counts
+    mean_lon = np.bincount(inverse, weights=lon) / counts
+    return np.column_stack([mean_lat, mean_lon, counts]).tolist()
+
+def heatmap_cell_size(zoom: int) -> float:
+    """Grid cell edge (degrees) that spans HEATMAP_BIN_PIXELS screen pixels at the given zoom."""
+    return 360.0 / (256 * 2 ** zoom) * HEATMAP_BIN_PIXELS
+
+class ZoomBandSwitcher(branca.element.MacroElement):
+    """Shows exactly one of several layers, chosen by the map's current zoom level."""
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            (function(){
+                var map = {{ this._parent.get_name() }};
+                var bands = [
+                {%- for min_zoom, max_zoom, layer in this.bands %}
+                    [{{ min_zoom }}, {{ max_zoom }}, {{ layer.get_name() }}],
+                {%- endfor %}
+                ];
+                function update() {
+                    var z = map.getZoom();
+                    bands.forEach(function(b) {
+                        var visible = z >= b[0] && z <= b[1];
+                        if (visible && !map.hasLayer(b[2])) { map.addLayer(b[2]); }
+                        if (!visible && map.hasLayer(b[2])) { map.removeLayer(b[2]); }
+                    });
+                }
+                map.on('zoomend', update);
+                update();
+            })();
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self, bands: list[tuple[int, int, folium.map.Layer]]):
+        super().__init__()
+        self._name = "ZoomBandSwitcher"
+        self.bands = bands
+
+def add_complaint_heatmap(m: folium.Map, lat: np.ndarray, lon: np.ndarray, binning: bool | None = None):
+    """
+    Adds the complaint density heatmap to the map.
+
+    Args:
+        m (folium.Map): Target map.
+        lat (np.ndarray): Complaint latitudes.
+        lon (np.ndarray): Complaint longitudes.
+        binning (bool | None, optional): Pre-aggregate points per zoom band (HEATMAP_ZOOM_BANDS).
+            None enables it automatically above HEATMAP_BINNING_MIN_POINTS points. Defaults to None.
+    """
+    heat_options = dict(radius=18, blur=12, min_opacity=0.3)
+    if binning is None:
+        binning = len(lat) >= HEATMAP_BINNING_MIN_POINTS
+
+    if not binning:
+        heat_data = np.column_stack([lat, lon]).tolist()
+        HeatMap(heat_data, **heat_options).add_to(m)
+        return
+
+    bands = []
+    for min_zoom, max_zoom in HEATMAP_ZOOM_BANDS:
+        # Counts are used as weights: Leaflet.heat sums them per screen cell, so the
+        # drawn density matches what the raw points would produce
+        heat_data = bin_heatmap_points(lat, lon, heatmap_cell_size(max_zoom))
+        if len(heat_data) > len(lat) * HEATMAP_MIN_REDUCTION:
+            # Finer grids will not shrink the data either: let the raw points cover every deeper zoom
+            heat_data = np.column_stack([lat, lon]).tolist()
+            max_zoom = HEATMAP_ZOOM_BANDS[-1][1]
+        layer = HeatMap(heat_data, show=False, control=False, **heat_options)
+        layer.add_to(m)
+        bands.append((min_zoom, max_zoom, layer))
+        logging.info(f"Heatmap zoom {min_zoom}-{max_zoom}: {len(lat)} points -> {len(heat_data)} bins")
+        if max_zoom == HEATMAP_ZOOM_BANDS[-1][1]:
+            break
+    ZoomBandSwitcher(bands).add_to(m)
+
+def generate_b2b_map(df: pd.DataFrame, user_status: str, reported_filter: str, output_dir: Path,
+                     heatmap_binning: bool | None = None):
     """
     Generates an interactive Folium map with case markers.
 
@@ -186,6 +740,8 @@ def generate_b2b_map(df: pd.DataFrame, user_status: str, reported_filter: str, o
         user_status (str): The status used for filtering (e.g., 'pending').
         reported_filter (str): The 'REPORTED' filter (e.g., 'ME', 'HANDOVER', 'ALL').
         output_dir (Path): Directory to save the HTML map.
+        heatmap_binning (bool | None, optional): Pre-bin the heatmap per zoom band. None decides
+            by point count (see add_complaint_heatmap). Defaults to None.
     """
     logging.info(f"Generating map for Status: '{user_status}', Reported: '{reported_filter}'...")
 
@@ -213,26 +769,8 @@ def generate_b2b_map(df: pd.DataFrame, user_status: str, reported_filter: str, o
         tiles='OpenStreetMap'
     )
 
-    # Add markers with detailed popups
-    for _, row in filtered_map_df.iterrows():
-        popup_html = "<div style='font-size:15px; color:#222; background:#fff; padding:8px 12px;'>"
-        for col in MAP_POPUP_KEY_COLUMNS:
-            val = row.get(col, "")
-            if pd.isna(val):
-                val = ""
-            elif isinstance(val, pd.Timestamp):
-                val = val.strftime("%Y-%m-%d %H:%M:%S")
-            popup_html += f"<b>{col}:</b> {val}<br>"
-        popup_html += "</div>"
-
-        folium.Marker(
-            location=[row['LAT'], row['LONG']],
-            popup=folium.Popup(popup_html, max_width=400),
-            tooltip=folium.Tooltip(
-                f"<span style='font-size:15px; color:#fff; background:#d9534f; padding:4px 8px; border-radius:5px;'>{row.get('CASE TITLE', '')}</span>",
-                sticky=True
-            )
-        ).add_to(m)
+    # Add all case markers as one data layer (popups are built column-wise)
+    CaseMarkerLayer.from_dataframe(filtered_map_df).add_to(m)
 
     # Add header and info box
     header_html = f"""
@@ -279,8 +817,8 @@ def generate_b2b_map(df: pd.DataFrame, user_status: str, reported_filter: str, o
 
     # Add a heatmap if enough points
     if len(filtered_map_df) > 1:
-        heat_data = filtered_map_df[['LAT', 'LONG']].dropna().values.tolist()
-        HeatMap(heat_data, radius=18, blur=12, min_opacity=0.3).add_to(m)
+        add_complaint_heatmap(m, filtered_map_df['LAT'].to_numpy(dtype=float),
+                              filtered_map_df['LONG'].to_numpy(dtype=float), binning=heatmap_binning)
 
     map_filename = output_dir / f"B2B_complaints_map_{user_status}_{reported_filter}.html"
     try:
@@ -318,308 +856,153 @@ def generate_single_html_report(df: pd.DataFrame, from_dt_val: datetime.datetime
 
     html_filename = output_dir / f"report_{from_str}_to_{to_str}_{status_val}.html"
 
-    html_content = f"""
-    <html>
-    <head>
-        <meta charset='utf-8'>
-        <title>B2B ACCOMPLISHMENT REPORT</title>
-        <style>
-            body {{ font-family: 'Segoe UI', Arial, sans-serif; background: #f5f7fa; margin: 0; padding: 20px; }}
-            .header {{ background: #1976d2; color: #fff; padding: 18px 24px 10px 24px; border-radius: 10px 10px 0 0; font-size: 22px; font-weight: bold; box-shadow: 0 2px 8px #0002; margin-bottom: 0; letter-spacing: 1px; text-align: center; }}
-            .info-bar {{ background: #f5f7fa; color: #1976d2; padding: 10px 24px 14px 24px; border-radius: 0 0 10px 10px; font-size: 15px; margin-bottom: 18px; border-bottom: 2px solid #1976d2; box-shadow: 0 2px 8px #0001; text-align: center; }}
-            .section-title {{ color: #1976d2; font-weight: 700; font-size: 20px; margin: 28px 0 12px 0; letter-spacing: 1px; border-left: 6px solid #1976d2; padding-left: 10px; background: linear-gradient(90deg,#f5f7fa 60%,#e3eaf2 100%); border-radius: 6px; }}
-            .case-box {{ background: #f5f7fa; color: #222; margin: 14px 0; padding: 16px 24px; border-left: 6px solid #1976d2; border-radius: 8px; box-shadow: 0 2px 8px #0001; font-size: 15px; line-height: 1.7; }}
-            .case-box.other {{ border-left: 6px solid #90a4ae; background: linear-gradient(90deg,#f8f9fa 80%,#e3eaf2 100%); }}
-            .case-label {{ font-weight: bold; color: #1976d2; }}
-            .case-label.status {{ color: #d84315; }} .case-label.township {{ color: #1565c0; }} .case-label.pic {{ color: #6d4c41; }} .case-label.complaint {{ color: #1976d2; }}
-            .case-label.range, .case-label.days, .case-label.weeks {{ color: #607d8b; }}
-            .case-label.follow {{ color: #ff9800; background: #ff9800; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-            .case-label.remark {{ color: #607d8b; background: #607d8b; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-            .case-title {{ font-size: 17px; color: #1976d2; font-weight: 700; margin-bottom: 4px; word-break: break-all; }}
-            .case-title.other {{ color: #607d8b; }}
-            .summary-box {{ margin: 18px 0 24px 0; padding: 18px 24px; background: linear-gradient(90deg,#e3eaf2 0,#f5f7fa 100%); border-radius: 12px; box-shadow: 0 2px 8px #0001; font-size: 15px; }}
-            .summary-label {{ color: #1976d2; font-size: 16px; font-weight: bold; }}
-            .summary-label.township {{ color: #607d8b; }}
-            .summary-count {{ color: #1976d2; font-weight: 600; }}
-            .summary-count.township {{ color: #607d8b; }}
-            .toggle-btn {{ margin-top: 8px; background: #e3eaf2; color: #1976d2; border: none; border-radius: 4px; padding: 4px 12px; cursor: pointer; font-size: 13px; }}
-            .recent-conv {{ display: none; margin-top: 8px; color: #607d8b; font-size: 13px; background: #e3eaf2; padding: 10px; border-radius: 4px; white-space: pre-wrap; word-break: break-all; }}
-        </style>
-        <script>
-            function toggleConv(btn) {{
-                var d = btn.nextElementSibling;
-                d.style.display = d.style.display === 'block' ? 'none' : 'block';
-            }}
-        </script>
-    </head>
-    <body>
-        <div class='header'>B2B ACCOMPLISHMENT REPORT</div>
-        <div class='info-bar'>
-            <b>Date Range:</b> <span style='color:#1976d2;'>{fmt_dt(from_dt_val)}</span> &rarr;
-            <span style='color:#1976d2;'>{fmt_dt(to_dt_val)}</span><br>
-            <b>Reported:</b> <span style='color:#388e3c;'>{reported_val}</span> &nbsp;
-            <b>Status:</b> <span style='color:#d84315;'>{status_val}</span> &nbsp;
-            <b>Township:</b> <span style='color:#1565c0;'>{township_val}</span> &nbsp;
-            <b>PIC:</b> <span style='color:#6d4c41;'>{pic_val}</span> &nbsp;
-            <b>Circuit ID:</b> <span style='color:#8e24aa;'>{circuit_val}</span><br>
-            <span style='color:#607d8b;'>{len(df)} case(s) in this report</span>
-        </div>
-    """
-
     priority_result = df[
         (df["REPORTED"].astype(str).str.upper() == "ME") &
         (df["STATUS"].astype(str).str.upper().isin(["PENDING", "ONGOING"]))
     ]
 
-    if priority_result.empty:
-        html_content += "<div style='color:#888;font-size:16px;margin:18px 0;text-align:center;'>No priority (ME, Pending/Ongoing) cases in this date range.</div>"
-    else:
-        html_content += "<div class='section-title'>Priority List (REPORTED = ME, Status = Pending/Ongoing)</div>"
-        for _, row in priority_result.iterrows():
-            html_content += f"""
-            <div class='case-box'>
-                <div class='case-title'>{row.get("CASE TITLE", "")}</div>
-                <div>
-                    <span class='case-label status'>Status:</span> <b>{row.get("STATUS", "")}</b> &nbsp;
-                    <span class='case-label township'>Township:</span> {row.get("TOWNSHIP", "")} &nbsp;
-                    <span class='case-label pic'>PIC:</span> {row.get("PIC", "")}
-                </div>
-                <div>
-                    <span class='case-label complaint'>Complaint Time:</span> {fmt_dt(row.get("COMPLAINT ISSUE TIME", ""))} &nbsp;
-                    <span class='case-label complaint'>Recovery Time:</span> {fmt_dt(row.get("RECOVERY TIME", ""))} &nbsp;
-                    <span class='case-label complaint'>Duration:</span> {row.get("DURATION", "N/A") if pd.notnull(row.get("DURATION")) else 'N/A'} &nbsp;
-                    <span class='case-label range'>DT_RANGE:</span> {row.get("DT_RANGE", "")} &nbsp;
-                    <span class='case-label weeks'>DT_WEEKS:</span> {row.get("DT_WEEKS", "")}
-                </div>
-                <div>
-                    <span class='case-label'>Address:</span> {row.get("ADDRESS", "") if pd.notnull(row.get("ADDRESS")) else '<span style="color:#bbb;">N/A</span>'}
-                </div>
-                <div>
-                    <span class='case-label follow'>Follow Up:</span>
-                    <span style='color:#ff9800; font-weight:600;'>{row.get("FOLLOW_UP_CONDITION", "") if pd.notnull(row.get("FOLLOW_UP_CONDITION")) and str(row.get("FOLLOW_UP_CONDITION")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                <div>
-                    <span class='case-label remark'>Remark:</span>
-                    <span style='color:#607d8b; font-weight:600;'>{row.get("REMARK", "") if pd.notnull(row.get("REMARK")) and str(row.get("REMARK")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                {f"<button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{str(row.get('RECENT_CONVER', '')).replace(chr(10), '<br>') if pd.notnull(row.get('RECENT_CONVER')) else ''}</div>" if pd.notnull(row.get('RECENT_CONVER')) and str(row.get('RECENT_CONVER')).strip() else ""}
-            </div>
-            """
-
     # Other List
     other_reported_mask = df["REPORTED"].astype(str).str.upper() != "ME" if reported_val.upper() == "ALL" else df["REPORTED"].astype(str) == reported_val
     other_status_mask = df["STATUS"].astype(str).str.upper() != "COMPLETED" if status_val.upper() == "ALL" else df["STATUS"].astype(str) == status_val
     other_result = df[other_reported_mask & other_status_mask]
 
-    if other_result.empty:
-        html_content += "<div style='color:#888;font-size:16px;margin:18px 0;text-align:center;'>No other cases in this date range.</div>"
-    else:
-        status_counts = other_result['STATUS'].value_counts().to_dict()
-        township_counts = other_result['TOWNSHIP'].value_counts().to_dict()
-        html_content += f"""
-        <div class='summary-box'>
-            <div style='margin-bottom:6px;'>
-                <span class='summary-label'>Status Summary:</span>
-                <span style='margin-left:8px;'>
-                    {" | ".join([f"{k}: <span class='summary-count'>{v}</span>" for k, v in status_counts.items()])}
-                </span>
-            </div>
-            <div>
-                <span class='summary-label township'>Township Summary:</span>
-                <span style='margin-left:8px;'>
-                    {" | ".join([f"{k}: <span class='summary-count township'>{v}</span>" for k, v in township_counts.items()])}
-                </span>
-            </div>
-        </div>
-        """
-        html_content += "<div class='section-title' style='color:#607d8b;border-left:6px solid #90a4ae;'>Other List (Handovered)</div>"
-        for _, row in other_result.iterrows():
-            html_content += f"""
-            <div class='case-box other'>
-                <div class='case-title other'>{row.get("CASE TITLE", "")}</div>
-                <div>
-                    <span class='case-label status'>Status:</span> <b style='color:#607d8b'>{row.get("STATUS", "")}</b> &nbsp;
-                    <span class='case-label township'>Township:</span> {row.get("TOWNSHIP", "")} &nbsp;
-                    <span class='case-label pic'>PIC:</span> {row.get("PIC", "")}
-                </div>
-                <div>
-                    <span class='case-label complaint'>Complaint Time:</span> {fmt_dt(row.get("COMPLAINT ISSUE TIME", ""))} &nbsp;
-                    <span class='case-label complaint'>Recovery Time:</span> {fmt_dt(row.get("RECOVERY TIME", ""))} &nbsp;
-                    <span class='case-label complaint'>Duration:</span> {row.get("DURATION", "N/A") if pd.notnull(row.get("DURATION")) else 'N/A'} &nbsp;
-                    <span class='case-label range'>DT_RANGE:</span> {row.get("DT_RANGE", "")} &nbsp;
-                    <span class='case-label weeks'>DT_WEEKS:</span> {row.get("DT_WEEKS", "")}
-                </div>
-                <div>
-                    <span class='case-label'>Address:</span> {row.get("ADDRESS", "") if pd.notnull(row.get("ADDRESS")) and str(row.get("ADDRESS")).strip() else '<span style="color:#bbb;">N/A</span>'}
-                </div>
-                <div>
-                    <span class='case-label follow'>Follow Up:</span>
-                    <span style='color:#ff9800; font-weight:600;'>{row.get("FOLLOW_UP_CONDITION", "") if pd.notnull(row.get("FOLLOW_UP_CONDITION")) and str(row.get("FOLLOW_UP_CONDITION")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                <div>
-                    <span class='case-label remark'>Remark:</span>
-                    <span style='color:#607d8b; font-weight:600;'>{row.get("REMARK", "") if pd.notnull(row.get("REMARK")) and str(row.get("REMARK")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                {f"<button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{str(row.get('RECENT_CONVER', '')).replace(chr(10), '<br>') if pd.notnull(row.get('RECENT_CONVER')) else ''}</div>" if pd.notnull(row.get('RECENT_CONVER')) and str(row.get('RECENT_CONVER')).strip() else ""}
-            </div>
-            """
-    html_content += "</body></html>"
-
-    try:
-        with open(html_filename, "w", encoding="utf-8") as f:
-            f.write(html_content)
-        # Corrected: Use html_filename instead of html_full_path
+    written = _stream_template_to_file(
+        'single_report.html', html_filename,
+        asset_dir=ensure_report_assets(output_dir),
+        from_dt=fmt_dt(from_dt_val), to_dt=fmt_dt(to_dt_val),
+        reported_val=reported_val, status_val=status_val, township_val=township_val,
+        pic_val=pic_val, circuit_val=circuit_val, case_count=len(df),
+        priority_cards=None if priority_result.empty else iter_case_cards(case_card_columns(priority_result)),
+        other_cards=None if other_result.empty else iter_case_cards(case_card_columns(other_result)),
+        status_counts=other_result['STATUS'].value_counts().items(),
+        township_counts=other_result['TOWNSHIP'].value_counts().items(),
+    )
+    if written:
         logging.info(f"B2B ACCOMPLISHMENT REPORT exported as HTML to '{html_filename.name}'")
-    except OSError as e:
-        logging.error(f"Failed to export HTML report. Error: {e}")
-        # Corrected: Use html_filename instead of html_full_path
+    else:
         logging.error(f"Filename attempted: '{html_filename}'")
 
-def generate_grouped_html_reports(df: pd.DataFrame, from_dt_val: datetime.datetime | None,
-                                 to_dt_val: datetime.datetime | None, output_dir: Path):
+def run_grouped_reports(df: pd.DataFrame, group_cols: list[str], renderer,
+                        max_workers: int | None = None, use_processes: bool = False) -> int:
     """
-    Generates separate HTML reports, grouped by Township and Status.
+    Splits the DataFrame with a single groupby pass and hands each group frame to a renderer.
 
     Args:
         df (pd.DataFrame): The filtered DataFrame.
+        group_cols (list[str]): Columns to group by (e.g., ['TOWNSHIP', 'STATUS']).
+        renderer (callable): Called as renderer(group_key, group_df) for every group.
+            Must be a module-level function (or functools.partial of one) when use_processes is True.
+        max_workers (int | None, optional): Pool size. None or 1 renders sequentially. Defaults to None.
+        use_processes (bool, optional): Use a process pool instead of a thread pool. Defaults to False.
+
+    Returns:
+        int: Number of groups handed to the renderer.
+    """
+    # sort=False keeps first-appearance order, the same order drop_duplicates() produced
+    grouped = df.groupby(group_cols, sort=False)
+
+    if not max_workers or max_workers <= 1:
+        for group_key, group_df in grouped:
+            renderer(group_key, group_df)
+        return grouped.ngroups
+
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_cls(max_workers=max_workers) as executor:
+        futures = [executor.submit(renderer, group_key, group_df) for group_key, group_df in grouped]
+        for future in as_completed(futures):
+            future.result()  # Re-raise anything the renderer did not handle
+    return len(futures)
+
+def _sanitize_for_filename(value: any) -> str:
+    """Replaces spaces and path separators so a group value can be used in a filename."""
+    return str(value).replace(' ', '_').replace('/', '_').replace('\\', '_')
+
+def _render_grouped_report(group_key: tuple, group_df: pd.DataFrame, group_col: str,
+                           from_dt_val: datetime.datetime | None,
+                           to_dt_val: datetime.datetime | None, output_dir: Path) -> Path | None:
+    """
+    Renders and writes the HTML report for one (group value, Status) combination.
+
+    Args:
+        group_key (tuple): The (group value, status) pair produced by groupby.
+        group_df (pd.DataFrame): Rows belonging to this group.
+        group_col (str): The grouping column, a key of GROUPED_REPORT_LAYOUTS.
         from_dt_val (datetime.datetime | None): Start date for filtering.
         to_dt_val (datetime.datetime | None): End date for filtering.
-        output_dir (Path): Directory to save the HTML reports.
+        output_dir (Path): Directory to save the HTML report.
+
+    Returns:
+        Path | None: The written report path, or None if writing failed.
     """
-    logging.info("Generating separate grouped reports (by Township and Status)...")
+    current_group, current_status = group_key
+    layout = GROUPED_REPORT_LAYOUTS[group_col]
 
     from_str = from_dt_val.strftime("%Y-%m-%d") if from_dt_val else "all"
     to_str = to_dt_val.strftime("%Y-%m-%d") if to_dt_val else "all"
 
+    report_filename = layout['filename'].format(
+        group=_sanitize_for_filename(current_group), status=_sanitize_for_filename(current_status),
+        from_str=from_str, to_str=to_str
+    )
+    html_full_path = output_dir / report_filename
+
+    written = _stream_template_to_file(
+        'grouped_report.html', html_full_path,
+        asset_dir=ensure_report_assets(output_dir),
+        report_title=layout['title'].format(group=current_group, status=current_status),
+        from_dt=fmt_dt(from_dt_val), to_dt=fmt_dt(to_dt_val),
+        group_label=layout['label'], group_color=layout['color'],
+        group_value=current_group, status_value=current_status,
+        case_count=len(group_df),
+        cards_iter=iter_case_cards(case_card_columns(group_df)),
+    )
+    if not written:
+        return None
+    logging.info(f"Generated report: '{html_full_path.name}'")
+    return html_full_path
+
+def _generate_grouped_reports(df: pd.DataFrame, group_col: str,
+                              from_dt_val: datetime.datetime | None,
+                              to_dt_val: datetime.datetime | None, output_dir: Path,
+                              max_workers: int | None, use_processes: bool):
+    """Shared body of the grouped report generators: one groupby pass over (group_col, STATUS)."""
+    group_label = GROUPED_REPORT_LAYOUTS[group_col]['label']
+    logging.info(f"Generating separate grouped reports (by {group_label} and Status)...")
+
     if df.empty:
         logging.warning("No data available to generate grouped reports.")
         return
 
-    unique_combinations = df[['TOWNSHIP', 'STATUS']].drop_duplicates()
+    renderer = partial(_render_grouped_report, group_col=group_col, from_dt_val=from_dt_val,
+                       to_dt_val=to_dt_val, output_dir=output_dir)
+    group_count = run_grouped_reports(df, [group_col, 'STATUS'], renderer,
+                                      max_workers=max_workers, use_processes=use_processes)
 
-    if unique_combinations.empty:
-        logging.warning("No unique Township-Status combinations found in the filtered data.")
+    if group_count == 0:
+        logging.warning(f"No unique {group_label}-Status combinations found in the filtered data.")
         return
+    logging.info("All grouped reports generated!")
 
-    for _, combo_row in unique_combinations.iterrows():
-        current_township = combo_row['TOWNSHIP']
-        current_status = combo_row['STATUS']
-
-        current_group_df = df[
-            (df['TOWNSHIP'] == current_township) &
-            (df['STATUS'] == current_status)
-        ].copy()
-
-        if current_group_df.empty:
-            continue
-
-        # Sanitize names for filename
-        township_for_filename = str(current_township).replace(' ', '_').replace('/', '_').replace('\\', '_')
-        status_for_filename = str(current_status).replace(' ', '_').replace('/', '_').replace('\\', '_')
-
-        report_filename = f"{township_for_filename}_{status_for_filename}_{from_str}_to_{to_str}.html"
-        html_full_path = output_dir / report_filename
-
-        html_content = f"""
-        <html>
-        <head>
-            <meta charset='utf-8'>
-            <title>B2B Accomplishment Report - {current_township} ({current_status})</title>
-            <style>
-                body {{ font-family: 'Segoe UI', Arial, sans-serif; background: #f5f7fa; margin: 0; padding: 20px; }}
-                .header {{ background: #1976d2; color: #fff; padding: 18px 24px 10px 24px; border-radius: 10px; font-size: 24px; font-weight: bold; box-shadow: 0 4px 10px rgba(0,0,0,0.2); margin-bottom: 20px; text-align: center; letter-spacing: 1px; }}
-                .info-bar {{ background: #e3eaf2; color: #1976d2; padding: 15px 25px; border-radius: 8px; font-size: 16px; margin-bottom: 30px; border: 1px solid #c0d9ed; box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-align: center; }}
-                .group-section {{ margin-bottom: 40px; border: 1px solid #d0e0f0; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.1); background-color: #ffffff; }}
-                .group-header {{ background: linear-gradient(90deg, #1976d2 0%, #2196f3 100%); color: #fff; padding: 15px 25px; font-size: 20px; font-weight: bold; border-bottom: 2px solid #1565c0; display: flex; justify-content: space-between; align-items: center; }}
-                .group-header.status-group {{ background: linear-gradient(90deg, #d84315 0%, #ff5722 100%); border-bottom: 2px solid #bf360c; }}
-                .group-header span {{ flex-grow: 1; }}
-                .group-header .count {{ background-color: rgba(255,255,255,0.2); padding: 5px 10px; border-radius: 5px; font-size: 16px; }}
-                .case-box {{ background: #fdfdfd; color: #333; margin: 15px 25px; padding: 18px 25px; border-left: 6px solid #2196f3; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.08); font-size: 14px; line-height: 1.6; }}
-                .case-box.status-group {{ border-left: 6px solid #ff5722; }}
-                .case-title {{ font-size: 18px; color: #1976d2; font-weight: 700; margin-bottom: 8px; word-break: break-all; }}
-                .case-title.status-group {{ color: #d84315; }}
-                .case-label {{ font-weight: bold; color: #424242; margin-right: 5px; }}
-                .case-label.status {{ color: #d84315; }} .case-label.township {{ color: #1565c0; }} .case-label.pic {{ color: #6d4c41; }} .case-label.time {{ color: #00796b; }}
-                .case-label.range, .case-label.days, .case-label.weeks {{ color: #607d8b; }}
-                .case-label.follow {{ color: #ff9800; background: #ff9800; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-                .case-label.remark {{ color: #607d8b; background: #607d8b; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-                .detail-row {{ margin-bottom: 5px; }}
-                .toggle-btn {{ margin-top: 10px; background: #e0e0e0; color: #333; border: none; border-radius: 5px; padding: 6px 15px; cursor: pointer; font-size: 13px; transition: background-color 0.3s ease; }}
-                .toggle-btn:hover {{ background-color: #d0d0d0; }}
-                .recent-conv {{ display: none; margin-top: 10px; color: #555; font-size: 13px; background: #f0f0f0; padding: 12px; border-radius: 5px; white-space: pre-wrap; word-break: break-all; border: 1px dashed #ccc; }}
-            </style>
-            <script>
-                function toggleConv(btn) {{
-                    var d = btn.nextElementSibling;
-                    d.style.display = d.style.display === 'block' ? 'none' : 'block';
-                }}
-            </script>
-        </head>
-        <body>
-            <div class='header'>B2B Accomplishment Report - {current_township} ({current_status})</div>
-            <div class='info-bar'>
-                <b>Date Range:</b> <span style='color:#1976d2;'>{fmt_dt(from_dt_val)}</span> &rarr;
-                <span style='color:#1976d2;'>{fmt_dt(to_dt_val)}</span><br>
-                <b>Township:</b> <span style='color:#1565c0;'>{current_township}</span> &nbsp;
-                <b>Status:</b> <span style='color:#d84315;'>{current_status}</span> &nbsp;
-                <span style='color:#607d8b;'>{len(current_group_df)} case(s) in this report</span>
-            </div>
-            <div class='group-section'>
-                <div class='group-header'>
-                    <span>Township: {current_township}</span>
-                    <span class='count'>{len(current_group_df)} Cases</span>
-                </div>
-                <div class='group-header status-group'>
-                    <span>Status: {current_status}</span>
-                    <span class='count'>{len(current_group_df)} Cases</span>
-                </div>
-        """
-
-        for _, row in current_group_df.iterrows():
-            html_content += f"""
-            <div class='case-box status-group'>
-                <div class='case-title status-group'>{row.get("CASE TITLE", "")}</div>
-                <div class='detail-row'>
-                    <span class='case-label'>Circuit ID:</span> {row.get("CIRCUIT ID", "")} &nbsp;
-                    <span class='case-label pic'>PIC:</span> {row.get("PIC", "")}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label time'>Complaint Time:</span> {fmt_dt(row.get("COMPLAINT ISSUE TIME", ""))} &nbsp;
-                    <span class='case-label time'>Recovery Time:</span> {fmt_dt(row.get("RECOVERY TIME", ""))} &nbsp;
-                    <span class='case-label time'>Duration:</span> {row.get("DURATION", "N/A") if pd.notnull(row.get("DURATION")) else 'N/A'}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label range'>DT_RANGE:</span> {row.get("DT_RANGE", "")} &nbsp;
-                    <span class='case-label days'>DT_DAYS:</span> {row.get("DT_DAYS", "")} &nbsp;
-                    <span class='case-label weeks'>DT_WEEKS:</span> {row.get("DT_WEEKS", "")}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label'>Address:</span> {row.get("ADDRESS", "") if pd.notnull(row.get("ADDRESS")) and str(row.get("ADDRESS")).strip() else '<span style="color:#bbb;">N/A</span>'}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label follow'>Follow Up:</span>
-                    <span style='color:#ff9800; font-weight:600;'>{row.get("FOLLOW_UP_CONDITION", "") if pd.notnull(row.get("FOLLOW_UP_CONDITION")) and str(row.get("FOLLOW_UP_CONDITION")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label remark'>Remark:</span>
-                    <span style='color:#607d8b; font-weight:600;'>{row.get("REMARK", "") if pd.notnull(row.get("REMARK")) and str(row.get("REMARK")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                {f"<button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{str(row.get('RECENT_CONVER', '')).replace(chr(10), '<br>') if pd.notnull(row.get('RECENT_CONVER')) else ''}</div>" if pd.notnull(row.get('RECENT_CONVER')) and str(row.get('RECENT_CONVER')).strip() else ""}
-            </div>
-            """
-        html_content += "</div>" # Close group-section div
-        html_content += "</body></html>"
+def generate_grouped_html_reports(df: pd.DataFrame, from_dt_val: datetime.datetime | None,
+                                 to_dt_val: datetime.datetime | None, output_dir: Path,
+                                 max_workers: int | None = None, use_processes: bool = False):
+    """
+    Generates separate HTML reports, grouped by Township and Status.
 
-        try:
-            with open(html_full_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-            logging.info(f"Generated report: '{html_full_path.name}'")
-        except OSError as e:
-            logging.error(f"Failed to export '{html_full_path.name}'. Error: {e}")
-    logging.info("All grouped reports generated!")
+    Args:
+        df (pd.DataFrame): The filtered DataFrame.
+        from_dt_val (datetime.datetime | None): Start date for filtering.
+        to_dt_val (datetime.datetime | None): End date for filtering.
+        output_dir (Path): Directory to save the HTML reports.
+        max_workers (int | None, optional): Render groups in a pool of this size. Defaults to None (sequential).
+        use_processes (bool, optional): Use a process pool instead of threads. Defaults to False.
+    """
+    _generate_grouped_reports(df, 'TOWNSHIP', from_dt_val, to_dt_val, output_dir,
+                              max_workers, use_processes)
 
 def generate_grouped_pic_status_reports(df: pd.DataFrame, from_dt_val: datetime.datetime | None,
-                                      to_dt_val: datetime.datetime | None, output_dir: Path):
+                                      to_dt_val: datetime.datetime | None, output_dir: Path,
+                                      max_workers: int | None = None, use_processes: bool = False):
     """
     Generates separate HTML reports, grouped by PIC and Status.
 
@@ -628,140 +1011,11 @@ def generate_grouped_pic_status_reports(df: pd.DataFrame, from_dt_val: datetime.
         from_dt_val (datetime.datetime | None): Start date for filtering.
         to_dt_val (datetime.datetime | None): End date for filtering.
         output_dir (Path): Directory to save the HTML reports.
+        max_workers (int | None, optional): Render groups in a pool of this size. Defaults to None (sequential).
+        use_processes (bool, optional): Use a process pool instead of threads. Defaults to False.
     """
-    logging.info("Generating separate grouped reports (by PIC and Status)...")
-
-    from_str = from_dt_val.strftime("%Y-%m-%d") if from_dt_val else "all"
-    to_str = to_dt_val.strftime("%Y-%m-%d") if to_dt_val else "all"
-
-    if df.empty:
-        logging.warning("No data available to generate grouped reports.")
-        return
-
-    # Group by PIC and Status
-    unique_combinations = df[['PIC', 'STATUS']].drop_duplicates()
-
-    if unique_combinations.empty:
-        logging.warning("No unique PIC-Status combinations found in the filtered data.")
-        return
-
-    for _, combo_row in unique_combinations.iterrows():
-        current_pic = combo_row['PIC']
-        current_status = combo_row['STATUS']
-
-        # Filter data for the current PIC and Status combination
-        current_group_df = df[
-            (df['PIC'] == current_pic) &
-            (df['STATUS'] == current_status)
-        ].copy()
-
-        if current_group_df.empty:
-            continue
-
-        # Sanitize names for filename
-        pic_for_filename = str(current_pic).replace(' ', '_').replace('/', '_').replace('\\', '_')
-        status_for_filename = str(current_status).replace(' ', '_').replace('/', '_').replace('\\', '_')
-
-        report_filename = f"PIC_{pic_for_filename}_Status_{status_for_filename}_{from_str}_to_{to_str}.html"
-        html_full_path = output_dir / report_filename
-
-        html_content = f"""
-        <html>
-        <head>
-            <meta charset='utf-8'>
-            <title>B2B Accomplishment Report - PIC: {current_pic} (Status: {current_status})</title>
-            <style>
-                body {{ font-family: 'Segoe UI', Arial, sans-serif; background: #f5f7fa; margin: 0; padding: 20px; }}
-                .header {{ background: #1976d2; color: #fff; padding: 18px 24px 10px 24px; border-radius: 10px; font-size: 24px; font-weight: bold; box-shadow: 0 4px 10px rgba(0,0,0,0.2); margin-bottom: 20px; text-align: center; letter-spacing: 1px; }}
-                .info-bar {{ background: #e3eaf2; color: #1976d2; padding: 15px 25px; border-radius: 8px; font-size: 16px; margin-bottom: 30px; border: 1px solid #c0d9ed; box-shadow: 0 2px 5px rgba(0,0,0,0.1); text-align: center; }}
-                .group-section {{ margin-bottom: 40px; border: 1px solid #d0e0f0; border-radius: 10px; overflow: hidden; box-shadow: 0 4px 12px rgba(0,0,0,0.1); background-color: #ffffff; }}
-                .group-header {{ background: linear-gradient(90deg, #1976d2 0%, #2196f3 100%); color: #fff; padding: 15px 25px; font-size: 20px; font-weight: bold; border-bottom: 2px solid #1565c0; display: flex; justify-content: space-between; align-items: center; }}
-                .group-header.status-group {{ background: linear-gradient(90deg, #d84315 0%, #ff5722 100%); border-bottom: 2px solid #bf360c; }}
-                .group-header span {{ flex-grow: 1; }}
-                .group-header .count {{ background-color: rgba(255,255,255,0.2); padding: 5px 10px; border-radius: 5px; font-size: 16px; }}
-                .case-box {{ background: #fdfdfd; color: #333; margin: 15px 25px; padding: 18px 25px; border-left: 6px solid #2196f3; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.08); font-size: 14px; line-height: 1.6; }}
-                .case-box.status-group {{ border-left: 6px solid #ff5722; }}
-                .case-title {{ font-size: 18px; color: #1976d2; font-weight: 700; margin-bottom: 8px; word-break: break-all; }}
-                .case-title.status-group {{ color: #d84315; }}
-                .case-label {{ font-weight: bold; color: #424242; margin-right: 5px; }}
-                .case-label.status {{ color: #d84315; }} .case-label.township {{ color: #1565c0; }} .case-label.pic {{ color: #6d4c41; }} .case-label.time {{ color: #00796b; }}
-                .case-label.range, .case-label.days, .case-label.weeks {{ color: #607d8b; }}
-                .case-label.follow {{ color: #ff9800; background: #ff9800; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-                .case-label.remark {{ color: #607d8b; background: #607d8b; color: #fff; padding: 2px 8px; border-radius: 4px; margin-right: 6px;}}
-                .detail-row {{ margin-bottom: 5px; }}
-                .toggle-btn {{ margin-top: 10px; background: #e0e0e0; color: #333; border: none; border-radius: 5px; padding: 6px 15px; cursor: pointer; font-size: 13px; transition: background-color 0.3s ease; }}
-                .toggle-btn:hover {{ background-color: #d0d0d0; }}
-                .recent-conv {{ display: none; margin-top: 10px; color: #555; font-size: 13px; background: #f0f0f0; padding: 12px; border-radius: 5px; white-space: pre-wrap; word-break: break-all; border: 1px dashed #ccc; }}
-            </style>
-            <script>
-                function toggleConv(btn) {{
-                    var d = btn.nextElementSibling;
-                    d.style.display = d.style.display === 'block' ? 'none' : 'block';
-                }}
-            </script>
-        </head>
-        <body>
-            <div class='header'>B2B Accomplishment Report - PIC: {current_pic} (Status: {current_status})</div>
-            <div class='info-bar'>
-                <b>Date Range:</b> <span style='color:#1976d2;'>{fmt_dt(from_dt_val)}</span> &rarr;
-                <span style='color:#1976d2;'>{fmt_dt(to_dt_val)}</span><br>
-                <b>PIC:</b> <span style='color:#6d4c41;'>{current_pic}</span> &nbsp;
-                <b>Status:</b> <span style='color:#d84315;'>{current_status}</span> &nbsp;
-                <span style='color:#607d8b;'>{len(current_group_df)} case(s) in this report</span>
-            </div>
-            <div class='group-section'>
-                <div class='group-header'>
-                    <span>PIC: {current_pic}</span>
-                    <span class='count'>{len(current_group_df)} Cases</span>
-                </div>
-                <div class='group-header status-group'>
-                    <span>Status: {current_status}</span>
-                    <span class='count'>{len(current_group_df)} Cases</span>
-                </div>
-        """
-
-        for _, row in current_group_df.iterrows():
-            html_content += f"""
-            <div class='case-box status-group'>
-                <div class='case-title status-group'>{row.get("CASE TITLE", "")}</div>
-                <div class='detail-row'>
-                    <span class='case-label'>Circuit ID:</span> {row.get("CIRCUIT ID", "")} &nbsp;
-                    <span class='case-label pic'>PIC:</span> {row.get("PIC", "")}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label time'>Complaint Time:</span> {fmt_dt(row.get("COMPLAINT ISSUE TIME", ""))} &nbsp;
-                    <span class='case-label time'>Recovery Time:</span> {fmt_dt(row.get("RECOVERY TIME", ""))} &nbsp;
-                    <span class='case-label time'>Duration:</span> {row.get("DURATION", "N/A") if pd.notnull(row.get("DURATION")) else 'N/A'}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label range'>DT_RANGE:</span> {row.get("DT_RANGE", "")} &nbsp;
-                    <span class='case-label days'>DT_DAYS:</span> {row.get("DT_DAYS", "")} &nbsp;
-                    <span class='case-label weeks'>DT_WEEKS:</span> {row.get("DT_WEEKS", "")}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label'>Address:</span> {row.get("ADDRESS", "") if pd.notnull(row.get("ADDRESS")) and str(row.get("ADDRESS")).strip() else '<span style="color:#bbb;">N/A</span>'}
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label follow'>Follow Up:</span>
-                    <span style='color:#ff9800; font-weight:600;'>{row.get("FOLLOW_UP_CONDITION", "") if pd.notnull(row.get("FOLLOW_UP_CONDITION")) and str(row.get("FOLLOW_UP_CONDITION")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                <div class='detail-row'>
-                    <span class='case-label remark'>Remark:</span>
-                    <span style='color:#607d8b; font-weight:600;'>{row.get("REMARK", "") if pd.notnull(row.get("REMARK")) and str(row.get("REMARK")).strip() else '<span style="color:#bbb;">N/A</span>'}</span>
-                </div>
-                {f"<button class='toggle-btn' onclick='toggleConv(this)'>Show/Hide Recent Conversation</button><div class='recent-conv'>{str(row.get('RECENT_CONVER', '')).replace(chr(10), '<br>') if pd.notnull(row.get('RECENT_CONVER')) else ''}</div>" if pd.notnull(row.get('RECENT_CONVER')) and str(row.get('RECENT_CONVER')).strip() else ""}
-            </div>
-            """
-        html_content += "</div>" # Close group-section div
-        html_content += "</body></html>"
-
-        try:
-            with open(html_full_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-            logging.info(f"Generated report: '{html_full_path.name}'")
-        except OSError as e:
-            logging.error(f"Failed to export '{html_full_path.name}'. Error: {e}")
-    logging.info("All grouped reports generated!")
+    _generate_grouped_reports(df, 'PIC', from_dt_val, to_dt_val, output_dir,
+                              max_workers, use_processes)
 
 def get_user_input(prompt: str, options: list[str] | None = None, is_date: bool = False, allow_empty: bool = True) -> any:
     """
@@ -840,6 +1094,225 @@ def print_management_report(filtered_df: pd.DataFrame):
                 logging.info(f"{label}: {value}")
     logging.info("------------------------------\n")
 
+# --- Evidence Photo Ingestion ---
+
+def case_photo_folders(df: pd.DataFrame) -> pd.Series:
+    """
+    Builds the gallery folder name (<CASE_TITLE>_<complaint time>) for every case, column-wise.
+
+    Args:
+        df (pd.DataFrame): Cases.
+
+    Returns:
+        pd.Series: Folder names aligned with df's index.
+    """
+    titles = df["CASE TITLE"].astype(str) if "CASE TITLE" in df.columns else pd.Series("Unknown", index=df.index)
+    titles = titles.str.strip().str.replace(r"[ /\\]", "_", regex=True)
+    times = _column_or_default(df, "COMPLAINT ISSUE TIME")
+    if pd.api.types.is_datetime64_any_dtype(times):
+        folder_times = times.dt.strftime("%Y-%m-%d_%H-%M-%S").fillna("unknown_time")
+    else:
+        folder_times = pd.Series(
+            [t.strftime("%Y-%m-%d_%H-%M-%S") if isinstance(t, pd.Timestamp) else "unknown_time" for t in times],
+            index=df.index)
+    return titles + "_" + folder_times
+
+def _case_title_keys(df: pd.DataFrame) -> pd.Series:
+    """CASE TITLE as photos are matched against it: stringified and stripped."""
+    if "CASE TITLE" not in df.columns:
+        return pd.Series("", index=df.index)
+    return df["CASE TITLE"].astype(str).str.strip()
+
+def _file_sha256(path: Path) -> str:
+    """Hashes a file's contents in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _hash_files(paths: list[Path], max_workers: int) -> dict[Path, str]:
+    """Hashes files concurrently; unreadable files are logged and left out."""
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_file_sha256, p): p for p in paths}
+        for future in as_completed(futures):
+            try:
+                hashes[futures[future]] = future.result()
+            except OSError as e:
+                logging.error(f"Could not read photo '{futures[future]}'. Error: {e}")
+    return hashes
+
+def load_photo_manifest(case_folder: Path, max_workers: int = PHOTO_INGEST_MAX_WORKERS) -> dict:
+    """
+    Loads a case folder's photo manifest, indexing any photos that were copied in without one.
+
+    Args:
+        case_folder (Path): Gallery folder of one case.
+        max_workers (int, optional): Threads used to hash unindexed photos.
+
+    Returns:
+        dict: {sha256: {"file": name, "source": original path, "added": timestamp}}.
+    """
+    manifest_path = case_folder / PHOTO_MANIFEST_NAME
+    manifest = {}
+    if manifest_path.is_file():
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable photo manifest '{manifest_path}'. Error: {e}")
+            manifest = {}
+
+    if case_folder.is_dir():
+        indexed = {entry["file"] for entry in manifest.values()}
+        unindexed = [p for p in case_folder.iterdir()
+                     if p.is_file() and p.name != PHOTO_MANIFEST_NAME and p.name not in indexed]
+        for path, digest in _hash_files(unindexed, max_workers).items():
+            manifest.setdefault(digest, {"file": path.name, "source": None, "added": None})
+    return manifest
+
+def _write_photo_manifest(case_folder: Path, manifest: dict):
+    """Writes the manifest atomically so an interrupted run never leaves it half-written."""
+    manifest_path = case_folder / PHOTO_MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp_path, manifest_path)
+
+def _unique_photo_name(filename: str, taken: set[str]) -> str:
+    """Returns filename, or filename_<n> for the first free n, and reserves it in `taken`."""
+    candidate = filename
+    stem, suffix = os.path.splitext(filename)
+    counter = 1
+    while candidate.lower() in taken:
+        candidate = f"{stem}_{counter}{suffix}"
+        counter += 1
+    taken.add(candidate.lower())
+    return candidate
+
+def collect_photo_sources(source: Path) -> list[tuple[str, Path]]:
+    """
+    Lists (CASE TITLE, photo path) pairs from a photo folder or a manifest CSV.
+
+    A folder is expected to hold one sub-folder per case, named by CASE TITLE (spaces and
+    slashes may be written as '_'). A CSV needs 'CASE TITLE' and 'PHOTO PATH' columns;
+    relative photo paths are resolved against the CSV's folder.
+
+    Args:
+        source (Path): Folder or .csv manifest.
+
+    Returns:
+        list[tuple[str, Path]]: Photos to ingest.
+    """
+    if source.is_dir():
+        return [(case_dir.name, photo)
+                for case_dir in sorted(p for p in source.iterdir() if p.is_dir())
+                for photo in sorted(case_dir.iterdir())
+                if photo.is_file() and photo.suffix.lower() in PHOTO_EXTENSIONS]
+
+    if source.is_file() and source.suffix.lower() == ".csv":
+        manifest_df = pd.read_csv(source, dtype=str)
+        manifest_df.columns = manifest_df.columns.str.strip().str.upper()
+        if not {"CASE TITLE", "PHOTO PATH"}.issubset(manifest_df.columns):
+            logging.error(f"Photo manifest '{source}' needs 'CASE TITLE' and 'PHOTO PATH' columns.")
+            return []
+        manifest_df = manifest_df.dropna(subset=["CASE TITLE", "PHOTO PATH"])
+        return [(title, path if path.is_absolute() else source.parent / path)
+                for title, path in zip(manifest_df["CASE TITLE"].str.strip(),
+                                       manifest_df["PHOTO PATH"].str.strip().map(Path))]
+
+    logging.error(f"Photo source '{source}' is neither a folder nor a .csv manifest.")
+    return []
+
+def ingest_case_photos(df: pd.DataFrame, sources: list[tuple[str, Path]], gallery_dir: Path,
+                       max_workers: int = PHOTO_INGEST_MAX_WORKERS) -> dict[str, int]:
+    """
+    Copies photos into their cases' gallery folders, skipping content that is already there.
+
+    Photos are matched to cases by CASE TITLE, hashed (SHA-256) and compared against each case
+    folder's manifest.json, so re-running the same import copies nothing. New photos are copied
+    concurrently and recorded in the manifest.
+
+    Args:
+        df (pd.DataFrame): Cases the photos may belong to.
+        sources (list[tuple[str, Path]]): (CASE TITLE, photo path) pairs, e.g. from collect_photo_sources().
+        gallery_dir (Path): Base directory for case photo folders.
+        max_workers (int, optional): Threads used for hashing and copying.
+
+    Returns:
+        dict[str, int]: Counts of 'copied', 'duplicate', 'unmatched', 'missing' and 'failed' photos.
+    """
+    stats = {"copied": 0, "duplicate": 0, "unmatched": 0, "missing": 0, "failed": 0}
+
+    # Title -> folder lookup; the first row wins for repeated titles, as in the case listing
+    folders = case_photo_folders(df)
+    titles = _case_title_keys(df)
+    folder_by_title = {}
+    for title, folder in zip(titles, folders):
+        folder_by_title.setdefault(title, folder)
+        folder_by_title.setdefault(re.sub(r"[ /\\]", "_", title), folder)
+
+    by_folder: dict[str, list[Path]] = {}
+    for title, photo in sources:
+        folder = folder_by_title.get(str(title).strip())
+        if folder is None:
+            logging.warning(f"No case titled '{title}' for photo '{photo}'; skipped.")
+            stats["unmatched"] += 1
+        elif not photo.is_file():
+            logging.warning(f"Photo file not found at '{photo}'; skipped.")
+            stats["missing"] += 1
+        else:
+            by_folder.setdefault(folder, []).append(photo)
+
+    hashes = _hash_files([p for photos in by_folder.values() for p in photos], max_workers)
+    stats["failed"] += sum(len(photos) for photos in by_folder.values()) - len(hashes)
+
+    # Plan every copy up front: names are resolved against an in-memory set of taken names
+    manifests = {}
+    copy_jobs = []
+    for folder, photos in by_folder.items():
+        case_folder = gallery_dir / folder
+        manifest = load_photo_manifest(case_folder, max_workers)
+        taken = {p.name.lower() for p in case_folder.iterdir()} if case_folder.is_dir() else set()
+        for photo in photos:
+            digest = hashes.get(photo)
+            if digest is None:
+                continue
+            if digest in manifest:
+                stats["duplicate"] += 1
+                continue
+            name = _unique_photo_name(photo.name, taken)
+            manifest[digest] = {"file": name, "source": str(photo), "added": None}
+            copy_jobs.append((case_folder, photo, name, digest))
+        manifests[case_folder] = manifest
+
+    def _copy(job):
+        case_folder, photo, name, _ = job
+        case_folder.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(photo, case_folder / name)
+
+    added = datetime.datetime.now().isoformat(timespec="seconds")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(_copy, job): job for job in copy_jobs}
+        for future in as_completed(futures):
+            case_folder, photo, name, digest = futures[future]
+            try:
+                future.result()
+                manifests[case_folder][digest]["added"] = added
+                stats["copied"] += 1
+            except OSError as e:
+                logging.error(f"Failed to copy photo '{photo}'. Error: {e}")
+                del manifests[case_folder][digest]
+                stats["failed"] += 1
+
+    for case_folder, manifest in manifests.items():
+        if manifest:
+            case_folder.mkdir(parents=True, exist_ok=True)
+            _write_photo_manifest(case_folder, manifest)
+
+    logging.info(f"Photo ingestion: {stats['copied']} copied, {stats['duplicate']} duplicate(s) skipped, "
+                 f"{stats['unmatched']} unmatched, {stats['missing']} missing, {stats['failed']} failed.")
+    return stats
+
 def handle_photo_upload(filtered_df: pd.DataFrame, gallery_dir: Path):
     """
     Handles the command-line photo upload process.
@@ -855,25 +1328,21 @@ def handle_photo_upload(filtered_df: pd.DataFrame, gallery_dir: Path):
 
     # List cases for user selection
     logging.info("Available cases for photo upload:")
-    case_options = []
-    for i, (_, row) in enumerate(filtered_df.iterrows()):
-        case_title = str(row.get("CASE TITLE", "Unknown Case"))
-        complaint_time = row.get("COMPLAINT ISSUE TIME", "")
-        time_str = fmt_dt(complaint_time)
-        display_str = f"{i+1}. {case_title} | {time_str}"
-        case_options.append(display_str)
-        logging.info(display_str)
+    case_titles = _column_or_default(filtered_df, "CASE TITLE").fillna("Unknown Case").astype(str).tolist()
+    case_times = _display_datetime(_column_or_default(filtered_df, "COMPLAINT ISSUE TIME"))
+    logging.info("\n".join(f"{i}. {title} | {time_str}"
+                           for i, (title, time_str) in enumerate(zip(case_titles, case_times), start=1)))
 
     try:
         case_choice = int(input("Enter the number of the case to upload a photo for: ").strip())
-        if not (1 <= case_choice <= len(case_options)):
+        if not (1 <= case_choice <= len(case_titles)):
             logging.error("Invalid case number selected.")
             return
     except ValueError:
         logging.error("Invalid input. Please enter a number.")
         return
 
-    selected_row = filtered_df.iloc[case_choice - 1]
+    selected_case = filtered_df.iloc[[case_choice - 1]]
 
     # Get source photo file path from user
     photo_path_str = get_user_input("Enter the full path to the photo file (e.g., C:/Users/YourUser/image.jpg): ", allow_empty=False)
@@ -882,39 +1351,31 @@ def handle_photo_upload(filtered_df: pd.DataFrame, gallery_dir: Path):
     if not source_photo_path.is_file():
         logging.error(f"Error: Photo file not found at '{source_photo_path}'.")
         return
-    if source_photo_path.suffix.lower() not in ['.jpg', '.jpeg', '.png']:
+    if source_photo_path.suffix.lower() not in PHOTO_EXTENSIONS:
         logging.warning("Warning: Only .jpg, .jpeg, .png files are typically supported for evidence photos.")
 
-    # Determine destination folder
-    case_title_clean = str(selected_row.get("CASE TITLE", "Unknown")).strip().replace(" ", "_").replace("/", "_").replace("\\", "_")
-    complaint_time_val = selected_row.get("COMPLAINT ISSUE TIME", None)
+    stats = ingest_case_photos(selected_case, [(_case_title_keys(selected_case).iloc[0], source_photo_path)], gallery_dir)
+    if stats["copied"]:
+        logging.info(f"Successfully uploaded '{source_photo_path.name}' to '{gallery_dir / case_photo_folders(selected_case).iloc[0]}'")
+    elif stats["duplicate"]:
+        logging.info(f"'{source_photo_path.name}' is already attached to this case; nothing copied.")
 
-    if isinstance(complaint_time_val, pd.Timestamp):
-        folder_time = complaint_time_val.strftime("%Y-%m-%d_%H-%M-%S")
-    else:
-        folder_time = "unknown_time"
-
-    target_folder_name = f"{case_title_clean}_{folder_time}"
-    destination_folder_path = gallery_dir / target_folder_name
-    destination_folder_path.mkdir(parents=True, exist_ok=True)
-
-    # Copy the file, handling duplicates
-    original_filename = source_photo_path.name
-    destination_file_path = destination_folder_path / original_filename
-    
-    counter = 1
-    while destination_file_path.exists():
-        base_name = source_photo_path.stem
-        extension = source_photo_path.suffix
-        new_filename = f"{base_name}_{counter}{extension}"
-        destination_file_path = destination_folder_path / new_filename
-        counter += 1
+def handle_bulk_photo_import(df: pd.DataFrame, gallery_dir: Path):
+    """
+    Handles the command-line bulk photo import from a folder or manifest CSV.
 
-    try:
-        shutil.copy2(source_photo_path, destination_file_path)
-        logging.info(f"Successfully uploaded '{original_filename}' to '{destination_file_path}'")
-    except Exception as e:
-        logging.error(f"Failed to copy photo '{original_filename}'. Error: {e}")
+    Args:
+        df (pd.DataFrame): Cases the photos may be attached to.
+        gallery_dir (Path): The base directory for storing uploaded photos.
+    """
+    logging.info("\n--- Bulk Photo Import ---")
+    source_str = get_user_input("Enter a photo folder (one sub-folder per CASE TITLE) or a manifest CSV "
+                                "(CASE TITLE, PHOTO PATH): ", allow_empty=False)
+    sources = collect_photo_sources(Path(source_str.strip('"')))
+    if not sources:
+        logging.warning("No photos found to import.")
+        return
+    ingest_case_photos(df, sources, gallery_dir)
 
 
 def main():
@@ -980,17 +1441,20 @@ def main():
                        "3. Generate Grouped HTML Reports (by PIC & Status)\n" # New option
                        "4. Generate B2B Map\n"
                        "5. Upload Photo for a Case\n"
-                       "6. Exit\n" # Updated exit option
-                       "Enter choice (1/2/3/4/5/6): ").strip() # Updated prompt
+                       "6. Bulk Import Photos (folder or manifest CSV)\n"
+                       "7. Exit\n" # Updated exit option
+                       "Enter choice (1/2/3/4/5/6/7): ").strip() # Updated prompt
 
         if action == '1':
             generate_single_html_report(filtered_df, from_dt_val, to_dt_val,
                                         reported_val, status_val, township_val,
                                         pic_val, circuit_val, HTML_REPORT_DIR)
         elif action == '2':
-            generate_grouped_html_reports(filtered_df, from_dt_val, to_dt_val, HTML_REPORT_DIR)
+            generate_grouped_html_reports(filtered_df, from_dt_val, to_dt_val, HTML_REPORT_DIR,
+                                          max_workers=GROUPED_REPORT_MAX_WORKERS)
         elif action == '3': # New action
-            generate_grouped_pic_status_reports(filtered_df, from_dt_val, to_dt_val, HTML_REPORT_DIR)
+            generate_grouped_pic_status_reports(filtered_df, from_dt_val, to_dt_val, HTML_REPORT_DIR,
+                                                max_workers=GROUPED_REPORT_MAX_WORKERS)
         elif action == '4':
             # For map, need specific status and reported filter from user
             map_status = get_user_input("Enter Status for Map (e.g., pending, ongoing, completed): ", ['pending', 'ongoing', 'completed'])
@@ -998,11 +1462,13 @@ def main():
             generate_b2b_map(df, map_status, map_reported, HTML_REPORT_DIR) # Pass original df for map filtering
         elif action == '5':
             handle_photo_upload(filtered_df, GALLERY_DIR)
-        elif action == '6': # Updated exit option
+        elif action == '6':
+            handle_bulk_photo_import(df, GALLERY_DIR) # Match photos against every case, not just the filter
+        elif action == '7': # Updated exit option
             logging.info("Exiting B2B Report Generator. Goodbye!")
             break
         else:
-            logging.warning("Invalid choice. Please enter 1, 2, 3, 4, 5, or 6.") # Updated warning
+            logging.warning("Invalid choice. Please enter 1, 2, 3, 4, 5, 6, or 7.") # Updated warning
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,43 @@
 import openpyxl
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 
+from incident_template import THIN_BORDER, write_report_sheet
+
+# Example values shown on the blank template, keyed like the incident form fields
+TEMPLATE_SAMPLE_DETAILS = {
+    'customerName': "FTTH pole & Cable damages in Swebo",
+    'circuitID': "Referred to mail",
+    'customerAddress': "N/A",
+    'workOrderEmailTitle': "FTTH pole & Cable damages in Swebo",
+    'woStartTime': "2024-06-14 09:32:00",
+    'woActionByLSP': "Mail/SMS Received",
+    'arrivedStartTime': "2024-06-15 10:30:00",
+    'arrivedEndTime': "2025-02-01 10:12:00",
+    'arrivedActionByLSP': "Arrive fault location",
+    'rootCause1StartTime': "2024-06-15 10:30:00",
+    'rootCause1EndTime': "2025-02-01 10:12:00",
+    'rootCause1ActionByLSP': "Cable tension",
+    'rectificationEndTime': "2025-02-01 10:12:00",
+    'rectificationActionByLSP': "already done",
+    'tscFscEndTime': "2025-02-01 10:12:00",
+    'tscFscActionByLSP': "already done",
+    'customerConfirmEndTime': "2025-02-01 10:12:00",
+    'customerConfirmActionByLSP': "already done",
+    'outageDurationStartTime': "2024-06-14 09:32:00",
+    'outageDurationEndTime': "2025-02-01 10:12:00",
+    'outageDurationActionByLSP': "=C16-B16",
+    'gpsLocationPole': "N/A",
+    'gpsLocationJointClosure': "N/A",
+    'mediaConverterSerial': "N/A",
+    'otdrTestResultNotes': "N/A",
+    'rootCauseDirectAffect2': "Pole broken down due to cable tension",
+    'additionalNotes': ("MMP team firstly check the fault point and pole broken due to cable tension. "
+                        "Team replaced new 8m 2 poles and link was restored. "
+                        "Remark: Time delay due to difficult to buy poles."),
+}
+
 def create_standard_template():
     # Create a new workbook
     wb = openpyxl.Workbook()
@@ -12,91 +47,12 @@ def create_standard_template():
         wb.remove(wb['Sheet'])
     
     # ========== Template Sheet ==========
-    template_sheet = wb.create_sheet("Template")
+    # Same layout as the reports built by incident_py.py, filled with example values
+    template_sheet = write_report_sheet(wb, TEMPLATE_SAMPLE_DETAILS, bordered=True, title="Template")
     
     # Hide gridlines (correct way for openpyxl 3.0+)
     template_sheet.sheet_view.showGridLines = False
     
-    # Set column widths
-    template_sheet.column_dimensions['A'].width = 40
-    template_sheet.column_dimensions['B'].width = 25
-    template_sheet.column_dimensions['C'].width = 20
-    template_sheet.column_dimensions['D'].width = 50
-    
-    # Header style
-    header_font = Font(bold=True, size=12)
-    header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-    thin_border = Border(left=Side(style='thin'), 
-                         right=Side(style='thin'), 
-                         top=Side(style='thin'), 
-                         bottom=Side(style='thin'))
-    
-    # Title row
-    template_sheet.merge_cells('A1:D1')
-    title_cell = template_sheet['A1']
-    title_cell.value = "B2B_Sub-Trunk_FTTx_MSAN uplink Access fiber Incident report template_LSP_MMP_Feb-2025_Sr.05"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal='center')
-    
-    # Incident Information section
-    incident_info = [
-        ["Ticket Received Date Time", "", "", ""],
-        ["Customer Name", "FTTH pole & Cable damages in Swebo", "", ""],
-        ["Circuit ID", "Referred to mail", "", ""],
-        ["Customer Address", "N/A", "", ""],
-        ["Type of Reaction", "", "", ""],
-        ["Work Order Email Title", "FTTH pole & Cable damages in Swebo", "", ""],
-        ["", "", "", ""]
-    ]
-    
-    for row_idx, row in enumerate(incident_info, start=2):
-        for col_idx, value in enumerate(row, start=1):
-            cell = template_sheet.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            if row_idx == 2 or row_idx == 8:  # Header and empty row
-                cell.fill = header_fill
-                cell.font = header_font
-    
-    # Timeline section header
-    timeline_header = ["Description", "Start Time", "End Time", "Action By LSP"]
-    for col_idx, header in enumerate(timeline_header, start=1):
-        cell = template_sheet.cell(row=9, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.border = thin_border
-        cell.alignment = Alignment(horizontal='center')
-    
-    # Timeline data
-    timeline_data = [
-        ["WO start", "2024-06-14 09:32:00", "", "Mail/SMS Received"],
-        ["Arrived at Customer Premise/Exchange/RSU/BTS from ………..", "2024-06-15 10:30:00", "2025-02-01 10:12:00", "Arrive fault location"],
-        ["Power meter/OTDR testing from customer/Exchange/RSU/BTS", "N/A", "N/A", "N/A"],
-        ["Cable damage/cut distance(Meter or km) from customer/Exchange/Customer Site according to OTDR Test", "N/A", "N/A", "N/A"],
-        ["Root Cause (Direct affect)", "2024-06-15 10:30:00", "2025-02-01 10:12:00", "Cable tension"],
-        ["Rectification", "N/A", "2025-02-01 10:12:00", "already done"],
-        ["Ping test and Speed test(If needed)", "N/A", "N/A", "N/A"],
-        ["Service recovery confirmed by TSC/FSC", "N/A", "2025-02-01 10:12:00", "already done"],
-        ["Service recovery confirmed by Customer", "N/A", "2025-02-01 10:12:00", "already done"],
-        ["Outage duration", "2024-06-14 09:32:00", "2025-02-01 10:12:00", "=C19-B19"],
-        ["", "", "", ""],
-        ["GPS Location for Pole(if replacement or new)", "", "", "N/A"],
-        ["GPS Location for Joint Closure(if replacement or new)", "", "", "N/A"],
-        ["Media Converter/ONT/IAD equipment old&new serial number if replaced", "", "", "N/A"],
-        ["OTDR test result(to provide in separate sheet and (PDF or SOR file))", "", "", "N/A"],
-        ["", "", "", ""],
-        ["Sub-Root cause (External Affect)", "", "", ""],
-        ["Root Cause (Direct affect)", "", "", "Pole broken down due to cable tension"],
-        ["Way of recovery", "", "", "MMP team firstly check the fault point and pole broken due to cable tension. Team replaced new 8m 2 poles and link was restored."],
-        ["Remark: Time delay due to difficult to buy poles.", "", "", ""]
-    ]
-    
-    for row_idx, row in enumerate(timeline_data, start=10):
-        for col_idx, value in enumerate(row, start=1):
-            cell = template_sheet.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            if row_idx in [10, 20, 27]:  # Highlight certain rows
-                cell.fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-    
     # ========== Photos Sheet ==========
     photos_sheet = wb.create_sheet("Photos")
     photos_sheet.sheet_view.showGridLines = False
@@ -165,7 +121,7 @@ def create_standard_template():
             # Add borders
             for r in range(current_row, current_row+3):
                 for c in range(col, col+4):
-                    photos_sheet.cell(row=r, column=c).border = thin_border
+                    photos_sheet.cell(row=r, column=c).border = THIN_BORDER
         
         current_row += 3
         
@@ -0,0 +1,58 @@
+"""
+MMP Fiber Fault Reporting API Server
+
+Flask application factory for the REST API that app.js talks to (database_config.json,
+"api_endpoints"). Each group of routes lives in its own blueprint module; they all share one
+bounded connection pool and one background audit log writer.
+
+Run with:
+    python api_server.py
+"""
+
+from flask import Flask, jsonify
+from flask_cors import CORS
+
+from audit_log import AuditQueue
+from catalog_api import catalog_bp
+from db_pool import CONFIG_PATH, PoolTimeout, pool_from_config
+from export_api import export_bp
+from inventory_api import inventory_bp
+from reports_api import reports_bp
+from trans_num_allocator import TransNumAllocator
+from uploads_api import file_storage_settings, uploads_bp
+
+
+def create_app(pool=None, config_path=CONFIG_PATH):
+    """
+    Builds the API app.
+
+    Args:
+        pool (ConnectionPool | None): Connection pool to use; defaults to the SQL Server pool
+            described by config_path.
+        config_path: database_config.json to read the connection, pool and file storage settings from.
+
+    Returns:
+        Flask: The configured app.
+    """
+    app = Flask(__name__)
+    CORS(app) # Enable CORS for all routes
+    app.extensions['db_pool'] = pool if pool is not None else pool_from_config(config_path)
+    app.extensions['trans_num_allocator'] = TransNumAllocator(app.extensions['db_pool'])
+    app.extensions['audit_queue'] = AuditQueue(app.extensions['db_pool'])
+    app.extensions['file_storage'] = file_storage_settings(config_path)
+
+    app.register_blueprint(reports_bp)
+    app.register_blueprint(inventory_bp)
+    app.register_blueprint(uploads_bp)
+    app.register_blueprint(catalog_bp)
+    app.register_blueprint(export_bp)
+
+    @app.errorhandler(PoolTimeout)
+    def pool_exhausted(error):
+        return jsonify({'error': "The database is busy, please retry shortly"}), 503
+
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(debug=True)
@@ -25,6 +25,9 @@ window.addEventListener('unhandledrejection', function(event) {
 // Global variables for material and service info, fetched once
 let allMaterialInfo = [];
 let allServiceInfo = [];
+// <option> lists built once per fetch; addMaterialField/addServiceField reuse them and set the selection afterwards
+let materialOptionsHtml = '';
+let serviceOptionsHtml = '';
 let currentEditReportTransNum = null; // To store trans_num of the report being edited
 let deletedPhotoIds = []; // To store IDs of photos marked for deletion
 let newPhotos = []; // To store new photo files for upload
@@ -526,59 +529,63 @@ photoUploadInput.addEventListener('change', (event) => {
 
 function handlePhotoUpload(files, previewContainer, isEdit = false, existingPhoto = null) {
     Array.from(files).forEach(file => {
-        const reader = new FileReader();
-        reader.onload = (e) => {
-            const previewItem = document.createElement('div');
-            previewItem.classList.add('photo-preview-item');
-
-            const img = document.createElement('img');
-            img.src = e.target.result;
-            previewItem.appendChild(img);
-
-            const removeButton = document.createElement('span');
-            removeButton.classList.add('remove-photo-button');
-            removeButton.innerHTML = '&times;';
-            removeButton.addEventListener('click', () => {
-                previewContainer.removeChild(previewItem);
-                if (isEdit && existingPhoto && existingPhoto.id) {
-                    deletedPhotoIds.push(existingPhoto.id);
-                } else {
-                    // Remove from newPhotos array for add/edit form
-                    const index = newPhotos.findIndex(p => p.file === file);
-                    if (index > -1) {
-                        newPhotos.splice(index, 1);
-                    }
-                }
-            });
-            previewItem.appendChild(removeButton);
-
-            const labelInput = document.createElement('input');
-            labelInput.type = 'text';
-            labelInput.placeholder = 'Label';
-            labelInput.classList.add('photo-label', 'absolute', 'bottom-0', 'left-0', 'right-0', 'bg-gray-800', 'bg-opacity-75', 'text-white', 'text-xs', 'p-1', 'text-center', 'w-full', 'border-none', 'rounded-b-md');
-            labelInput.addEventListener('click', (e) => e.stopPropagation()); // Prevent click from propagating to parent
-            labelInput.addEventListener('change', () => {
-                if (isEdit && existingPhoto) {
-                    existingPhoto.label = labelInput.value;
-                } else {
-                    const photoEntry = newPhotos.find(p => p.file === file);
-                    if (photoEntry) photoEntry.label = labelInput.value;
+        const previewItem = document.createElement('div');
+        previewItem.classList.add('photo-preview-item');
+
+        const img = document.createElement('img');
+        // Stored photos preview from their server thumbnail; new files from a blob URL instead of
+        // a base64 copy of the full-size file
+        const previewUrl = (isEdit && existingPhoto && existingPhoto.thumbnail_url)
+            ? `${API_BASE_URL}${existingPhoto.thumbnail_url}`
+            : URL.createObjectURL(file);
+        img.src = previewUrl;
+        img.loading = 'lazy';
+        img.decoding = 'async';
+        previewItem.appendChild(img);
+
+        const removeButton = document.createElement('span');
+        removeButton.classList.add('remove-photo-button');
+        removeButton.innerHTML = '&times;';
+        removeButton.addEventListener('click', () => {
+            previewContainer.removeChild(previewItem);
+            if (previewUrl.startsWith('blob:')) URL.revokeObjectURL(previewUrl);
+            if (isEdit && existingPhoto && existingPhoto.id) {
+                deletedPhotoIds.push(existingPhoto.id);
+            } else {
+                // Remove from newPhotos array for add/edit form
+                const index = newPhotos.findIndex(p => p.file === file);
+                if (index > -1) {
+                    newPhotos.splice(index, 1);
                 }
-            });
-            previewItem.appendChild(labelInput);
-
+            }
+        });
+        previewItem.appendChild(removeButton);
+
+        const labelInput = document.createElement('input');
+        labelInput.type = 'text';
+        labelInput.placeholder = 'Label';
+        labelInput.classList.add('photo-label', 'absolute', 'bottom-0', 'left-0', 'right-0', 'bg-gray-800', 'bg-opacity-75', 'text-white', 'text-xs', 'p-1', 'text-center', 'w-full', 'border-none', 'rounded-b-md');
+        labelInput.addEventListener('click', (e) => e.stopPropagation()); // Prevent click from propagating to parent
+        labelInput.addEventListener('change', () => {
             if (isEdit && existingPhoto) {
-                labelInput.value = existingPhoto.label || '';
-                previewItem.dataset.photoId = existingPhoto.id; // Store ID for existing photos
-                previewItem.dataset.isExisting = 'true';
+                existingPhoto.label = labelInput.value;
             } else {
-                // For new photos, add to newPhotos array
-                newPhotos.push({ file: file, label: '' });
+                const photoEntry = newPhotos.find(p => p.file === file);
+                if (photoEntry) photoEntry.label = labelInput.value;
             }
+        });
+        previewItem.appendChild(labelInput);
 
-            previewContainer.appendChild(previewItem);
-        };
-        reader.readAsDataURL(file);
+        if (isEdit && existingPhoto) {
+            labelInput.value = existingPhoto.label || '';
+            previewItem.dataset.photoId = existingPhoto.id; // Store ID for existing photos
+            previewItem.dataset.isExisting = 'true';
+        } else {
+            // For new photos, add to newPhotos array
+            newPhotos.push({ file: file, label: '' });
+        }
+
+        previewContainer.appendChild(previewItem);
     });
 }
 
@@ -594,12 +601,10 @@ function addMaterialField(container, material = {}, isEdit = false) {
     materialDiv.classList.add('flex', 'flex-col', 'sm:flex-row', 'items-center', 'gap-2', 'p-2', 'bg-gray-50', 'rounded-md', 'shadow-sm');
     materialDiv.dataset.id = material.id || ''; // Store ID for existing materials
 
-    let materialOptions = allMaterialInfo.map(m => `<option value="${m.material_code}" ${material.material_code === m.material_code ? 'selected' : ''}>${m.material_name} (${m.material_code})</option>`).join('');
-
     materialDiv.innerHTML = `
         <select class="material-code-select flex-grow sm:w-1/2 rounded-md shadow-sm input-field p-2" required>
             <option value="">Select Material</option>
-            ${materialOptions}
+            ${materialOptionsHtml}
         </select>
         <span class="material-uom text-sm text-gray-600 sm:w-1/6 text-center">${material.uom || 'UoM'}</span>
         <input type="number" step="0.01" placeholder="Usage" value="${material.material_usage || ''}" class="material-usage-input sm:w-1/4 rounded-md shadow-sm input-field p-2" required>
@@ -657,12 +662,10 @@ function addServiceField(container, service = {}, isEdit = false) {
     serviceDiv.classList.add('flex', 'flex-col', 'sm:flex-row', 'items-center', 'gap-2', 'p-2', 'bg-gray-50', 'rounded-md', 'shadow-sm');
     serviceDiv.dataset.id = service.id || ''; // Store ID for existing services
 
-    let serviceOptions = allServiceInfo.map(s => `<option value="${s.service_code}" ${service.service_code === s.service_code ? 'selected' : ''}>${s.service_name} (${s.service_code})</option>`).join('');
-
     serviceDiv.innerHTML = `
         <select class="service-code-select flex-grow sm:w-1/2 rounded-md shadow-sm input-field p-2" required>
             <option value="">Select Service</option>
-            ${serviceOptions}
+            ${serviceOptionsHtml}
         </select>
         <span class="service-uom text-sm text-gray-600 sm:w-1/6 text-center">${service.uom || 'UoM'}</span>
         <input type="number" step="0.01" placeholder="Usage" value="${service.service_usage || ''}" class="service-usage-input sm:w-1/4 rounded-md shadow-sm input-field p-2" required>
@@ -719,8 +722,10 @@ addServiceBtn.addEventListener('click', () => addServiceField(servicesUsedContai
 // --- Fetch Dropdown Data (Materials & Services) ---
 async function fetchMaterialInfoForDropdown() {
     try {
+        // no-cache: revalidate with the stored ETag; an unchanged catalogue comes back as an empty 304
         const response = await fetch(`${API_BASE_URL}/api/materials_info`, {
-            headers: getAuthHeaders()
+            headers: getAuthHeaders(),
+            cache: 'no-cache'
         });
         if (response.status === 401) {
             showAuthMessage('Session expired. Please log in again.', 'error');
@@ -730,6 +735,7 @@ async function fetchMaterialInfoForDropdown() {
         }
         if (!response.ok) throw new Error('Failed to fetch material info');
         allMaterialInfo = await response.json();
+        materialOptionsHtml = allMaterialInfo.map(m => `<option value="${m.material_code}">${m.material_name} (${m.material_code})</option>`).join('');
     } catch (error) {
         console.error("Error fetching material info for dropdown:", error);
         if (error.message !== 'Unauthorized') {
@@ -741,7 +747,8 @@ async function fetchMaterialInfoForDropdown() {
 async function fetchServiceInfoForDropdown() {
     try {
         const response = await fetch(`${API_BASE_URL}/api/services_info`, {
-            headers: getAuthHeaders()
+            headers: getAuthHeaders(),
+            cache: 'no-cache'
         });
         if (response.status === 401) {
             showAuthMessage('Session expired. Please log in again.', 'error');
@@ -751,6 +758,7 @@ async function fetchServiceInfoForDropdown() {
         }
         if (!response.ok) throw new Error('Failed to fetch service info');
         allServiceInfo = await response.json();
+        serviceOptionsHtml = allServiceInfo.map(s => `<option value="${s.service_code}">${s.service_name} (${s.service_code})</option>`).join('');
     } catch (error) {
         console.error("Error fetching service info for dropdown:", error);
         if (error.message !== 'Unauthorized') {
@@ -0,0 +1,232 @@
+"""
+Audit Logging for the MMP Fiber Fault Reporting API
+
+Writes system_logs entries off the request path. AuditQueue buffers events in memory (up to a
+fixed number) and a background thread inserts them in batches, so a burst of submissions costs
+one executemany per batch instead of an extra insert inside every business transaction. Pending
+events are flushed when the process exits.
+
+archive_system_logs() moves entries older than the retention period to system_logs_archive in
+batches, keeping system_logs (and IX_system_logs_created_at) small. Run it on a schedule:
+    python audit_log.py --retention-days 90
+"""
+
+import argparse
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from db_pool import pool_from_config
+
+DEFAULT_MAX_PENDING = 10000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_PUT_TIMEOUT = 1.0
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_ARCHIVE_BATCH_SIZE = 5000
+
+LOG_COLUMNS = ["user_id", "action", "table_name", "record_id", "old_values", "new_values", "ip_address",
+               "user_agent", "created_at"]
+ARCHIVE_COLUMNS = ["id"] + LOG_COLUMNS
+
+MSSQL_ARCHIVE_SQL = """
+SET NOCOUNT ON;
+DECLARE @archived INT;
+EXEC [dbo].[sp_archive_system_logs] @retention_days = ?, @batch_size = ?, @archived = @archived OUTPUT;
+SELECT @archived;
+"""
+
+_FLUSH = object()
+_STOP = object()
+
+
+class AuditQueue:
+    """
+    Bounded in-memory buffer of system_logs events, written in batches by a background thread.
+
+    The thread starts on the first log() call. When the buffer is full for longer than
+    put_timeout seconds, the event is written by the caller instead, so memory stays bounded
+    without dropping entries.
+    """
+
+    def __init__(self, pool, max_pending=DEFAULT_MAX_PENDING, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, put_timeout=DEFAULT_PUT_TIMEOUT):
+        """
+        Args:
+            pool (ConnectionPool): Pool to write system_logs through.
+            max_pending (int): Most events buffered at once.
+            batch_size (int): Most events per insert batch.
+            flush_interval (float): Seconds a batch waits to fill up before it is written.
+            put_timeout (float): Seconds log() waits for buffer space before writing inline.
+        """
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.written = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+
+    def log(self, user_id, action, table_name=None, record_id=None, old_values=None, new_values=None,
+            ip_address=None, user_agent=None):
+        """Queues one system_logs entry, timestamped now."""
+        event = (user_id, action, table_name, record_id, old_values, new_values, ip_address, user_agent,
+                 self._timestamp())
+        if not self._start():
+            self._write([event])
+            return
+        try:
+            self._queue.put(event, timeout=self.put_timeout)
+        except queue.Full:
+            # The writer is behind; write this one here rather than grow the buffer or lose it
+            self._write([event])
+
+    def flush(self):
+        """Blocks until every event queued so far is written."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self, timeout=None):
+        """Writes pending events and stops the background thread; later events are written inline."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+        # Events that raced in after the writer stopped
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _FLUSH and item is not _STOP:
+                leftovers.append(item)
+        self._write(leftovers)
+
+    def _start(self):
+        """Starts the writer thread if needed; False once the queue is closed."""
+        with self._lock:
+            if self._closed:
+                return False
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            return True
+
+    def _timestamp(self):
+        now = datetime.now()
+        # sqlite3's default datetime adapter is deprecated; store the text form SQLite uses
+        return now.strftime('%Y-%m-%d %H:%M:%S') if self.pool.dialect == 'sqlite' else now
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch, markers = [], 1
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif item is not _FLUSH:
+                    batch.append(item)
+                if stopping or item is _FLUSH or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                markers += 1
+            if stopping:
+                # Take whatever was queued before close()
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    markers += 1
+                    if item is not _FLUSH and item is not _STOP:
+                        batch.append(item)
+            for start in range(0, len(batch), self.batch_size):
+                self._write(batch[start:start + self.batch_size])
+            for _ in range(markers):
+                self._queue.task_done()
+
+    def _write(self, events):
+        if not events:
+            return
+        try:
+            with self.pool.connection() as conn:
+                # No fast_executemany: pyodbc's array binding does not handle the NTEXT columns
+                conn.cursor().executemany(
+                    f"INSERT INTO system_logs ({', '.join(LOG_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(LOG_COLUMNS))})", events)
+            self.written += len(events)
+        except Exception as e:
+            self.failed += len(events)
+            print(f"Error writing {len(events)} audit log entries: {e}")
+
+
+def current_audit_queue():
+    """The audit queue of the running API app (set up by api_server.create_app)."""
+    from flask import current_app
+    return current_app.extensions['audit_queue']
+
+
+def archive_system_logs(pool, retention_days=DEFAULT_RETENTION_DAYS, batch_size=DEFAULT_ARCHIVE_BATCH_SIZE):
+    """
+    Moves system_logs entries older than retention_days to system_logs_archive.
+
+    Rows move oldest first, batch_size per transaction, so the job never holds long locks on
+    system_logs. On SQL Server this is sp_archive_system_logs.
+
+    Returns:
+        int: Number of entries archived.
+    """
+    if pool.dialect == 'mssql':
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(MSSQL_ARCHIVE_SQL, [retention_days, batch_size])
+            return cursor.fetchone()[0]
+
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+    archived = 0
+    while True:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM system_logs WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                           [cutoff, batch_size])
+            ids = [row[0] for row in cursor.fetchall()]
+            if ids:
+                id_list = ", ".join("?" * len(ids))
+                cursor.execute(
+                    f"INSERT INTO system_logs_archive ({', '.join(ARCHIVE_COLUMNS)}) "
+                    f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM system_logs WHERE id IN ({id_list})", ids)
+                cursor.execute(f"DELETE FROM system_logs WHERE id IN ({id_list})", ids)
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Move old system_logs entries to system_logs_archive.")
+    parser.add_argument('--retention-days', type=int, default=DEFAULT_RETENTION_DAYS,
+                        help="Keep entries newer than this many days in system_logs")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_ARCHIVE_BATCH_SIZE,
+                        help="Entries moved per transaction")
+    args = parser.parse_args()
+    pool = pool_from_config()
+    try:
+        print(f"Archived {archive_system_logs(pool, args.retention_days, args.batch_size)} audit log entries.")
+    finally:
+        pool.close_all()
@@ -0,0 +1,223 @@
+"""
+Catalogue API (/api/materials_info, /api/services_info)
+
+List, create, update and delete routes for the material and service catalogues, as declared in
+database_config.json. The front end loads each list in full to fill its dropdowns, and the
+catalogues rarely change, so list responses are served from an in-process cache:
+
+- the JSON body and its ETag are built once per catalogue and reused until a create, update or
+  delete through this API invalidates them (or CATALOG_CACHE_SECONDS pass, which picks up edits
+  made outside the API);
+- responses carry the ETag with "Cache-Control: private, no-cache", so browsers revalidate with
+  If-None-Match and get an empty 304 while the catalogue is unchanged.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import namedtuple
+
+from flask import Blueprint, Response, jsonify, request
+
+from audit_log import current_audit_queue
+from db_pool import current_pool, fetch_dicts, json_row
+from inventory_api import active_material_codes
+
+catalog_bp = Blueprint('catalog', __name__)
+
+CatalogTable = namedtuple('CatalogTable', ['code_column', 'name_column', 'columns'])
+
+
+def catalog_columns(kind):
+    return [
+        "id", f"{kind}_code", f"{kind}_name", f"{kind}_type", "uom", "unit_price", "kcn_price", "sgg_price",
+        "description", "is_active", "created_at", "updated_at", "created_by", "updated_by",
+    ]
+
+
+CATALOGS = {
+    'materials_info': CatalogTable('material_code', 'material_name', catalog_columns('material')),
+    'services_info': CatalogTable('service_code', 'service_name', catalog_columns('service')),
+}
+# Columns managed here rather than sent by clients
+MANAGED_COLUMNS = {"id", "created_at", "updated_at"}
+
+CATALOG_CACHE_SECONDS = 300
+CACHE_CONTROL = 'private, no-cache'
+
+
+class CatalogCache:
+    """
+    Per-pool cache of each catalogue's list response: (JSON body, ETag).
+
+    invalidate() bumps a generation counter, so a load that started before a write cannot put
+    its stale result back into the cache afterwards.
+    """
+
+    def __init__(self, ttl=CATALOG_CACHE_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary()  # pool -> {table: (loaded_at, body, etag)}
+        self._generations = weakref.WeakKeyDictionary()  # pool -> {table: int}
+
+    def get(self, pool, table):
+        """Returns (body, etag) for the catalogue, loading it on a miss."""
+        with self._lock:
+            entry = self._entries.get(pool, {}).get(table)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1], entry[2]
+            generation = self._generations.setdefault(pool, {}).get(table, 0)
+
+        spec = CATALOGS[table]
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(spec.columns)} FROM {table} ORDER BY {spec.code_column}")
+            rows = [json_row(row) for row in fetch_dicts(cursor)]
+        body = json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = hashlib.sha1(body).hexdigest()
+
+        with self._lock:
+            if self._generations.setdefault(pool, {}).get(table, 0) == generation:
+                self._entries.setdefault(pool, {})[table] = (time.monotonic(), body, etag)
+        return body, etag
+
+    def invalidate(self, pool, table):
+        with self._lock:
+            generations = self._generations.setdefault(pool, {})
+            generations[table] = generations.get(table, 0) + 1
+            self._entries.get(pool, {}).pop(table, None)
+
+
+catalog_cache = CatalogCache()
+
+
+def error_response(message, status):
+    return jsonify({'error': message}), status
+
+
+def catalog_changed(pool, table):
+    """Drops every cached copy of a catalogue after a write has committed."""
+    catalog_cache.invalidate(pool, table)
+    if table == 'materials_info':
+        active_material_codes.invalidate(pool)
+
+
+def fetch_catalog_item(conn, table, key_column, key):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {', '.join(CATALOGS[table].columns)} FROM {table} WHERE {key_column} = ?", [key])
+    rows = fetch_dicts(cursor)
+    return json_row(rows[0]) if rows else None
+
+
+def list_catalog(table):
+    """
+    GET /api/materials_info, /api/services_info
+
+    Returns every row as a JSON array, ordered by code. Answers 304 when If-None-Match holds the
+    current ETag.
+    """
+    body, etag = catalog_cache.get(current_pool(), table)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def create_catalog_item(table):
+    """Creates one catalogue entry from a JSON object and returns it with 201."""
+    spec = CATALOGS[table]
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response("Expected a JSON object", 400)
+    allowed = [column for column in spec.columns if column not in MANAGED_COLUMNS | {"updated_by"}]
+    unknown = sorted(set(data) - set(allowed))
+    if unknown:
+        return error_response(f"Unknown fields: {', '.join(unknown)}", 400)
+    missing = [column for column in (spec.code_column, spec.name_column) if data.get(column) in (None, '')]
+    if missing:
+        return error_response(f"Missing required fields: {', '.join(missing)}", 400)
+
+    columns = [column for column in allowed if column in data]
+    pool = current_pool()
+    try:
+        with pool.connection() as conn:
+            conn.cursor().execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [data[column] for column in columns])
+            item = fetch_catalog_item(conn, table, spec.code_column, data[spec.code_column])
+    except Exception as e:
+        if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+            return error_response(f"Invalid value: {e}", 400)
+        raise
+    catalog_changed(pool, table)
+    current_audit_queue().log(data.get('created_by'), 'INSERT', table, item['id'],
+                              new_values=json.dumps(item, ensure_ascii=False))
+    return jsonify(item), 201
+
+
+def update_catalog_item(table, item_id):
+    """Updates the given columns of one catalogue entry and returns the stored row."""
+    spec = CATALOGS[table]
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return error_response("Expected a JSON object of fields to update", 400)
+    allowed = [column for column in spec.columns if column not in MANAGED_COLUMNS | {"created_by"}]
+    unknown = sorted(set(data) - set(allowed))
+    if unknown:
+        return error_response(f"Fields cannot be updated: {', '.join(unknown)}", 400)
+
+    columns = [column for column in allowed if column in data]
+    pool = current_pool()
+    try:
+        with pool.connection() as conn:
+            old_item = fetch_catalog_item(conn, table, 'id', item_id)
+            if old_item is None:
+                return error_response(f"{table} entry not found", 404)
+            conn.cursor().execute(
+                f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)}, "
+                "updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [data[column] for column in columns] + [item_id])
+            item = fetch_catalog_item(conn, table, 'id', item_id)
+    except Exception as e:
+        if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+            return error_response(f"Invalid value: {e}", 400)
+        raise
+    catalog_changed(pool, table)
+    current_audit_queue().log(data.get('updated_by'), 'UPDATE', table, item_id,
+                              old_values=json.dumps(old_item, ensure_ascii=False),
+                              new_values=json.dumps(item, ensure_ascii=False))
+    return jsonify(item)
+
+
+def delete_catalog_item(table, item_id):
+    """Deletes one catalogue entry; 409 while inventory transactions still reference it."""
+    pool = current_pool()
+    try:
+        with pool.connection() as conn:
+            old_item = fetch_catalog_item(conn, table, 'id', item_id)
+            if old_item is None:
+                return error_response(f"{table} entry not found", 404)
+            conn.cursor().execute(f"DELETE FROM {table} WHERE id = ?", [item_id])
+    except Exception as e:
+        if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+            return error_response("Entry is still in use; set is_active = 0 instead", 409)
+        raise
+    catalog_changed(pool, table)
+    current_audit_queue().log(None, 'DELETE', table, item_id, old_values=json.dumps(old_item, ensure_ascii=False))
+    return '', 204
+
+
+for _table in CATALOGS:
+    catalog_bp.add_url_rule(f'/api/{_table}', f'list_{_table}', list_catalog,
+                            methods=['GET'], defaults={'table': _table})
+    catalog_bp.add_url_rule(f'/api/{_table}', f'create_{_table}', create_catalog_item,
+                            methods=['POST'], defaults={'table': _table})
+    catalog_bp.add_url_rule(f'/api/{_table}/<int:item_id>', f'update_{_table}', update_catalog_item,
+                            methods=['PUT'], defaults={'table': _table})
+    catalog_bp.add_url_rule(f'/api/{_table}/<int:item_id>', f'delete_{_table}', delete_catalog_item,
+                            methods=['DELETE'], defaults={'table': _table})
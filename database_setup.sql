@@ -169,6 +169,10 @@ BEGIN
         [file_size] BIGINT NOT NULL,
         [content_type] NVARCHAR(100) NOT NULL,
         [label] NVARCHAR(200) NULL,
+        [thumbnail_path] NVARCHAR(500) NULL, -- small JPEG for lists and previews
+        [thumbnail_size] BIGINT NULL,
+        [web_path] NVARCHAR(500) NULL, -- screen-sized JPEG
+        [web_size] BIGINT NULL,
         [uploaded_at] DATETIME2 NOT NULL DEFAULT GETDATE(),
         [uploaded_by] INT NOT NULL,
         FOREIGN KEY ([report_id]) REFERENCES [dbo].[fault_reports]([id]) ON DELETE CASCADE,
@@ -181,6 +185,17 @@ BEGIN
 END
 GO
 
+-- Variant columns for databases created before thumbnails were generated
+IF COL_LENGTH('dbo.report_photos', 'thumbnail_path') IS NULL
+BEGIN
+    ALTER TABLE [dbo].[report_photos] ADD
+        [thumbnail_path] NVARCHAR(500) NULL,
+        [thumbnail_size] BIGINT NULL,
+        [web_path] NVARCHAR(500) NULL,
+        [web_size] BIGINT NULL;
+END
+GO
+
 -- =============================================
 -- 6. Report Materials Table (Materials used in reports)
 -- =============================================
@@ -292,43 +307,226 @@ END
 GO
 
 -- =============================================
--- 10. Create Views for Material Inventory Summary
+-- 10. System Logs Archive Table
 -- =============================================
-IF NOT EXISTS (SELECT * FROM sys.views WHERE name = 'vw_material_inventory_summary')
+-- Entries older than the retention period, moved out of system_logs by sp_archive_system_logs so
+-- the live table and IX_system_logs_created_at stay small. Clustered on created_at so date-range
+-- queries over the archive read one contiguous range.
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='system_logs_archive' AND xtype='U')
 BEGIN
-    EXEC('
-    CREATE VIEW [dbo].[vw_material_inventory_summary] AS
-    SELECT 
-        mi.material_code,
-        mi.material_name,
-        mi.material_type,
-        mi.uom,
-        ISNULL(SUM(CASE WHEN inv.transaction_type = ''receipt'' THEN inv.quantity ELSE 0 END), 0) as total_receipts,
-        ISNULL(SUM(CASE WHEN inv.transaction_type = ''issue'' THEN inv.quantity ELSE 0 END), 0) as total_issues,
-        ISNULL(SUM(CASE WHEN inv.transaction_type = ''return'' THEN inv.quantity ELSE 0 END), 0) as total_returns,
-        ISNULL(SUM(CASE WHEN inv.transaction_type = ''damage'' THEN inv.quantity ELSE 0 END), 0) as total_damages,
-        ISNULL(SUM(CASE WHEN inv.transaction_type = ''adjustment'' THEN inv.quantity ELSE 0 END), 0) as total_adjustments,
-        ISNULL(SUM(
-            CASE 
-                WHEN inv.transaction_type IN (''receipt'', ''return'') THEN inv.quantity
-                WHEN inv.transaction_type IN (''issue'', ''damage'') THEN -inv.quantity
-                WHEN inv.transaction_type = ''adjustment'' THEN inv.quantity
+    CREATE TABLE [dbo].[system_logs_archive] (
+        [id] INT NOT NULL PRIMARY KEY NONCLUSTERED, -- id the entry had in system_logs
+        [user_id] INT NULL,
+        [action] NVARCHAR(100) NOT NULL,
+        [table_name] NVARCHAR(100) NULL,
+        [record_id] INT NULL,
+        [old_values] NTEXT NULL,
+        [new_values] NTEXT NULL,
+        [ip_address] NVARCHAR(45) NULL,
+        [user_agent] NVARCHAR(500) NULL,
+        [created_at] DATETIME2 NOT NULL,
+        [archived_at] DATETIME2 NOT NULL DEFAULT GETDATE()
+    );
+
+    CREATE CLUSTERED INDEX [IX_system_logs_archive_created_at] ON [dbo].[system_logs_archive] ([created_at]);
+END
+GO
+
+-- =============================================
+-- 11. Transaction Number Counters Table
+-- =============================================
+-- One row per (prefix, year-month) holding the last number handed out, so allocating numbers
+-- is a single-row update instead of a MAX() scan over fault_reports
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='trans_num_counters' AND xtype='U')
+BEGIN
+    CREATE TABLE [dbo].[trans_num_counters] (
+        [prefix] NVARCHAR(10) NOT NULL,
+        [period] CHAR(6) NOT NULL, -- YYYYMM
+        [last_value] INT NOT NULL,
+        [updated_at] DATETIME2 NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT [PK_trans_num_counters] PRIMARY KEY ([prefix], [period])
+    );
+END
+GO
+
+-- =============================================
+-- 12. Material Inventory Balances Table
+-- =============================================
+-- Running per-material totals, kept up to date by sp_add_inventory_transaction (and the API's
+-- bulk ingestion), so the inventory summary reads one row per material instead of
+-- aggregating the whole material_inventory ledger
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='material_inventory_balances' AND xtype='U')
+BEGIN
+    CREATE TABLE [dbo].[material_inventory_balances] (
+        [material_code] NVARCHAR(50) NOT NULL PRIMARY KEY,
+        [total_receipts] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [total_issues] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [total_returns] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [total_damages] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [total_adjustments] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [current_balance] DECIMAL(18,4) NOT NULL DEFAULT 0,
+        [last_transaction_date] DATETIME2 NULL,
+        [updated_at] DATETIME2 NOT NULL DEFAULT GETDATE(),
+        FOREIGN KEY ([material_code]) REFERENCES [dbo].[materials_info]([material_code])
+    );
+
+    -- Backfill from the transactions recorded so far
+    INSERT INTO [dbo].[material_inventory_balances]
+    (material_code, total_receipts, total_issues, total_returns, total_damages, total_adjustments,
+     current_balance, last_transaction_date)
+    SELECT
+        material_code,
+        SUM(CASE WHEN transaction_type = 'receipt' THEN quantity ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'issue' THEN quantity ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'return' THEN quantity ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'damage' THEN quantity ELSE 0 END),
+        SUM(CASE WHEN transaction_type = 'adjustment' THEN quantity ELSE 0 END),
+        SUM(
+            CASE
+                WHEN transaction_type IN ('receipt', 'return', 'adjustment') THEN quantity
+                WHEN transaction_type IN ('issue', 'damage') THEN -quantity
                 ELSE 0
             END
-        ), 0) as current_balance,
-        MAX(inv.transaction_date) as last_transaction_date
-    FROM [dbo].[materials_info] mi
-    LEFT JOIN [dbo].[material_inventory] inv ON mi.material_code = inv.material_code
-    WHERE mi.is_active = 1
-    GROUP BY mi.material_code, mi.material_name, mi.material_type, mi.uom
-    ')
+        ),
+        MAX(transaction_date)
+    FROM [dbo].[material_inventory]
+    GROUP BY material_code;
 END
 GO
 
 -- =============================================
--- 11. Create Stored Procedures
+-- 13. Query-Pattern Indexes
+-- =============================================
+-- Composite, covering and filtered indexes shaped after the API's queries. Each block only
+-- creates its index if missing, so this section can be re-run on an existing database.
+--   * /api/reports pages: equality filters on status/region, newest first by (raised_time, id)
+--   * open/in-progress work queue: status IN ('open', 'in_progress'), a small slice of the table
+--   * inventory ledger exports and reconciliation: by material_code, then date or type
+-- Filtered indexes need these session settings when created (and when their table is written).
+SET ANSI_NULLS ON;
+SET QUOTED_IDENTIFIER ON;
+GO
+
+-- Report pages filtered by status and region, already in page order
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fault_reports_status_region_raised'
+               AND object_id = OBJECT_ID('dbo.fault_reports'))
+    CREATE INDEX [IX_fault_reports_status_region_raised]
+        ON [dbo].[fault_reports] ([status], [region], [raised_time] DESC, [id] DESC);
+GO
+
+-- Report pages filtered by region alone (optionally township)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fault_reports_region_raised'
+               AND object_id = OBJECT_ID('dbo.fault_reports'))
+    CREATE INDEX [IX_fault_reports_region_raised]
+        ON [dbo].[fault_reports] ([region], [raised_time] DESC, [id] DESC)
+        INCLUDE ([township], [status]);
+GO
+
+-- Open and in-progress reports only: the dashboard's work queue stays a small index however
+-- many resolved reports accumulate. Used when the status is written as a literal (the reports
+-- API does this for these two values).
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_fault_reports_active_raised'
+               AND object_id = OBJECT_ID('dbo.fault_reports'))
+    CREATE INDEX [IX_fault_reports_active_raised]
+        ON [dbo].[fault_reports] ([raised_time] DESC, [id] DESC)
+        INCLUDE ([status], [region], [township], [priority])
+        WHERE [status] IN ('open', 'in_progress');
+GO
+
+-- Per-material ledger in date order (inventory export filtered by material_code)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_material_inventory_code_date'
+               AND object_id = OBJECT_ID('dbo.material_inventory'))
+    CREATE INDEX [IX_material_inventory_code_date]
+        ON [dbo].[material_inventory] ([material_code], [transaction_date], [id])
+        INCLUDE ([transaction_type], [quantity], [unit_cost]);
+GO
+
+-- Totals by material and transaction type (balance backfill and reconciliation) without
+-- touching the table itself
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_material_inventory_code_type'
+               AND object_id = OBJECT_ID('dbo.material_inventory'))
+    CREATE INDEX [IX_material_inventory_code_type]
+        ON [dbo].[material_inventory] ([material_code], [transaction_type])
+        INCLUDE ([quantity], [transaction_date]);
+GO
+
+-- =============================================
+-- 14. Create Views for Material Inventory Summary
+-- =============================================
+-- Reads the maintained balances (one row per material) instead of aggregating the ledger
+CREATE OR ALTER VIEW [dbo].[vw_material_inventory_summary] AS
+SELECT 
+    mi.material_code,
+    mi.material_name,
+    mi.material_type,
+    mi.uom,
+    ISNULL(b.total_receipts, 0) as total_receipts,
+    ISNULL(b.total_issues, 0) as total_issues,
+    ISNULL(b.total_returns, 0) as total_returns,
+    ISNULL(b.total_damages, 0) as total_damages,
+    ISNULL(b.total_adjustments, 0) as total_adjustments,
+    ISNULL(b.current_balance, 0) as current_balance,
+    b.last_transaction_date
+FROM [dbo].[materials_info] mi
+LEFT JOIN [dbo].[material_inventory_balances] b ON mi.material_code = b.material_code
+WHERE mi.is_active = 1;
+GO
+
+-- =============================================
+-- 15. Create Stored Procedures
 -- =============================================
 
+-- Procedure to reserve a block of transaction numbers
+-- Increments the (prefix, period) counter by @count under an update lock and returns the first
+-- number of the block; concurrent callers queue on the counter row instead of colliding.
+-- A counter is seeded once from the numbers already in fault_reports for that month.
+IF EXISTS (SELECT * FROM sys.objects WHERE type = 'P' AND name = 'sp_allocate_trans_nums')
+    DROP PROCEDURE [dbo].[sp_allocate_trans_nums];
+GO
+
+CREATE PROCEDURE [dbo].[sp_allocate_trans_nums]
+    @prefix NVARCHAR(10) = 'RPT',
+    @count INT = 1,
+    @period CHAR(6) = NULL OUTPUT, -- YYYYMM; defaults to the current month
+    @first_value INT OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    IF @count IS NULL OR @count < 1
+    BEGIN
+        RAISERROR('@count must be at least 1', 16, 1)
+        RETURN
+    END
+
+    IF @period IS NULL
+        SET @period = FORMAT(GETDATE(), 'yyyyMM')
+
+    DECLARE @last_value INT
+
+    BEGIN TRANSACTION
+        UPDATE [dbo].[trans_num_counters] WITH (UPDLOCK, HOLDLOCK)
+        SET @last_value = [last_value] = [last_value] + @count,
+            [updated_at] = GETDATE()
+        WHERE [prefix] = @prefix AND [period] = @period
+
+        IF @@ROWCOUNT = 0
+        BEGIN
+            -- First allocation this month: continue from any numbers created before the counter existed
+            SELECT @last_value = ISNULL(MAX(CAST(RIGHT(trans_num, 4) AS INT)), 0) + @count
+            FROM [dbo].[fault_reports]
+            WHERE trans_num LIKE @prefix + @period + '%'
+
+            INSERT INTO [dbo].[trans_num_counters] ([prefix], [period], [last_value])
+            VALUES (@prefix, @period, @last_value)
+        END
+    COMMIT TRANSACTION
+
+    SET @first_value = @last_value - @count + 1
+END
+GO
+
 -- Procedure to generate transaction numbers
 IF EXISTS (SELECT * FROM sys.objects WHERE type = 'P' AND name = 'sp_generate_trans_num')
     DROP PROCEDURE [dbo].[sp_generate_trans_num];
@@ -339,16 +537,16 @@ CREATE PROCEDURE [dbo].[sp_generate_trans_num]
     @trans_num NVARCHAR(50) OUTPUT
 AS
 BEGIN
-    DECLARE @year NVARCHAR(4) = YEAR(GETDATE())
-    DECLARE @month NVARCHAR(2) = FORMAT(GETDATE(), 'MM')
+    SET NOCOUNT ON;
+
+    DECLARE @period CHAR(6)
     DECLARE @sequence INT
-    
-    -- Get next sequence number for current month
-    SELECT @sequence = ISNULL(MAX(CAST(RIGHT(trans_num, 4) AS INT)), 0) + 1
-    FROM [dbo].[fault_reports]
-    WHERE trans_num LIKE @prefix + @year + @month + '%'
-    
-    SET @trans_num = @prefix + @year + @month + FORMAT(@sequence, '0000')
+
+    -- Reserve the next number of the current month from the counter table
+    EXEC [dbo].[sp_allocate_trans_nums] @prefix = @prefix, @count = 1,
+        @period = @period OUTPUT, @first_value = @sequence OUTPUT
+
+    SET @trans_num = @prefix + @period + FORMAT(@sequence, '0000')
 END
 GO
 
@@ -364,9 +562,14 @@ CREATE PROCEDURE [dbo].[sp_add_inventory_transaction]
     @unit_cost DECIMAL(18,2) = NULL,
     @transaction_ref NVARCHAR(100) = NULL,
     @notes NTEXT = NULL,
-    @created_by INT
+    @created_by INT,
+    @log_action BIT = 1, -- 0 when the caller writes the audit entry itself (API audit queue)
+    @inventory_id INT = NULL OUTPUT
 AS
 BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
     BEGIN TRY
         -- Validate material exists
         IF NOT EXISTS (SELECT 1 FROM [dbo].[materials_info] WHERE material_code = @material_code AND is_active = 1)
@@ -374,27 +577,123 @@ BEGIN
             RAISERROR('Material code does not exist or is inactive', 16, 1)
             RETURN
         END
-        
+
+        DECLARE @transaction_date DATETIME2 = GETDATE()
+        -- Signed effect on the balance: receipts, returns and adjustments add; issues and damages remove
+        DECLARE @balance_delta DECIMAL(18,4) =
+            CASE WHEN @transaction_type IN ('issue', 'damage') THEN -@quantity ELSE @quantity END
+
+        BEGIN TRANSACTION
+
         -- Insert transaction
         INSERT INTO [dbo].[material_inventory] 
-        (material_code, transaction_type, transaction_ref, quantity, unit_cost, notes, created_by)
+        (material_code, transaction_type, transaction_ref, quantity, unit_cost, transaction_date, notes, created_by)
         VALUES 
-        (@material_code, @transaction_type, @transaction_ref, @quantity, @unit_cost, @notes, @created_by)
+        (@material_code, @transaction_type, @transaction_ref, @quantity, @unit_cost, @transaction_date, @notes, @created_by)
+
+        SET @inventory_id = SCOPE_IDENTITY()
+
+        -- Apply it to the running balance (row locked until commit)
+        UPDATE [dbo].[material_inventory_balances] WITH (UPDLOCK, HOLDLOCK)
+        SET total_receipts = total_receipts + CASE WHEN @transaction_type = 'receipt' THEN @quantity ELSE 0 END,
+            total_issues = total_issues + CASE WHEN @transaction_type = 'issue' THEN @quantity ELSE 0 END,
+            total_returns = total_returns + CASE WHEN @transaction_type = 'return' THEN @quantity ELSE 0 END,
+            total_damages = total_damages + CASE WHEN @transaction_type = 'damage' THEN @quantity ELSE 0 END,
+            total_adjustments = total_adjustments + CASE WHEN @transaction_type = 'adjustment' THEN @quantity ELSE 0 END,
+            current_balance = current_balance + @balance_delta,
+            last_transaction_date = CASE
+                WHEN last_transaction_date IS NULL OR last_transaction_date < @transaction_date THEN @transaction_date
+                ELSE last_transaction_date
+            END,
+            updated_at = GETDATE()
+        WHERE material_code = @material_code
+
+        IF @@ROWCOUNT = 0
+            INSERT INTO [dbo].[material_inventory_balances]
+            (material_code, total_receipts, total_issues, total_returns, total_damages, total_adjustments,
+             current_balance, last_transaction_date)
+            VALUES (
+                @material_code,
+                CASE WHEN @transaction_type = 'receipt' THEN @quantity ELSE 0 END,
+                CASE WHEN @transaction_type = 'issue' THEN @quantity ELSE 0 END,
+                CASE WHEN @transaction_type = 'return' THEN @quantity ELSE 0 END,
+                CASE WHEN @transaction_type = 'damage' THEN @quantity ELSE 0 END,
+                CASE WHEN @transaction_type = 'adjustment' THEN @quantity ELSE 0 END,
+                @balance_delta,
+                @transaction_date
+            )
         
         -- Log the action
-        INSERT INTO [dbo].[system_logs] (user_id, action, table_name, record_id, new_values)
-        VALUES (@created_by, 'INSERT', 'material_inventory', SCOPE_IDENTITY(), 
-                'Material: ' + @material_code + ', Type: ' + @transaction_type + ', Qty: ' + CAST(@quantity AS NVARCHAR))
+        IF @log_action = 1
+            INSERT INTO [dbo].[system_logs] (user_id, action, table_name, record_id, new_values)
+            VALUES (@created_by, 'INSERT', 'material_inventory', @inventory_id, 
+                    'Material: ' + @material_code + ', Type: ' + @transaction_type + ', Qty: ' + CAST(@quantity AS NVARCHAR))
+
+        COMMIT TRANSACTION
                 
     END TRY
     BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
         THROW
     END CATCH
 END
 GO
 
+-- Procedure to archive old audit log entries
+-- Moves system_logs rows older than @retention_days into system_logs_archive, @batch_size rows
+-- per transaction, so the live table stays small without long-held locks.
+IF EXISTS (SELECT * FROM sys.objects WHERE type = 'P' AND name = 'sp_archive_system_logs')
+    DROP PROCEDURE [dbo].[sp_archive_system_logs];
+GO
+
+CREATE PROCEDURE [dbo].[sp_archive_system_logs]
+    @retention_days INT = 90,
+    @batch_size INT = 5000,
+    @archived INT = 0 OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @cutoff DATETIME2 = DATEADD(DAY, -@retention_days, GETDATE())
+    DECLARE @moved INT = @batch_size
+    DECLARE @batch TABLE ([id] INT PRIMARY KEY)
+    SET @archived = 0
+
+    -- Copy then delete by id (OUTPUT ... INTO cannot carry the NTEXT payload columns)
+    WHILE @moved = @batch_size
+    BEGIN
+        DELETE FROM @batch
+
+        BEGIN TRANSACTION
+            INSERT INTO @batch ([id])
+            SELECT TOP (@batch_size) [id]
+            FROM [dbo].[system_logs] WITH (UPDLOCK)
+            WHERE created_at < @cutoff
+            ORDER BY created_at
+
+            SET @moved = @@ROWCOUNT
+
+            INSERT INTO [dbo].[system_logs_archive]
+                (id, user_id, action, table_name, record_id, old_values, new_values, ip_address, user_agent, created_at)
+            SELECT l.id, l.user_id, l.action, l.table_name, l.record_id, l.old_values, l.new_values,
+                   l.ip_address, l.user_agent, l.created_at
+            FROM [dbo].[system_logs] l
+            INNER JOIN @batch b ON b.[id] = l.[id]
+
+            DELETE l
+            FROM [dbo].[system_logs] l
+            INNER JOIN @batch b ON b.[id] = l.[id]
+        COMMIT TRANSACTION
+
+        SET @archived = @archived + @moved
+    END
+END
+GO
+
 -- =============================================
--- 12. Insert Default Data
+-- 16. Insert Default Data
 -- =============================================
 
 -- Insert default admin user (password hash for 'admin123' - should be properly hashed in production)
@@ -433,7 +732,7 @@ END
 GO
 
 -- =============================================
--- 13. Create Database User for API Access
+-- 17. Create Database User for API Access
 -- =============================================
 USE master;
 GO
@@ -462,21 +761,23 @@ ALTER ROLE [db_ddladmin] ADD MEMBER [kmk_sql];
 GO
 
 -- Grant execute permissions on stored procedures
+GRANT EXECUTE ON [dbo].[sp_allocate_trans_nums] TO [kmk_sql];
 GRANT EXECUTE ON [dbo].[sp_generate_trans_num] TO [kmk_sql];
 GRANT EXECUTE ON [dbo].[sp_add_inventory_transaction] TO [kmk_sql];
+GRANT EXECUTE ON [dbo].[sp_archive_system_logs] TO [kmk_sql];
 GO
 
 -- =============================================
--- 14. Final Setup Complete Message
+-- 18. Final Setup Complete Message
 -- =============================================
 PRINT '=================================================='
 PRINT 'MMP Fiber Fault Reporting System Database Setup Complete!'
 PRINT '=================================================='
 PRINT 'Database: api'
 PRINT 'User: kmk_sql'
-PRINT 'Tables Created: 9'
+PRINT 'Tables Created: 12'
 PRINT 'Views Created: 1'
-PRINT 'Stored Procedures Created: 2'
+PRINT 'Stored Procedures Created: 4'
 PRINT 'Sample Data Inserted: Yes'
 PRINT '=================================================='
 PRINT 'You can now connect your application using:'
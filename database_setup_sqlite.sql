@@ -0,0 +1,323 @@
+-- =============================================
+-- MMP Fiber Fault Reporting System Database Schema
+-- SQLite stand-in for local development and tests
+--
+-- Mirrors database_setup.sql (tables, keys, indexes and sample data) closely enough for
+-- the API to run against it. Dates are stored as 'YYYY-MM-DD HH:MM:SS' text, which sorts
+-- the same way as DATETIME2.
+-- =============================================
+
+PRAGMA foreign_keys = ON;
+
+-- =============================================
+-- 1. Users Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'user' CHECK (role IN ('admin', 'user', 'viewer')),
+    email TEXT NULL,
+    full_name TEXT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_login TEXT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_users_username ON users (username);
+CREATE INDEX IF NOT EXISTS IX_users_role ON users (role);
+CREATE INDEX IF NOT EXISTS IX_users_is_active ON users (is_active);
+
+-- =============================================
+-- 2. Materials Info Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS materials_info (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    material_code TEXT NOT NULL UNIQUE,
+    material_name TEXT NOT NULL,
+    material_type TEXT NULL,
+    uom TEXT NULL,
+    unit_price NUMERIC NULL,
+    kcn_price NUMERIC NULL,
+    sgg_price NUMERIC NULL,
+    description TEXT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_by INTEGER NULL REFERENCES users (id),
+    updated_by INTEGER NULL REFERENCES users (id)
+);
+CREATE INDEX IF NOT EXISTS IX_materials_info_code ON materials_info (material_code);
+CREATE INDEX IF NOT EXISTS IX_materials_info_type ON materials_info (material_type);
+CREATE INDEX IF NOT EXISTS IX_materials_info_active ON materials_info (is_active);
+
+-- =============================================
+-- 3. Services Info Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS services_info (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    service_code TEXT NOT NULL UNIQUE,
+    service_name TEXT NOT NULL,
+    service_type TEXT NULL,
+    uom TEXT NULL,
+    unit_price NUMERIC NULL,
+    kcn_price NUMERIC NULL,
+    sgg_price NUMERIC NULL,
+    description TEXT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_by INTEGER NULL REFERENCES users (id),
+    updated_by INTEGER NULL REFERENCES users (id)
+);
+CREATE INDEX IF NOT EXISTS IX_services_info_code ON services_info (service_code);
+CREATE INDEX IF NOT EXISTS IX_services_info_type ON services_info (service_type);
+CREATE INDEX IF NOT EXISTS IX_services_info_active ON services_info (is_active);
+
+-- =============================================
+-- 4. Fault Reports Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS fault_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trans_num TEXT NOT NULL UNIQUE,
+    project_name TEXT NOT NULL,
+    fault_name TEXT NOT NULL,
+    circuit_id TEXT NULL,
+    customer_name TEXT NULL,
+    customer_address TEXT NULL,
+    pic TEXT NULL,
+    region TEXT NOT NULL,
+    township TEXT NOT NULL,
+    location_lat NUMERIC NULL,
+    location_long NUMERIC NULL,
+    m_latitude NUMERIC NULL,
+    m_longitude NUMERIC NULL,
+    raised_time TEXT NOT NULL,
+    cleared_time TEXT NULL,
+    duration INTEGER GENERATED ALWAYS AS (
+        CASE
+            WHEN cleared_time IS NOT NULL AND raised_time IS NOT NULL
+            THEN CAST((julianday(cleared_time) - julianday(raised_time)) * 1440 AS INTEGER)
+            ELSE NULL
+        END
+    ) VIRTUAL,
+    root_cause TEXT NULL,
+    status TEXT NOT NULL DEFAULT 'open' CHECK (status IN ('open', 'in_progress', 'resolved', 'closed')),
+    priority TEXT NOT NULL DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high', 'critical')),
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    created_by INTEGER NOT NULL REFERENCES users (id),
+    updated_by INTEGER NULL REFERENCES users (id)
+);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_trans_num ON fault_reports (trans_num);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_region ON fault_reports (region);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_status ON fault_reports (status);
+-- SQL Server appends the clustered key (id) to every nonclustered index; SQLite needs it spelled out
+CREATE INDEX IF NOT EXISTS IX_fault_reports_raised_time ON fault_reports (raised_time, id);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_created_by ON fault_reports (created_by);
+
+-- =============================================
+-- 5. Report Photos Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS report_photos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL REFERENCES fault_reports (id) ON DELETE CASCADE,
+    original_name TEXT NOT NULL,
+    unique_name TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    label TEXT NULL,
+    thumbnail_path TEXT NULL, -- small JPEG for lists and previews
+    thumbnail_size INTEGER NULL,
+    web_path TEXT NULL, -- screen-sized JPEG
+    web_size INTEGER NULL,
+    uploaded_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    uploaded_by INTEGER NOT NULL REFERENCES users (id)
+);
+CREATE INDEX IF NOT EXISTS IX_report_photos_report_id ON report_photos (report_id);
+CREATE INDEX IF NOT EXISTS IX_report_photos_uploaded_by ON report_photos (uploaded_by);
+
+-- =============================================
+-- 6. Report Materials Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS report_materials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL REFERENCES fault_reports (id) ON DELETE CASCADE,
+    material_code TEXT NOT NULL REFERENCES materials_info (material_code),
+    material_name TEXT NOT NULL,
+    material_type TEXT NULL,
+    uom TEXT NULL,
+    material_usage NUMERIC NOT NULL,
+    unit_cost NUMERIC NULL,
+    total_cost NUMERIC GENERATED ALWAYS AS (material_usage * unit_cost) VIRTUAL,
+    notes TEXT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_report_materials_report_id ON report_materials (report_id);
+CREATE INDEX IF NOT EXISTS IX_report_materials_material_code ON report_materials (material_code);
+
+-- =============================================
+-- 7. Report Services Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS report_services (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    report_id INTEGER NOT NULL REFERENCES fault_reports (id) ON DELETE CASCADE,
+    service_code TEXT NOT NULL REFERENCES services_info (service_code),
+    service_name TEXT NOT NULL,
+    service_type TEXT NULL,
+    uom TEXT NULL,
+    service_usage NUMERIC NOT NULL,
+    unit_cost NUMERIC NULL,
+    total_cost NUMERIC GENERATED ALWAYS AS (service_usage * unit_cost) VIRTUAL,
+    notes TEXT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_report_services_report_id ON report_services (report_id);
+CREATE INDEX IF NOT EXISTS IX_report_services_service_code ON report_services (service_code);
+
+-- =============================================
+-- 8. Material Inventory Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS material_inventory (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    material_code TEXT NOT NULL REFERENCES materials_info (material_code),
+    transaction_type TEXT NOT NULL CHECK (transaction_type IN ('receipt', 'issue', 'return', 'damage', 'adjustment')),
+    transaction_ref TEXT NULL,
+    quantity NUMERIC NOT NULL,
+    unit_cost NUMERIC NULL,
+    total_value NUMERIC GENERATED ALWAYS AS (quantity * unit_cost) VIRTUAL,
+    transaction_date TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    notes TEXT NULL,
+    created_by INTEGER NOT NULL REFERENCES users (id),
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_material_inventory_material_code ON material_inventory (material_code);
+CREATE INDEX IF NOT EXISTS IX_material_inventory_type ON material_inventory (transaction_type);
+CREATE INDEX IF NOT EXISTS IX_material_inventory_date ON material_inventory (transaction_date);
+CREATE INDEX IF NOT EXISTS IX_material_inventory_created_by ON material_inventory (created_by);
+
+-- =============================================
+-- 9. System Logs Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS system_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NULL REFERENCES users (id),
+    action TEXT NOT NULL,
+    table_name TEXT NULL,
+    record_id INTEGER NULL,
+    old_values TEXT NULL,
+    new_values TEXT NULL,
+    ip_address TEXT NULL,
+    user_agent TEXT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_system_logs_user_id ON system_logs (user_id);
+CREATE INDEX IF NOT EXISTS IX_system_logs_action ON system_logs (action);
+CREATE INDEX IF NOT EXISTS IX_system_logs_created_at ON system_logs (created_at);
+
+-- =============================================
+-- 10. System Logs Archive Table
+-- =============================================
+-- Entries moved out of system_logs by audit_log.archive_system_logs()
+CREATE TABLE IF NOT EXISTS system_logs_archive (
+    id INTEGER PRIMARY KEY, -- id the entry had in system_logs
+    user_id INTEGER NULL,
+    action TEXT NOT NULL,
+    table_name TEXT NULL,
+    record_id INTEGER NULL,
+    old_values TEXT NULL,
+    new_values TEXT NULL,
+    ip_address TEXT NULL,
+    user_agent TEXT NULL,
+    created_at TEXT NOT NULL,
+    archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_system_logs_archive_created_at ON system_logs_archive (created_at);
+
+-- =============================================
+-- 11. Transaction Number Counters Table
+-- =============================================
+CREATE TABLE IF NOT EXISTS trans_num_counters (
+    prefix TEXT NOT NULL,
+    period TEXT NOT NULL, -- YYYYMM
+    last_value INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (prefix, period)
+);
+
+-- =============================================
+-- 12. Material Inventory Balances Table
+-- =============================================
+-- Running per-material totals, maintained by the API alongside every material_inventory insert
+CREATE TABLE IF NOT EXISTS material_inventory_balances (
+    material_code TEXT NOT NULL PRIMARY KEY REFERENCES materials_info (material_code),
+    total_receipts NUMERIC NOT NULL DEFAULT 0,
+    total_issues NUMERIC NOT NULL DEFAULT 0,
+    total_returns NUMERIC NOT NULL DEFAULT 0,
+    total_damages NUMERIC NOT NULL DEFAULT 0,
+    total_adjustments NUMERIC NOT NULL DEFAULT 0,
+    current_balance NUMERIC NOT NULL DEFAULT 0,
+    last_transaction_date TEXT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- =============================================
+-- 13. Query-Pattern Indexes
+-- =============================================
+-- Mirrors the SQL Server section (SQLite has no INCLUDE, so covered columns join the key).
+-- index_benchmark.py drops and recreates exactly the indexes listed here.
+CREATE INDEX IF NOT EXISTS IX_fault_reports_status_region_raised
+    ON fault_reports (status, region, raised_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_region_raised
+    ON fault_reports (region, raised_time DESC, id DESC);
+CREATE INDEX IF NOT EXISTS IX_fault_reports_active_raised
+    ON fault_reports (raised_time DESC, id DESC)
+    WHERE status IN ('open', 'in_progress');
+CREATE INDEX IF NOT EXISTS IX_material_inventory_code_date
+    ON material_inventory (material_code, transaction_date, id);
+CREATE INDEX IF NOT EXISTS IX_material_inventory_code_type
+    ON material_inventory (material_code, transaction_type, quantity, transaction_date);
+
+-- =============================================
+-- 14. Material Inventory Summary View
+-- =============================================
+CREATE VIEW IF NOT EXISTS vw_material_inventory_summary AS
+SELECT
+    mi.material_code,
+    mi.material_name,
+    mi.material_type,
+    mi.uom,
+    COALESCE(b.total_receipts, 0) AS total_receipts,
+    COALESCE(b.total_issues, 0) AS total_issues,
+    COALESCE(b.total_returns, 0) AS total_returns,
+    COALESCE(b.total_damages, 0) AS total_damages,
+    COALESCE(b.total_adjustments, 0) AS total_adjustments,
+    COALESCE(b.current_balance, 0) AS current_balance,
+    b.last_transaction_date
+FROM materials_info mi
+LEFT JOIN material_inventory_balances b ON mi.material_code = b.material_code
+WHERE mi.is_active = 1;
+
+-- =============================================
+-- 15. Default Data
+-- =============================================
+INSERT OR IGNORE INTO users (id, username, password_hash, role, full_name, email)
+VALUES (1, 'admin', '$2b$12$LQv3c1yqBwWVHGkGH2Yk6OeTQGP0YC8LjRzMmjLQEj9N7CfUIz.V6', 'admin', 'System Administrator', 'admin@mmp.com');
+
+INSERT OR IGNORE INTO materials_info (material_code, material_name, material_type, uom, unit_price, created_by)
+VALUES
+('FO-001', 'Single Mode Fiber Optic Cable', 'Cable', 'Meter', 15.50, 1),
+('FO-002', 'Multi Mode Fiber Optic Cable', 'Cable', 'Meter', 12.75, 1),
+('CN-001', 'SC/UPC Connector', 'Connector', 'Piece', 5.25, 1),
+('CN-002', 'LC/UPC Connector', 'Connector', 'Piece', 6.80, 1),
+('SP-001', 'Fusion Splicer Machine', 'Equipment', 'Unit', 15000.00, 1),
+('TO-001', 'OTDR Tester', 'Tool', 'Unit', 8500.00, 1);
+
+INSERT OR IGNORE INTO services_info (service_code, service_name, service_type, uom, unit_price, created_by)
+VALUES
+('SV-001', 'Fiber Splicing Service', 'Installation', 'Joint', 25.00, 1),
+('SV-002', 'Cable Installation', 'Installation', 'Meter', 8.50, 1),
+('SV-003', 'Network Testing', 'Testing', 'Hour', 75.00, 1),
+('SV-004', 'Fault Diagnosis', 'Maintenance', 'Hour', 85.00, 1),
+('SV-005', 'Site Survey', 'Planning', 'Site', 150.00, 1);
@@ -0,0 +1,253 @@
+"""
+Database Connection Pool for the MMP Fiber Fault Reporting API
+
+A small bounded pool shared by the API blueprints. Connections come from a factory: pyodbc
+against the SQL Server database in database_config.json, or sqlite3 as a local stand-in for
+tests (database_setup_sqlite.sql). Both drivers use '?' placeholders; the few statements that
+differ between the two (row limits, identity retrieval) check pool.dialect.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).with_name('database_config.json')
+SQLITE_SCHEMA_PATH = Path(__file__).with_name('database_setup_sqlite.sql')
+ODBC_DRIVER = '{ODBC Driver 17 for SQL Server}'
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_ACQUIRE_TIMEOUT = 30
+DEFAULT_IDLE_TIMEOUT = 30
+# Rows fetched per round trip when streaming a large result
+EXPORT_FETCH_SIZE = 1000
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within the acquire timeout."""
+
+
+class ConnectionPool:
+    """
+    Bounded pool of DB-API connections.
+
+    At most max_size connections exist at once; callers beyond that wait up to timeout seconds
+    for one to be returned. Idle connections are reused newest first, and ones left idle longer
+    than idle_timeout seconds are closed instead of reused.
+    """
+
+    def __init__(self, connect, max_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_ACQUIRE_TIMEOUT,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, dialect='mssql'):
+        """
+        Args:
+            connect (callable): Returns a new DB-API connection.
+            max_size (int): Most connections open at once.
+            timeout (float): Seconds to wait for a free connection before PoolTimeout.
+            idle_timeout (float | None): Seconds an idle connection is kept; None keeps it forever.
+            dialect (str): 'mssql' or 'sqlite'.
+        """
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.dialect = dialect
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = queue.LifoQueue(maxsize=max_size)
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if self.idle_timeout is None or time.monotonic() - returned_at < self.idle_timeout:
+                return conn
+            _close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a with-block.
+
+        The transaction is committed when the block exits normally and rolled back if it
+        raises. A connection that cannot even be rolled back is closed rather than pooled.
+
+        Raises:
+            PoolTimeout: If every connection stays busy for longer than the pool timeout.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"No database connection available within {self.timeout}s")
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except Exception:
+                    _close_quietly(conn)
+                else:
+                    self._idle.put_nowait((conn, time.monotonic()))
+                raise
+            self._idle.put_nowait((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        """Closes every idle connection (connections in use are closed when returned late)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close_quietly(conn)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+# --- Connection Factories ---
+def mssql_connection_string(connection_config):
+    """Builds an ODBC connection string from the "connection" block of database_config.json."""
+    options = connection_config.get('options', {})
+    parts = [
+        f"DRIVER={ODBC_DRIVER}",
+        f"SERVER={connection_config['server']}",
+        f"DATABASE={connection_config['database']}",
+        f"UID={connection_config['user']}",
+        f"PWD={connection_config['password']}",
+        f"Encrypt={'yes' if options.get('encrypt') else 'no'}",
+        f"TrustServerCertificate={'yes' if options.get('trustServerCertificate') else 'no'}",
+    ]
+    return ';'.join(parts) + ';'
+
+
+def mssql_connector(connection_config):
+    """Returns a factory of pyodbc connections (pyodbc is only imported when one is opened)."""
+    conn_str = mssql_connection_string(connection_config)
+    timeout = connection_config.get('options', {}).get('connectionTimeout', 30000) // 1000
+
+    def connect():
+        import pyodbc
+        conn = pyodbc.connect(conn_str, timeout=timeout)
+        conn.autocommit = False
+        return conn
+    return connect
+
+
+def sqlite_connector(path):
+    """Returns a factory of sqlite3 connections to path, usable from any request thread."""
+    def connect():
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+    return connect
+
+
+def create_sqlite_database(path, schema_path=SQLITE_SCHEMA_PATH):
+    """Creates (or completes) a SQLite database from the stand-in schema script."""
+    with sqlite3.connect(str(path)) as conn:
+        conn.executescript(Path(schema_path).read_text(encoding='utf-8'))
+
+
+def pool_from_config(config_path=CONFIG_PATH):
+    """Builds the SQL Server pool described by database_config.json (pool.max, idleTimeoutMillis)."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        connection_config = json.load(f)['database']['connection']
+    options = connection_config.get('options', {})
+    pool_options = options.get('pool', {})
+    return ConnectionPool(
+        mssql_connector(connection_config),
+        max_size=pool_options.get('max', DEFAULT_POOL_SIZE),
+        timeout=options.get('requestTimeout', DEFAULT_ACQUIRE_TIMEOUT * 1000) / 1000,
+        idle_timeout=pool_options.get('idleTimeoutMillis', DEFAULT_IDLE_TIMEOUT * 1000) / 1000,
+        dialect='mssql',
+    )
+
+
+# --- Query Helpers ---
+def current_pool():
+    """The pool of the running API app (set up by api_server.create_app)."""
+    from flask import current_app
+    return current_app.extensions['db_pool']
+
+
+def limited_select(dialect, select_list, rest, limit):
+    """
+    Builds "SELECT <select_list> <rest>" returning at most limit rows.
+
+    Returns:
+        tuple[str, list, list]: The statement, and the limit parameter to put before and after
+            the caller's own parameters (SQL Server takes it first with TOP, SQLite last with LIMIT).
+    """
+    if dialect == 'mssql':
+        return f"SELECT TOP (?) {select_list} {rest}", [limit], []
+    return f"SELECT {select_list} {rest} LIMIT ?", [], [limit]
+
+
+def fetch_dicts(cursor):
+    """Returns the remaining rows of cursor as dicts keyed by column name."""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def iter_rows(cursor, batch_size=EXPORT_FETCH_SIZE):
+    """
+    Yields the remaining rows of cursor, fetching batch_size at a time.
+
+    pyodbc reads SQL Server results off the connection as they are fetched, so a large export
+    never holds more than one batch in memory.
+    """
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def date_range(dialect, start=None, end=None, month=None):
+    """
+    Bound values for "column >= ? AND column < ?" from YYYY-MM-DD dates (end inclusive) or a
+    YYYY-MM month.
+
+    Returns:
+        tuple: (lower, upper), either None when not given; SQLite gets the text form it stores.
+
+    Raises:
+        ValueError: For a malformed date or month.
+    """
+    if month:
+        lower = datetime.strptime(month, '%Y-%m')
+        upper = (lower + timedelta(days=32)).replace(day=1)
+    else:
+        lower = datetime.strptime(start, '%Y-%m-%d') if start else None
+        upper = datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1) if end else None
+    if dialect == 'sqlite':
+        return tuple(bound.strftime('%Y-%m-%d %H:%M:%S') if bound else None for bound in (lower, upper))
+    return lower, upper
+
+
+def to_json_value(value):
+    """Converts driver values (datetime, Decimal, bytes) into JSON-safe ones."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def json_row(row):
+    """to_json_value() applied to every column of a row dict."""
+    return {key: to_json_value(value) for key, value in row.items()}
@@ -5,12 +5,41 @@ This module provides functionality to detect and match RFO expressions against
 a standardized database of fault codes and descriptions.
 """
 
+import os
 import re
 import difflib
-from typing import Dict, List, Tuple, Union, Optional
+import hashlib
+import marshal
+import threading
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple, Union, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    from rapidfuzz import fuzz, process as rapidfuzz_process
+except ImportError:  # Optional: fuzzy matching falls back to pure-Python bounds
+    fuzz = None
+    rapidfuzz_process = None
+
+# Character n-gram length used by the candidate index
+NGRAM_SIZE = 3
+# Number of best trigram-overlap candidates scored before the remaining entries are bound-checked
+FUZZY_TOP_K = 8
+# Distinct normalized texts remembered by each detector's batch classifier
+CLASSIFY_CACHE_SIZE = 65536
+# Batch classification only fans out to worker processes for at least this many unseen texts
+PARALLEL_MIN_UNIQUE = 5000
+# Texts sent to a worker process per task
+PARALLEL_CHUNK_SIZE = 1000
+# Column names returned by RFODetector.detect_rfo_expressions()
+BATCH_RESULT_COLUMNS = ("RFO_CODE", "RFO_ROOT_CAUSE", "RFO_PRIORITY")
+# Parsed table + trigram index, cached next to this module; bump the format when its layout changes
+INDEX_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".rfo_index_cache")
+INDEX_CACHE_FORMAT = 1
+
 
 class Priority(Enum):
     """Enumeration for RFO priority levels."""
@@ -20,9 +49,9 @@ class Priority(Enum):
     CONTEXTUAL_FACTOR = "Contextual Factor"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RFOEntry:
-    """Data class representing an RFO entry."""
+    """Data class representing an RFO entry (immutable, so indexes can share instances)."""
     code: str
     root_caused: str
     priority: Priority
@@ -256,9 +285,112 @@ Code	Root_Caused	Priority
 00216	Site access issue	Critical Impact
 """
 
-    def __init__(self):
-        """Initialize the RFO detector with parsed data."""
-        self.rfo_entries: List[RFOEntry] = self._parse_rfo_data()
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize the RFO detector with parsed data.
+
+        Args:
+            use_cache: Load the parsed table and trigram index from INDEX_CACHE_PATH when it was
+                built from the same _DATA_STRING, and (re)write it otherwise
+        """
+        cache_key = self._index_cache_key()
+        cached = _load_index_cache(cache_key) if use_cache else None
+        if cached is not None:
+            rows, ngram_index = cached
+            self.rfo_entries: List[RFOEntry] = [
+                RFOEntry(code=code, root_caused=root_caused, priority=Priority(priority),
+                         normalized_root_caused=normalized)
+                for code, root_caused, priority, normalized in rows
+            ]
+            self._build_indexes(ngram_index)
+        else:
+            self.rfo_entries = self._parse_rfo_data()
+            self._build_indexes()
+            if use_cache:
+                rows = [(rfo.code, rfo.root_caused, rfo.priority.value, rfo.normalized_root_caused)
+                        for rfo in self.rfo_entries]
+                _save_index_cache(cache_key, (rows, self._ngram_index))
+        self._classify_cache: "OrderedDict[Tuple[str, float], Optional[RFOEntry]]" = OrderedDict()
+        self._classify_cache_lock = threading.Lock()
+
+    @classmethod
+    def _index_cache_key(cls) -> str:
+        """Identifies the table (and index layout) a cached index was built from."""
+        return f"{INDEX_CACHE_FORMAT}:{NGRAM_SIZE}:{rfo_table_version(cls._DATA_STRING)}"
+
+    def _build_indexes(self, ngram_index: Optional[Dict[str, List[int]]] = None) -> None:
+        """
+        Build the lookup structures used by the matchers and lookups:
+        - normalized text -> first entry with that text (exact matches)
+        - trigram -> entry indexes (candidate generation for fuzzy, substring and search)
+        - code -> entry, code -> priority label and priority -> entries
+
+        Args:
+            ngram_index: Previously built trigram index to reuse (e.g. from the index cache)
+        """
+        self._normalized: List[str] = [rfo.normalized_root_caused for rfo in self.rfo_entries]
+        self._exact_index: Dict[str, RFOEntry] = {}
+        self._code_index: Dict[str, RFOEntry] = {}
+        priority_buckets: Dict[Priority, List[RFOEntry]] = {}
+        for rfo in self.rfo_entries:
+            self._exact_index.setdefault(rfo.normalized_root_caused, rfo)
+            self._code_index.setdefault(rfo.code, rfo)
+            priority_buckets.setdefault(rfo.priority, []).append(rfo)
+        self._priority_index: Dict[Priority, Tuple[RFOEntry, ...]] = {
+            priority: tuple(entries) for priority, entries in priority_buckets.items()
+        }
+        self._code_priorities: Dict[str, str] = {code: rfo.priority.value for code, rfo in self._code_index.items()}
+
+        if ngram_index is not None:
+            self._ngram_index: Dict[str, List[int]] = ngram_index
+            self._ngram_counts: List[int] = [0] * len(self._normalized)
+            for postings in ngram_index.values():
+                for idx in postings:
+                    self._ngram_counts[idx] += 1
+        else:
+            self._ngram_index = {}
+            self._ngram_counts = []
+            for idx, text in enumerate(self._normalized):
+                grams = self._ngrams(text)
+                self._ngram_counts.append(len(grams))
+                for gram in grams:
+                    self._ngram_index.setdefault(gram, []).append(idx)
+        # Entries too short to have a trigram can only be found by scanning them
+        self._short_entries: List[int] = [idx for idx, n in enumerate(self._ngram_counts) if n == 0]
+
+        # Substring search: all texts joined by a separator normalized text never contains, so one
+        # str.find() finds the earliest entry containing a query; plus entries keyed by their
+        # first trigram, for entries contained in a query
+        self._joined_texts = "\n".join(self._normalized)
+        self._text_offsets: List[int] = []
+        offset = 0
+        for text in self._normalized:
+            self._text_offsets.append(offset)
+            offset += len(text) + 1
+        self._leading_ngram_index: Dict[str, List[int]] = {}
+        for idx, text in enumerate(self._normalized):
+            if len(text) >= NGRAM_SIZE:
+                self._leading_ngram_index.setdefault(text[:NGRAM_SIZE], []).append(idx)
+
+    @staticmethod
+    def _ngrams(text: str) -> set:
+        """Distinct character n-grams (NGRAM_SIZE) of a string."""
+        return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+    def _shared_ngram_counts(self, normalized_expression: str) -> Tuple[int, Counter]:
+        """
+        Count, per entry index, how many of the expression's trigrams it shares.
+
+        Returns:
+            Tuple of (number of distinct expression trigrams, Counter of entry index -> shared trigrams)
+        """
+        grams = self._ngrams(normalized_expression)
+        shared = Counter()
+        for gram in grams:
+            postings = self._ngram_index.get(gram)
+            if postings:
+                shared.update(postings)
+        return len(grams), shared
         
     @staticmethod
     def _normalize_text(text: str) -> str:
@@ -360,60 +492,217 @@ Code	Root_Caused	Priority
         if not normalized_expression:
             return "Expression contains no valid characters"
         
+        match = self._match_normalized(normalized_expression, fuzzy_threshold)
+        if match is not None:
+            return (match.code, match.root_caused)
+        return "expression need to be upgrade"
+
+    def _match_normalized(self, normalized_expression: str, fuzzy_threshold: float) -> Optional[RFOEntry]:
+        """Run the matching strategies, in priority order, on an already normalized expression."""
+        if not normalized_expression:
+            return None
+
         # Strategy 1: Exact match (highest priority)
-        exact_match = self._find_exact_match(normalized_expression)
-        if exact_match:
-            return exact_match
-        
+        match = self._find_exact_match(normalized_expression)
+
         # Strategy 2: Fuzzy matching
-        fuzzy_match = self._find_fuzzy_match(normalized_expression, fuzzy_threshold)
-        if fuzzy_match:
-            return fuzzy_match
-        
+        if match is None:
+            match = self._find_fuzzy_match(normalized_expression, fuzzy_threshold)
+
         # Strategy 3: Substring matching
-        substring_match = self._find_substring_match(normalized_expression)
-        if substring_match:
-            return substring_match
-        
-        return "expression need to be upgrade"
+        if match is None:
+            match = self._find_substring_match(normalized_expression)
 
-    def _find_exact_match(self, normalized_expression: str) -> Optional[Tuple[str, str]]:
-        """Find exact match for normalized expression."""
-        for rfo in self.rfo_entries:
-            if normalized_expression == rfo.normalized_root_caused:
-                return (rfo.code, rfo.root_caused)
-        return None
+        return match
 
-    def _find_fuzzy_match(self, normalized_expression: str, threshold: float) -> Optional[Tuple[str, str]]:
-        """Find best fuzzy match above threshold."""
-        best_match = None
-        highest_similarity = 0.0
-        
-        for rfo in self.rfo_entries:
-            similarity = difflib.SequenceMatcher(
-                None, 
-                normalized_expression, 
-                rfo.normalized_root_caused
-            ).ratio()
-            
-            if similarity >= threshold and similarity > highest_similarity:
-                highest_similarity = similarity
-                best_match = (rfo.code, rfo.root_caused)
-        
-        return best_match
+    def detect_rfo_expressions(self, expressions: Iterable[Any], fuzzy_threshold: float = 0.8,
+                               max_workers: Optional[int] = None) -> Union[Dict[str, List[Optional[str]]], Any]:
+        """
+        Classify many expressions at once, e.g. a whole root-cause column.
 
-    def _find_substring_match(self, normalized_expression: str) -> Optional[Tuple[str, str]]:
-        """Find substring match (bidirectional)."""
-        for rfo in self.rfo_entries:
-            # Check if expression is contained in RFO
-            if normalized_expression in rfo.normalized_root_caused:
-                return (rfo.code, rfo.root_caused)
-            
-            # Check if RFO is contained in expression
-            if rfo.normalized_root_caused in normalized_expression:
-                return (rfo.code, rfo.root_caused)
-        
-        return None
+        Values are normalized and deduplicated first, so each distinct text is matched once;
+        results are also kept in a bounded LRU cache (CLASSIFY_CACHE_SIZE) across calls.
+        Non-string and blank values get no match.
+
+        Args:
+            expressions: pandas Series or any iterable of values
+            fuzzy_threshold: Minimum similarity ratio (0.0 to 1.0) for fuzzy matching
+            max_workers: Worker processes for large batches (at least PARALLEL_MIN_UNIQUE
+                uncached texts); None or 1 classifies in this process
+
+        Returns:
+            Dict with RFO_CODE, RFO_ROOT_CAUSE and RFO_PRIORITY lists aligned with the input
+            (None where nothing matched), or a DataFrame with those columns and the Series'
+            index when a pandas Series is given
+        """
+        if not 0.0 <= fuzzy_threshold <= 1.0:
+            raise ValueError("fuzzy_threshold must be between 0.0 and 1.0")
+
+        values = list(expressions)
+        normalized_by_value = {}
+        for value in values:
+            if value not in normalized_by_value:
+                normalized_by_value[value] = self._normalize_text(value) if isinstance(value, str) else ""
+        unique_texts = set(normalized_by_value.values())
+        unique_texts.discard("")
+
+        matches: Dict[str, Optional[RFOEntry]] = {"": None}
+        uncached = []
+        with self._classify_cache_lock:
+            for text in unique_texts:
+                key = (text, fuzzy_threshold)
+                if key in self._classify_cache:
+                    self._classify_cache.move_to_end(key)
+                    matches[text] = self._classify_cache[key]
+                else:
+                    uncached.append(text)
+
+        if max_workers and max_workers > 1 and len(uncached) >= PARALLEL_MIN_UNIQUE:
+            new_matches = self._classify_in_processes(uncached, fuzzy_threshold, max_workers)
+        else:
+            new_matches = {text: self._match_normalized(text, fuzzy_threshold) for text in uncached}
+        matches.update(new_matches)
+        self._remember_matches(new_matches, fuzzy_threshold)
+
+        entries = [matches[normalized_by_value[value]] for value in values]
+        result = {
+            "RFO_CODE": [rfo.code if rfo else None for rfo in entries],
+            "RFO_ROOT_CAUSE": [rfo.root_caused if rfo else None for rfo in entries],
+            "RFO_PRIORITY": [rfo.priority.value if rfo else None for rfo in entries],
+        }
+
+        if hasattr(expressions, "index") and hasattr(expressions, "to_frame"):
+            import pandas as pd
+            return pd.DataFrame(result, index=expressions.index, columns=list(BATCH_RESULT_COLUMNS))
+        return result
+
+    def _remember_matches(self, matches: Dict[str, Optional[RFOEntry]], fuzzy_threshold: float) -> None:
+        """Add batch results to the LRU cache, evicting the least recently used beyond CLASSIFY_CACHE_SIZE."""
+        with self._classify_cache_lock:
+            for text, match in matches.items():
+                self._classify_cache[(text, fuzzy_threshold)] = match
+            while len(self._classify_cache) > CLASSIFY_CACHE_SIZE:
+                self._classify_cache.popitem(last=False)
+
+    def _classify_in_processes(self, normalized_texts: List[str], fuzzy_threshold: float,
+                               max_workers: int) -> Dict[str, Optional[RFOEntry]]:
+        """Classify normalized texts across worker processes; entries come back by index."""
+        chunks = [normalized_texts[i:i + PARALLEL_CHUNK_SIZE]
+                  for i in range(0, len(normalized_texts), PARALLEL_CHUNK_SIZE)]
+        matches = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for chunk, indexes in zip(chunks, executor.map(_classify_chunk, chunks,
+                                                           [fuzzy_threshold] * len(chunks))):
+                for text, idx in zip(chunk, indexes):
+                    matches[text] = self.rfo_entries[idx] if idx is not None else None
+        return matches
+
+    def _find_exact_match(self, normalized_expression: str) -> Optional[RFOEntry]:
+        """Find exact match for normalized expression (first entry wins on duplicates)."""
+        return self._exact_index.get(normalized_expression)
+
+    def _find_fuzzy_match(self, normalized_expression: str, threshold: float) -> Optional[RFOEntry]:
+        """
+        Find best fuzzy match above threshold.
+
+        Scores are difflib.SequenceMatcher ratios, exactly as a full scan would compute them, and
+        ties go to the earliest entry. Only entries whose similarity upper bound can still beat the
+        best score so far are scored: with rapidfuzz installed the bound is its LCS-based ratio,
+        otherwise trigram-overlap candidates are scored first and the rest are checked against the
+        length and character-multiset bounds.
+        """
+        if rapidfuzz_process is not None:
+            # fuzz.ratio is 2*LCS/(len(a)+len(b)); difflib's matching blocks never exceed the LCS
+            scored = rapidfuzz_process.extract(
+                normalized_expression, self._normalized, scorer=fuzz.ratio,
+                score_cutoff=max(threshold * 100 - 1e-6, 0), limit=None)
+            candidates = sorted(((score / 100 + 1e-9, idx) for _, score, idx in scored),
+                                key=lambda c: (-c[0], c[1]))
+            best = self._best_ratio(normalized_expression, candidates, threshold, sorted_bounds=True)
+            return self.rfo_entries[best[0]] if best else None
+
+        _, shared = self._shared_ngram_counts(normalized_expression)
+        top = {idx for idx, _ in sorted(shared.items(), key=lambda c: (-c[1], c[0]))[:FUZZY_TOP_K]}
+        best = self._best_ratio(normalized_expression, [(1.0, idx) for idx in sorted(top)], threshold)
+        best_score = best[1] if best else 0.0
+
+        expression_chars = Counter(normalized_expression)
+        len_expression = len(normalized_expression)
+        rest = []
+        for idx, text in enumerate(self._normalized):
+            if idx in top or not text:
+                continue
+            total = len_expression + len(text)
+            # real_quick_ratio and quick_ratio bounds, cheapest first
+            bound = 2.0 * min(len_expression, len(text)) / total
+            if bound < threshold or bound < best_score:
+                continue
+            bound = 2.0 * sum((expression_chars & Counter(text)).values()) / total
+            if bound < threshold or bound < best_score:
+                continue
+            rest.append((bound, idx))
+        best = self._best_ratio(normalized_expression, rest, threshold, best=best)
+        return self.rfo_entries[best[0]] if best else None
+
+    def _best_ratio(self, normalized_expression: str, candidates: List[Tuple[float, int]],
+                    threshold: float, best: Optional[Tuple[int, float]] = None,
+                    sorted_bounds: bool = False) -> Optional[Tuple[int, float]]:
+        """
+        Score candidates with difflib and keep the best (earliest on ties).
+
+        Args:
+            normalized_expression: Normalized query
+            candidates: (similarity upper bound, entry index) pairs
+            threshold: Minimum similarity ratio
+            best: (entry index, ratio) to beat, from an earlier candidate batch
+            sorted_bounds: Candidates are ordered by descending bound, so scoring can stop early
+
+        Returns:
+            (entry index, ratio) of the best match, or None if nothing reached the threshold
+        """
+        best_idx, best_score = best if best else (None, 0.0)
+        for bound, idx in candidates:
+            if bound < best_score:
+                if sorted_bounds:
+                    break
+                continue
+            if best_idx is not None and bound == best_score and idx > best_idx:
+                continue
+            similarity = difflib.SequenceMatcher(None, normalized_expression, self._normalized[idx]).ratio()
+            if similarity < threshold or similarity == 0.0:
+                continue
+            if similarity > best_score or (similarity == best_score and idx < best_idx):
+                best_idx, best_score = idx, similarity
+
+        if best_idx is None:
+            return None
+        return (best_idx, best_score)
+
+    def _find_substring_match(self, normalized_expression: str) -> Optional[RFOEntry]:
+        """
+        Find substring match (bidirectional), returning the earliest matching entry.
+
+        Entries containing the expression are found with one search over the joined entry texts;
+        an entry can only be contained in the expression if its first trigram occurs there, so
+        only those entries (plus entries too short to index) are checked the other way round.
+        """
+        best = None
+
+        # Check if expression is contained in RFO
+        position = self._joined_texts.find(normalized_expression)
+        if position != -1:
+            best = bisect_right(self._text_offsets, position) - 1
+
+        # Check if RFO is contained in expression
+        for gram in self._ngrams(normalized_expression):
+            for idx in self._leading_ngram_index.get(gram, ()):
+                if (best is None or idx < best) and self._normalized[idx] in normalized_expression:
+                    best = idx
+        for idx in self._short_entries:
+            if (best is None or idx < best) and self._normalized[idx] in normalized_expression:
+                best = idx
+
+        return self.rfo_entries[best] if best is not None else None
 
     def get_rfo_by_code(self, code: str) -> Optional[RFOEntry]:
         """
@@ -425,10 +714,7 @@ Code	Root_Caused	Priority
         Returns:
             RFOEntry if found, None otherwise
         """
-        for rfo in self.rfo_entries:
-            if rfo.code == code:
-                return rfo
-        return None
+        return self._code_index.get(code)
 
     def get_rfos_by_priority(self, priority: Priority) -> List[RFOEntry]:
         """
@@ -440,7 +726,16 @@ Code	Root_Caused	Priority
         Returns:
             List of RFOEntry objects with matching priority
         """
-        return [rfo for rfo in self.rfo_entries if rfo.priority == priority]
+        return list(self._priority_index.get(priority, ()))
+
+    def code_priority_map(self) -> Dict[str, str]:
+        """
+        Get a code -> priority label mapping, e.g. for df['RFO_CODE'].map(detector.code_priority_map()).
+
+        Returns:
+            Dict of RFO code to Priority value (a copy; safe to modify)
+        """
+        return dict(self._code_priorities)
 
     def search_rfos(self, search_term: str) -> List[RFOEntry]:
         """
@@ -455,47 +750,121 @@ Code	Root_Caused	Priority
         normalized_search = self._normalize_text(search_term)
         if not normalized_search:
             return []
-        
-        matches = []
-        for rfo in self.rfo_entries:
-            if normalized_search in rfo.normalized_root_caused:
-                matches.append(rfo)
-        
-        return matches
+
+        # Only entries holding every trigram of the search term can contain it
+        grams = self._ngrams(normalized_search)
+        if grams:
+            postings = sorted((self._ngram_index.get(gram, []) for gram in grams), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidates = range(len(self.rfo_entries))
+
+        return [self.rfo_entries[idx] for idx in sorted(candidates)
+                if normalized_search in self._normalized[idx]]
+
+
+def rfo_table_version(data_string: str = RFODetector._DATA_STRING) -> str:
+    """Short hash of an RFO table; anything derived from another table version is stale."""
+    return hashlib.sha256(data_string.encode('utf-8')).hexdigest()[:16]
+
+
+def _load_index_cache(cache_key: str) -> Optional[Tuple[list, Dict[str, List[int]]]]:
+    """Read (rows, trigram index) from INDEX_CACHE_PATH if it was built for cache_key."""
+    try:
+        with open(INDEX_CACHE_PATH, 'rb') as f:
+            key, rows, ngram_index = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if key != cache_key:
+        return None
+    return rows, ngram_index
+
+
+def _save_index_cache(cache_key: str, state: Tuple[list, Dict[str, List[int]]]) -> None:
+    """Write the index cache atomically; an unwritable location just means no cache."""
+    tmp_path = f"{INDEX_CACHE_PATH}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(marshal.dumps((cache_key, *state)))
+        os.replace(tmp_path, INDEX_CACHE_PATH)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# Process-wide detector returned by get_detector()
+_shared_detector: Optional[RFODetector] = None
+_shared_detector_lock = threading.Lock()
+
+
+def get_detector() -> RFODetector:
+    """
+    Get the process-wide RFODetector, creating it on first use.
+
+    Forked worker processes inherit an already created instance.
+
+    Returns:
+        Shared RFODetector instance
+    """
+    global _shared_detector
+    if _shared_detector is None:
+        with _shared_detector_lock:
+            if _shared_detector is None:
+                _shared_detector = RFODetector()
+    return _shared_detector
+
+
+def _classify_chunk(normalized_texts: List[str], fuzzy_threshold: float) -> List[Optional[int]]:
+    """
+    Process-pool worker: match normalized texts and return the matched entry indexes.
+
+    Indexes rather than entries are returned to keep the results cheap to pickle.
+    """
+    detector = get_detector()
+    positions = {id(rfo): idx for idx, rfo in enumerate(detector.rfo_entries)}
+    indexes = []
+    for text in normalized_texts:
+        match = detector._match_normalized(text, fuzzy_threshold)
+        indexes.append(positions[id(match)] if match is not None else None)
+    return indexes
+
+
+# Hand-picked phrases covering each matching strategy and the edge cases: (expression, description)
+COMPREHENSIVE_TEST_CASES = [
+    # Exact matches
+    ('BTS, CPRI', 'Should match exactly'),
+    ('  bts, cpri  ', 'Should handle whitespace'),
+    ('BTS ,  CPRI', 'Should handle irregular spacing'),
+
+    # Fuzzy matches
+    ('dbd modul issue', 'Should fuzzy match DCDB cable'),
+    ('rectifier hardwar issue', 'Should handle typo in hardware'),
+    ('fueling pump falt', 'Should handle typo in fault'),
+    ('battry cells fault', 'Should handle typo in battery'),
+
+    # Substring matches
+    ('DG Engine Fault', 'Should match DG, Engine Fault'),
+    ('Engine Fault', 'Should match via substring'),
+    ('fiber cut', 'Should match fiber cut entries'),
+    ('cable stolen', 'Should match Cable Stolen'),
+
+    # Edge cases
+    ('', 'Empty string'),
+    ('   ', 'Whitespace only'),
+    ('Unknown Issue', 'No match expected'),
+    ('xyz123', 'Random string'),
+]
 
 
 def run_comprehensive_tests():
     """Run comprehensive tests for the RFO detector."""
     detector = RFODetector()
     
-    test_cases = [
-        # Exact matches
-        ('BTS, CPRI', 'Should match exactly'),
-        ('  bts, cpri  ', 'Should handle whitespace'),
-        ('BTS ,  CPRI', 'Should handle irregular spacing'),
-        
-        # Fuzzy matches
-        ('dbd modul issue', 'Should fuzzy match DCDB cable'),
-        ('rectifier hardwar issue', 'Should handle typo in hardware'),
-        ('fueling pump falt', 'Should handle typo in fault'),
-        ('battry cells fault', 'Should handle typo in battery'),
-        
-        # Substring matches
-        ('DG Engine Fault', 'Should match DG, Engine Fault'),
-        ('Engine Fault', 'Should match via substring'),
-        ('fiber cut', 'Should match fiber cut entries'),
-        ('cable stolen', 'Should match Cable Stolen'),
-        
-        # Edge cases
-        ('', 'Empty string'),
-        ('   ', 'Whitespace only'),
-        ('Unknown Issue', 'No match expected'),
-        ('xyz123', 'Random string'),
-    ]
-    
     print("=== RFO Detection Test Results ===\n")
     
-    for expression, description in test_cases:
+    for expression, description in COMPREHENSIVE_TEST_CASES:
         result = detector.detect_rfo_expression(expression)
         print(f"Test: '{expression}' ({description})")
         print(f"Result: {result}")
@@ -514,8 +883,7 @@ def detect_rfo_expression(expression_word: str, fuzzy_threshold: float = 0.8) ->
     Returns:
         Tuple of (code, root_caused) if match found, otherwise error message string
     """
-    detector = RFODetector()
-    return detector.detect_rfo_expression(expression_word, fuzzy_threshold)
+    return get_detector().detect_rfo_expression(expression_word, fuzzy_threshold)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,240 @@
+"""
+Export API (Excel and PDF downloads)
+
+    GET /api/reports/<trans_num>/export/excel   one report with its photos, materials, services
+    GET /api/reports/<trans_num>/export/pdf     the same as a printable PDF (needs reportlab)
+    GET /api/reports/export/excel               reports raised in a date range or month
+    GET /api/inventory/report/excel             stock summary and the transactions of a range
+
+Workbooks are streamed with xlsx_stream: rows are read from the database in batches of
+EXPORT_FETCH_SIZE and compressed into the response as they arrive, so a month-wide export
+starts downloading at once and runs in constant memory. A streaming export keeps its pooled
+connection until the last row is sent.
+"""
+
+import io
+from datetime import datetime
+
+from flask import Blueprint, Response, jsonify, request
+
+from db_pool import current_pool, date_range, fetch_dicts, iter_rows
+from inventory_api import SUMMARY_COLUMNS
+from reports_api import CHILD_TABLES, LIST_FILTERS, REPORT_COLUMNS, fetch_report, with_children
+from xlsx_stream import stream_xlsx
+
+export_bp = Blueprint('export', __name__)
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+INVENTORY_TRANSACTION_COLUMNS = [
+    "id", "transaction_date", "material_code", "material_name", "transaction_type", "transaction_ref",
+    "quantity", "unit_cost", "total_value", "notes", "created_by",
+]
+# Report fields printed on the PDF, in order
+PDF_REPORT_FIELDS = [
+    ("Transaction No.", "trans_num"), ("Project", "project_name"), ("Fault", "fault_name"),
+    ("Circuit ID", "circuit_id"), ("Customer", "customer_name"), ("Customer Address", "customer_address"),
+    ("PIC", "pic"), ("Region", "region"), ("Township", "township"), ("Raised", "raised_time"),
+    ("Cleared", "cleared_time"), ("Duration", "duration"), ("Root Cause", "root_cause"),
+    ("Status", "status"), ("Priority", "priority"),
+]
+PDF_CHILD_COLUMNS = {
+    'materials': ("Materials", ["material_code", "material_name", "uom", "material_usage", "total_cost"]),
+    'services': ("Services", ["service_code", "service_name", "uom", "service_usage", "total_cost"]),
+}
+
+
+def error_response(message, status):
+    return jsonify({'error': message}), status
+
+
+def download(body, mimetype, filename):
+    """A file download response; body may be bytes or a generator of byte chunks."""
+    return Response(body, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+def streamed_rows(pool, sql, params):
+    """Yields the rows of a query as tuples; the connection is borrowed only while iterating."""
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        for row in iter_rows(cursor):
+            yield tuple(row)
+
+
+def range_conditions(column, lower, upper):
+    conditions, params = [], []
+    if lower is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(lower)
+    if upper is not None:
+        conditions.append(f"{column} < ?")
+        params.append(upper)
+    return conditions, params
+
+
+def range_from_request(dialect):
+    """(lower, upper) from ?from=YYYY-MM-DD&to=YYYY-MM-DD or ?month=YYYY-MM; ValueError if malformed."""
+    return date_range(dialect, request.args.get('from'), request.args.get('to'), request.args.get('month'))
+
+
+def inventory_transactions_query(lower=None, upper=None, material_code=None, material_type=None):
+    """
+    Builds the statement for material_inventory rows in date order, with their material names.
+
+    Returns:
+        tuple[str, list]: The statement and its parameters.
+    """
+    conditions, params = range_conditions("inv.transaction_date", lower, upper)
+    if material_code:
+        conditions.append("inv.material_code = ?")
+        params.append(material_code)
+    if material_type:
+        conditions.append("mi.material_type = ?")
+        params.append(material_type)
+    select_list = ", ".join(f"mi.{column}" if column == 'material_name' else f"inv.{column}"
+                            for column in INVENTORY_TRANSACTION_COLUMNS)
+    sql = (f"SELECT {select_list} FROM material_inventory inv "
+           "INNER JOIN materials_info mi ON mi.material_code = inv.material_code")
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    return sql + " ORDER BY inv.transaction_date, inv.id", params
+
+
+def report_sheets(report):
+    """Sheets of a single-report workbook: the report fields, then one sheet per child table."""
+    yield ("Report", ["Field", "Value"], [(column, report.get(column)) for column in REPORT_COLUMNS], [22, 60])
+    for key, (_, columns) in CHILD_TABLES.items():
+        yield (key.capitalize(), columns, [[row.get(column) for column in columns] for row in report[key]])
+
+
+def render_report_pdf(report):
+    """
+    Renders one report, with its materials and services, as an A4 PDF.
+
+    Raises:
+        ImportError: If reportlab is not installed.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    grid = TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ])
+    header_grid = TableStyle(grid.getCommands() + [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#D9D9D9')),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ])
+
+    def text(value):
+        return Paragraph('' if value is None else str(value).replace('&', '&amp;').replace('<', '&lt;'),
+                         styles['BodyText'])
+
+    story = [Paragraph(f"Fault Report {report['trans_num']}", styles['Title'])]
+    story.append(Table([[label, text(report.get(key))] for label, key in PDF_REPORT_FIELDS],
+                       colWidths=[110, 390], style=grid))
+    for key, (title, columns) in PDF_CHILD_COLUMNS.items():
+        if report[key]:
+            story += [Spacer(1, 12), Paragraph(title, styles['Heading2'])]
+            story.append(Table([columns] + [[text(row.get(column)) for column in columns] for row in report[key]],
+                               repeatRows=1, style=header_grid))
+    output = io.BytesIO()
+    SimpleDocTemplate(output, pagesize=A4, title=f"Fault Report {report['trans_num']}").build(story)
+    return output.getvalue()
+
+
+def load_report(trans_num):
+    with current_pool().connection() as conn:
+        report = fetch_report(conn, 'trans_num', trans_num)
+        return with_children(conn, [report])[0] if report is not None else None
+
+
+@export_bp.route('/api/reports/<trans_num>/export/excel', methods=['GET'])
+def export_report_excel(trans_num):
+    """One report as a workbook: a Report sheet of fields plus Photos, Materials and Services sheets."""
+    report = load_report(trans_num)
+    if report is None:
+        return error_response("Report not found", 404)
+    return download(stream_xlsx(report_sheets(report)), XLSX_MIMETYPE, f"{trans_num}.xlsx")
+
+
+@export_bp.route('/api/reports/<trans_num>/export/pdf', methods=['GET'])
+def export_report_pdf(trans_num):
+    """One report as a PDF; 501 when reportlab is not installed on the server."""
+    report = load_report(trans_num)
+    if report is None:
+        return error_response("Report not found", 404)
+    try:
+        pdf = render_report_pdf(report)
+    except ImportError:
+        return error_response("PDF export needs the reportlab package on the server", 501)
+    return download(pdf, 'application/pdf', f"{trans_num}.pdf")
+
+
+@export_bp.route('/api/reports/export/excel', methods=['GET'])
+def export_reports_excel():
+    """
+    GET /api/reports/export/excel?month=YYYY-MM (or from=YYYY-MM-DD&to=YYYY-MM-DD)&region=...&status=...&township=...
+
+    Every matching report, one row each, ordered by raised_time, streamed as it is read.
+    """
+    pool = current_pool()
+    try:
+        lower, upper = range_from_request(pool.dialect)
+    except ValueError:
+        return error_response("Use month=YYYY-MM or from/to=YYYY-MM-DD", 400)
+    conditions, params = range_conditions("raised_time", lower, upper)
+    for column in LIST_FILTERS:
+        if request.args.get(column):
+            conditions.append(f"{column} = ?")
+            params.append(request.args[column])
+    sql = f"SELECT {', '.join(REPORT_COLUMNS)} FROM fault_reports"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    rows = streamed_rows(pool, sql + " ORDER BY raised_time, id", params)
+    filename = f"fault_reports_{request.args.get('month') or datetime.now().strftime('%Y%m%d')}.xlsx"
+    return download(stream_xlsx([("Reports", REPORT_COLUMNS, rows)]), XLSX_MIMETYPE, filename)
+
+
+@export_bp.route('/api/inventory/report/excel', methods=['GET'])
+def export_inventory_excel():
+    """
+    GET /api/inventory/report/excel?month=YYYY-MM (or from/to)&material_code=...&material_type=...
+
+    A Summary sheet of current balances, then a Transactions sheet of the matching
+    material_inventory rows in date order, streamed as they are read.
+    """
+    pool = current_pool()
+    try:
+        lower, upper = range_from_request(pool.dialect)
+    except ValueError:
+        return error_response("Use month=YYYY-MM or from/to=YYYY-MM-DD", 400)
+
+    summary_conditions, summary_params = [], []
+    for column in ('material_code', 'material_type'):
+        if request.args.get(column):
+            summary_conditions.append(f"{column} = ?")
+            summary_params.append(request.args[column])
+    summary_sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM vw_material_inventory_summary"
+    if summary_conditions:
+        summary_sql += " WHERE " + " AND ".join(summary_conditions)
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(summary_sql + " ORDER BY material_code", summary_params)
+        summary = [[row[column] for column in SUMMARY_COLUMNS] for row in fetch_dicts(cursor)]
+
+    sql, params = inventory_transactions_query(lower, upper, request.args.get('material_code'),
+                                               request.args.get('material_type'))
+    rows = streamed_rows(pool, sql, params)
+
+    filename = f"inventory_{request.args.get('month') or datetime.now().strftime('%Y%m%d')}.xlsx"
+    return download(stream_xlsx([
+        ("Summary", SUMMARY_COLUMNS, summary),
+        ("Transactions", INVENTORY_TRANSACTION_COLUMNS, rows),
+    ]), XLSX_MIMETYPE, filename)
@@ -0,0 +1,129 @@
+"""
+Image Processing for Embedded Photos
+
+Downscales and recompresses photos before they are embedded in a workbook. Excel only ever
+shows a photo at its display box, so carrying the camera original (often several MB) just
+bloats the file: each photo is resized to the box at a chosen DPI, re-encoded, and written
+without its EXIF block (after the EXIF orientation has been applied to the pixels).
+
+Photos are processed in a thread pool; Pillow releases the GIL while decoding, resizing and
+encoding, so the work runs in parallel.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+# --- Configuration Constants ---
+# Excel lays pictures out at 96 pixels per inch; rendering at a higher DPI keeps photos sharp
+# when zoomed in or printed.
+SCREEN_DPI = 96
+DEFAULT_DPI = 192
+DEFAULT_QUALITY = 80
+DEFAULT_FORMAT = 'JPEG'
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# Formats Excel can render inside an xlsx (WebP is not one of them)
+OUTPUT_FORMATS = {'JPEG': '.jpg', 'PNG': '.png'}
+
+
+def pixel_box(display_size: Tuple[int, int], dpi: int = DEFAULT_DPI) -> Tuple[int, int]:
+    """
+    Pixel size of a display box rendered at the given DPI.
+
+    Args:
+      display_size: (width, height) of the box in screen pixels
+      dpi: Target resolution
+
+    Returns:
+      (width, height) in image pixels, at least 1x1
+    """
+    scale = dpi / SCREEN_DPI
+    return max(1, round(display_size[0] * scale)), max(1, round(display_size[1] * scale))
+
+
+def downscale_image(source_path: str, output_path: str, display_size: Tuple[int, int],
+                    dpi: int = DEFAULT_DPI, quality: int = DEFAULT_QUALITY,
+                    image_format: str = DEFAULT_FORMAT, keep_aspect: bool = False) -> str:
+    """
+    Resize one photo to its display box and re-encode it without metadata.
+
+    Args:
+      source_path: Original image file
+      output_path: File to write; the extension is not changed
+      display_size: (width, height) the photo is shown at, in screen pixels
+      dpi: Resolution the box is rendered at
+      quality: JPEG quality (ignored for PNG)
+      image_format: 'JPEG' or 'PNG'
+      keep_aspect: Fit inside the box instead of filling it exactly
+
+    Returns:
+      output_path
+
+    Raises:
+      ValueError: For an unsupported output format
+      OSError: If the source cannot be read as an image (PIL.UnidentifiedImageError included)
+    """
+    image_format = image_format.upper()
+    if image_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format {image_format!r}; use one of {sorted(OUTPUT_FORMATS)}")
+    box = pixel_box(display_size, dpi)
+
+    with Image.open(source_path) as img:
+        # JPEG can decode straight at a reduced scale, which skips most of the full-size work.
+        # Ask for the longer side both ways, since EXIF rotation may still swap the axes.
+        img.draft('RGB', (max(box), max(box)))
+        img = ImageOps.exif_transpose(img)
+        if image_format == 'JPEG' and img.mode != 'RGB':
+            if img.mode in ('RGBA', 'LA', 'P'):
+                # Flatten transparency onto white rather than the black JPEG would give
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, 'white')
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            else:
+                img = img.convert('RGB')
+
+        if keep_aspect:
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+        elif img.size != box:
+            img = img.resize(box, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        # No exif= argument: the EXIF block (camera, GPS, ...) is not written out
+        save_options = {'dpi': (dpi, dpi), 'optimize': True}
+        if image_format == 'JPEG':
+            save_options.update(quality=quality, progressive=True)
+        img.save(output_path, image_format, **save_options)
+    return output_path
+
+
+def downscale_images(jobs: Sequence[Tuple[str, str]], display_size: Tuple[int, int],
+                     dpi: int = DEFAULT_DPI, quality: int = DEFAULT_QUALITY,
+                     image_format: str = DEFAULT_FORMAT, keep_aspect: bool = False,
+                     max_workers: Optional[int] = MAX_WORKERS) -> List[Optional[Exception]]:
+    """
+    Downscale several photos in parallel.
+
+    Args:
+      jobs: (source_path, output_path) pairs
+      display_size, dpi, quality, image_format, keep_aspect: As for downscale_image()
+      max_workers: Thread pool size; 1 or None processes the photos one after another
+
+    Returns:
+      One entry per job, in order: None on success, or the exception that photo raised
+    """
+    def process(job):
+        try:
+            downscale_image(job[0], job[1], display_size, dpi, quality, image_format, keep_aspect)
+            return None
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logging.error(f"Could not process image '{job[0]}'. Error: {e}")
+            return e
+
+    if not max_workers or max_workers == 1 or len(jobs) <= 1:
+        return [process(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        return list(executor.map(process, jobs))
@@ -1,31 +1,56 @@
-# Before running, install Flask, openpyxl, and flask-cors:
-# pip install Flask openpyxl Flask-Cors
+# Before running, install Flask, openpyxl, Pillow and flask-cors:
+# pip install Flask openpyxl Pillow Flask-Cors
 
-from flask import Flask, request, send_file
+from flask import Flask, jsonify, request, send_file, url_for
 from flask_cors import CORS # Import CORS
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image
-from openpyxl.styles import Font, PatternFill
 from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.cell_range import CellRange
 import base64
-import io
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import re # Import regex module for filename sanitization
 
+from image_processing import downscale_images
+from incident_template import format_datetime_for_excel, write_report_sheet # noqa: F401 (format_* kept importable here)
+
 app = Flask(__name__)
 CORS(app) # Enable CORS for all routes
 
-# Helper function to format date-time for Excel (YYYY-MM-DD HH:MM:SS)
-def format_datetime_for_excel(dt_string):
-    if not dt_string:
-        return ''
-    try:
-        # datetime-local input format is 'YYYY-MM-DDTHH:MM'
-        dt_object = datetime.strptime(dt_string, '%Y-%m-%dT%H:%M')
-        return dt_object.strftime('%Y-%m-%d %H:%M:%S')
-    except ValueError:
-        return dt_string # Return original if parsing fails
+# Upper bound for one export request (multipart or JSON body)
+app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024
+
+# At most this many reports are decoded/built at once; further requests wait for a slot,
+# and get 503 if none frees up within EXPORT_SLOT_TIMEOUT seconds
+MAX_CONCURRENT_EXPORTS = 4
+EXPORT_SLOT_TIMEOUT = 30
+_export_slots = threading.BoundedSemaphore(MAX_CONCURRENT_EXPORTS)
+
+# Base64 text decoded per step (a multiple of 4, so every chunk decodes on its own)
+BASE64_CHUNK_SIZE = 4 * 256 * 1024
+
+# Display box of an embedded photo, in pixels
+PHOTO_DISPLAY_WIDTH = 300
+PHOTO_DISPLAY_HEIGHT = 200
+
+# Embedded photos are resized to the display box at this DPI and re-encoded as JPEG
+# (EXIF stripped) before they go into the workbook
+PHOTO_EMBED_DPI = 192
+PHOTO_JPEG_QUALITY = 80
+PHOTO_PROCESS_WORKERS = 4
+
+# Finished workbooks kept in the result cache, and bytes read per step when hashing photos
+REPORT_CACHE_MAX_RESULTS = 64
+HASH_CHUNK_SIZE = 1024 * 1024
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 # Helper function to format date-time for safe filenames
 def format_datetime_for_filename(dt_string):
@@ -45,267 +70,361 @@ def sanitize_filename(text):
     text = text.replace(' ', '_')
     return re.sub(r'[^\w.-]', '', text)
 
+# Helper function to build the download filename from customer name and ticket time
+def build_download_filename(incident_details):
+    customer_name = sanitize_filename(incident_details.get('customerName', ''))
+    ticket_time = format_datetime_for_filename(incident_details.get('ticketReceivedDateTime', ''))
+
+    if customer_name and ticket_time:
+        return f"{customer_name}_{ticket_time}_IncidentReport.xlsx"
+    elif customer_name:
+        return f"{customer_name}_IncidentReport.xlsx"
+    elif ticket_time:
+        return f"IncidentReport_{ticket_time}.xlsx"
+    return "incident_report_with_photos.xlsx"
+
+# Helper function to decode a (data URL or bare) Base64 string into a file, chunk by chunk,
+# so the decoded image never has to sit in memory next to its text
+def decode_base64_to_file(base64_data, path):
+    # Remove the data URL prefix (e.g., "data:image/png;base64,")
+    if ',' in base64_data:
+        base64_data = base64_data.split(',', 1)[1]
+    # Whitespace would shift the 4-character groups across chunk boundaries
+    if re.search(r'\s', base64_data):
+        base64_data = re.sub(r'\s+', '', base64_data)
+    with open(path, 'wb') as f:
+        for start in range(0, len(base64_data), BASE64_CHUNK_SIZE):
+            f.write(base64.b64decode(base64_data[start:start + BASE64_CHUNK_SIZE]))
+
+def write_incident_workbook(incident_details, photos, output_path):
+    """
+    Streams the incident workbook to output_path.
+
+    The workbook is written in write-only mode: the precompiled report rows go straight to the
+    file, and each embedded photo is read from its file only while the workbook is being saved.
+
+    Args:
+        incident_details (dict): Field values from the incident form.
+        photos (list[dict]): {'label', 'name', 'path'} per photo; 'path' is None when no image data
+            was sent, and an 'error' entry marks data that could not be decoded.
+        output_path (str): Destination .xlsx path.
+    """
+    wb = Workbook(write_only=True)
+
+    # --- Main Incident Report Sheet (layout from incident_template) ---
+    write_report_sheet(wb, incident_details)
+
+    # --- Sheet for Photos with Embedded Images ---
+    ws_photos = wb.create_sheet("Embedded Photos")
+    ws_photos.column_dimensions['A'].width = 40 # Set width for label column
+    ws_photos.column_dimensions['B'].width = 50 # Set width for image column
+    ws_photos.append(["Photo Label", "Image"])
+
+    for row_num, photo in enumerate(photos, start=2):
+        label = photo.get('label', 'No Label')
+        if photo.get('error') is not None:
+            ws_photos.append([label, f"Error embedding image: {photo['error']}"])
+            continue
+        if not photo.get('path'):
+            ws_photos.append([label, "No image data"])
+            continue
+        try:
+            img = Image(photo['path'])
+            img.width = PHOTO_DISPLAY_WIDTH
+            img.height = PHOTO_DISPLAY_HEIGHT
+            ws_photos.add_image(img, f'B{row_num}')
+            # Row height must be set before the row is written (1px ~ 0.75 Excel units)
+            ws_photos.row_dimensions[row_num].height = img.height * 0.75
+            ws_photos.append([label])
+        except Exception as img_error:
+            print(f"Error processing image {photo.get('name')}: {img_error}")
+            ws_photos.append([label, f"Error embedding image: {img_error}"])
+
+    wb.save(output_path)
+
+
+def collect_export_request(work_dir):
+    """
+    Reads the incident details and photos from the current request, spooling every photo to a
+    file in work_dir.
+
+    Accepts either multipart/form-data (an 'incidentDetails' JSON field, 'photos' files and
+    optional parallel 'labels' fields) or the JSON body used so far
+    ({'incidentDetails': {...}, 'uploadedPhotos': [{'label', 'name', 'data'}]}).
+
+    Returns:
+        tuple[dict, list[dict]] | None: (incident_details, photos), or None if nothing was sent.
+    """
+    photos = []
+    if request.mimetype == 'multipart/form-data':
+        incident_details = json.loads(request.form.get('incidentDetails') or '{}')
+        labels = request.form.getlist('labels')
+        for i, storage in enumerate(request.files.getlist('photos')):
+            path = os.path.join(work_dir, f"photo_{i}{os.path.splitext(storage.filename or '')[1]}")
+            storage.save(path) # Copied from the upload stream in chunks
+            photos.append({
+                'label': labels[i] if i < len(labels) else (storage.filename or 'No Label'),
+                'name': storage.filename,
+                'path': path,
+            })
+        return incident_details, photos
+
+    data = request.get_json(silent=True)
+    if not data:
+        return None
+    incident_details = data.get('incidentDetails', {})
+    for i, photo in enumerate(data.get('uploadedPhotos', [])):
+        entry = {'label': photo.get('label', 'No Label'), 'name': photo.get('name'), 'path': None}
+        base64_data = photo.pop('data', '')
+        if base64_data:
+            path = os.path.join(work_dir, f"photo_{i}")
+            try:
+                decode_base64_to_file(base64_data, path)
+                entry['path'] = path
+            except (ValueError, OSError) as decode_error:
+                print(f"Error decoding image {photo.get('name')}: {decode_error}")
+                entry['error'] = decode_error
+            del base64_data # Release the text as soon as it is on disk
+        photos.append(entry)
+    return incident_details, photos
+
+
+def prepare_photos_for_embedding(photos, work_dir):
+    """
+    Replaces each spooled photo with a copy downscaled to its display box.
+
+    The photos are processed in parallel; one that cannot be read as an image gets an 'error'
+    entry instead, which the workbook shows in place of the picture.
+
+    Args:
+        photos (list[dict]): Photos as returned by collect_export_request(); updated in place.
+        work_dir (str): Directory the processed copies are written to.
+    """
+    pending = [photo for photo in photos if photo.get('path') and photo.get('error') is None]
+    jobs = [(photo['path'], os.path.join(work_dir, f"embed_{i}.jpg")) for i, photo in enumerate(pending)]
+    errors = downscale_images(
+        jobs, (PHOTO_DISPLAY_WIDTH, PHOTO_DISPLAY_HEIGHT),
+        dpi=PHOTO_EMBED_DPI, quality=PHOTO_JPEG_QUALITY, max_workers=PHOTO_PROCESS_WORKERS,
+    )
+    for photo, (original_path, processed_path), error in zip(pending, jobs, errors):
+        if error is not None:
+            print(f"Error processing image {photo.get('name')}: {error}")
+            photo['error'] = error
+            continue
+        photo['path'] = processed_path
+        os.remove(original_path) # Only the processed copy is needed from here on
+
+
+# --- Report Jobs and Result Cache ---
+def payload_digest(incident_details, photos):
+    """
+    Hashes an export request: the incident fields plus every photo's label, name and content.
+
+    Two submissions with the same digest produce the same workbook, so the digest doubles as
+    the job id and the cache key.
+
+    Args:
+        incident_details (dict): Field values from the incident form.
+        photos (list[dict]): Spooled photos as returned by collect_export_request().
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    digest = hashlib.sha256(json.dumps(incident_details, sort_keys=True, default=str).encode('utf-8'))
+    for photo in photos:
+        digest.update(json.dumps([photo.get('label'), photo.get('name')], default=str).encode('utf-8'))
+        if photo.get('error') is not None:
+            digest.update(repr(photo['error']).encode('utf-8'))
+        elif photo.get('path'):
+            with open(photo['path'], 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ReportJobStore:
+    """
+    Builds incident workbooks on a local worker pool and keeps the finished files.
+
+    Jobs are keyed by payload_digest(), so a retry or double-click either joins the job that is
+    already running or gets the cached workbook straight away. Finished results beyond
+    max_results are evicted, least recently used first; failed jobs are retried on resubmission.
+    """
+
+    def __init__(self, cache_dir, max_workers=MAX_CONCURRENT_EXPORTS, max_results=REPORT_CACHE_MAX_RESULTS):
+        """
+        Args:
+            cache_dir (str): Directory the finished workbooks are kept in.
+            max_workers (int): Reports built at the same time.
+            max_results (int): Finished workbooks kept before the oldest are deleted.
+        """
+        self.cache_dir = cache_dir
+        self.max_results = max_results
+        os.makedirs(cache_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="incident_report")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, incident_details, photos, work_dir):
+        """
+        Queues a report build, unless the same payload is already queued, running or cached.
+
+        Takes ownership of work_dir: it is deleted once the build is done, or at once when the
+        payload is a duplicate.
+
+        Returns:
+            dict: The job record.
+        """
+        job_id = payload_digest(incident_details, photos)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] != 'failed':
+                self._jobs.move_to_end(job_id)
+                shutil.rmtree(work_dir, ignore_errors=True)
+                return job
+            job = {
+                'id': job_id,
+                'status': 'queued',
+                'filename': build_download_filename(incident_details),
+                'path': None,
+                'error': None,
+                'submitted_at': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._jobs[job_id] = job
+            job['future'] = self._executor.submit(self._run, job, incident_details, photos, work_dir)
+        return job
+
+    def get(self, job_id):
+        """Returns the job record, or None for an unknown (or evicted) id."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+            return job
+
+    def wait(self, job, timeout=None):
+        """Blocks until the job has finished (successfully or not)."""
+        job['future'].result(timeout=timeout)
+        return job
+
+    def _run(self, job, incident_details, photos, work_dir):
+        job['status'] = 'running'
+        try:
+            prepare_photos_for_embedding(photos, work_dir)
+            output_path = os.path.join(work_dir, "report.xlsx")
+            write_incident_workbook(incident_details, photos, output_path)
+            cached_path = os.path.join(self.cache_dir, f"{job['id']}.xlsx")
+            os.replace(output_path, cached_path)
+            job['path'] = cached_path
+            job['status'] = 'done'
+        except Exception as e:
+            print(f"An error occurred while generating report {job['id']}: {e}")
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            done = [job_id for job_id, job in self._jobs.items() if job['status'] in ('done', 'failed')]
+            for job_id in done[:max(0, len(done) - self.max_results)]:
+                job = self._jobs.pop(job_id)
+                if job['path']:
+                    try:
+                        os.remove(job['path'])
+                    except OSError:
+                        pass # Still being downloaded (Windows); the file is left behind
+
+
+report_jobs = ReportJobStore(os.path.join(tempfile.gettempdir(), "incident_report_cache"))
+
+
+def job_status(job):
+    """JSON-safe view of a job record, with the URLs to poll and download it."""
+    status = {key: job[key] for key in ('id', 'status', 'filename', 'error', 'submitted_at')}
+    status['status_url'] = url_for('report_job_status', job_id=job['id'])
+    status['download_url'] = url_for('download_report_job', job_id=job['id'])
+    return status
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_report_job():
+    """
+    Accepts the same payload as /generate_excel_with_images and queues the workbook build.
+
+    Returns 202 with the job status (poll status_url, then fetch download_url). An identical
+    payload returns the existing job, already 'done' if its workbook is cached.
+    """
+    work_dir = tempfile.mkdtemp(prefix="incident_report_")
+    try:
+        collected = collect_export_request(work_dir)
+        if collected is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            return "No data received", 400
+        job = report_jobs.submit(*collected, work_dir)
+    except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"An error occurred: {e}")
+        return f"An internal server error occurred: {e}", 500
+    return jsonify(job_status(job)), 202
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def report_job_status(job_id):
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job_status(job))
+
+
+@app.route('/jobs/<job_id>/download', methods=['GET'])
+def download_report_job(job_id):
+    job = report_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job['status'] == 'failed':
+        return jsonify(job_status(job)), 500
+    if job['status'] != 'done':
+        return jsonify(job_status(job)), 409
+    return send_file(job['path'], mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=job['filename'])
+
+
 @app.route('/generate_excel_with_images', methods=['POST'])
 def generate_excel_with_images():
     """
-    Receives incident report data and Base64 encoded images from the frontend,
+    Receives incident report data and images (multipart files or Base64 JSON) from the frontend,
     generates an Excel file with embedded images, and sends it back.
+
+    The build runs through report_jobs, so an identical payload is answered from the result
+    cache; this request simply waits for its job instead of polling.
     """
+    if not _export_slots.acquire(timeout=EXPORT_SLOT_TIMEOUT):
+        return "Too many reports are being generated, please retry shortly", 503
+
+    work_dir = tempfile.mkdtemp(prefix="incident_report_")
     try:
-        data = request.json
-        if not data:
+        collected = collect_export_request(work_dir)
+        if collected is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
             return "No data received", 400
-
-        # Extract all incident details and uploaded photos
-        incident_details = data.get('incidentDetails', {})
-        uploaded_photos = data.get('uploadedPhotos', [])
-
-        # Create a new Excel workbook and a sheet for the report
-        wb = Workbook()
-        ws_report = wb.active
-        ws_report.title = "Incident Report"
-
-        # --- Populate Main Incident Report Sheet with data and formatting ---
-
-        # Define styles
-        bold_font = Font(bold=True)
-        yellow_fill = PatternFill(start_color="FFCC00", end_color="FFCC00", fill_type="solid")
-
-        # Row 1: Title
-        ws_report['A1'] = "B2B_Sub-Trunk_FTTx_MSAN uplink Access fiber Incident report template_LSP_MMP_June-2025_Sr_02"
-        ws_report['A1'].font = bold_font
-        ws_report['A1'].fill = yellow_fill
-        ws_report.merge_cells('A1:F1') # Merge cells for the title
-
-        # Row 2: Ticket Received Date Time, Customer Name
-        ws_report['A2'] = "Ticket Received Date Time"
-        ws_report['B2'] = format_datetime_for_excel(incident_details.get('ticketReceivedDateTime', ''))
-        ws_report.merge_cells('B2:C2')
-        ws_report['D2'] = "Customer Name"
-        ws_report['E2'] = incident_details.get('customerName', '')
-        ws_report.merge_cells('E2:F2')
-
-        # Row 3: Circuit ID, Customer Address
-        ws_report['A3'] = "Circuit ID"
-        ws_report['B3'] = incident_details.get('circuitID', '')
-        ws_report.merge_cells('B3:C3')
-        ws_report['D3'] = "Customer Address"
-        ws_report['E3'] = incident_details.get('customerAddress', '')
-        ws_report.merge_cells('E3:F3')
-
-        # Row 4: Type of Reaction, Work Order Email Title
-        ws_report['A4'] = "Type of Reaction"
-        ws_report['B4'] = incident_details.get('typeOfReaction', '')
-        ws_report.merge_cells('B4:C4')
-        ws_report['D4'] = "Work Order Email Title"
-        ws_report['E4'] = incident_details.get('workOrderEmailTitle', '')
-        ws_report.merge_cells('E4:F4')
-
-        # Row 5: Empty row for spacing (no content, just for structure)
-        # ws_report.merge_cells('A5:F5') # Not strictly needed if empty, but for consistency
-
-        # Row 6: Table header (Description, Start Time, End Time, Action By LSP)
-        ws_report['A6'] = "Description"
-        ws_report['B6'] = "Start Time"
-        ws_report['C6'] = "End Time"
-        ws_report['D6'] = "Action By LSP"
-        ws_report.merge_cells('D6:F6') # Merge cells for "Action By LSP" header
-
-        # Row 7: WO Start
-        ws_report['A7'] = "WO start"
-        ws_report['B7'] = format_datetime_for_excel(incident_details.get('woStartTime', ''))
-        ws_report['C7'] = format_datetime_for_excel(incident_details.get('woEndTime', ''))
-        ws_report['D7'] = incident_details.get('woActionByLSP', '')
-        ws_report.merge_cells('D7:F7')
-
-        # Row 8: Arrived at Customer Premise/Exchange/RSU/BTS
-        ws_report['A8'] = "Arrived at Customer Premise/Exchange/RSU/BTS from ……….."
-        ws_report['B8'] = format_datetime_for_excel(incident_details.get('arrivedStartTime', ''))
-        ws_report['C8'] = format_datetime_for_excel(incident_details.get('arrivedEndTime', ''))
-        ws_report['D8'] = incident_details.get('arrivedActionByLSP', '')
-        ws_report.merge_cells('D8:F8')
-
-        # Row 9: Power meter/OTDR testing
-        ws_report['A9'] = "Power meter/OTDR testing from customer/Exchange/RSU/BTS"
-        ws_report['B9'] = format_datetime_for_excel(incident_details.get('powerMeterStartTime', 'N/A'))
-        ws_report['C9'] = format_datetime_for_excel(incident_details.get('powerMeterEndTime', 'N/A'))
-        ws_report['D9'] = incident_details.get('powerMeterActionByLSP', 'N/A')
-        ws_report.merge_cells('D9:F9')
-
-        # Row 10: Cable damage/cut distance
-        ws_report['A10'] = "Cable damage/cut distance(Meter or km) from customer/Exchange/ Customer Site according to OTDR Test"
-        ws_report['B10'] = format_datetime_for_excel(incident_details.get('cableDamageStartTime', 'N/A'))
-        ws_report['C10'] = format_datetime_for_excel(incident_details.get('cableDamageEndTime', 'N/A'))
-        ws_report['D10'] = incident_details.get('cableDamageActionByLSP', 'N/A')
-        ws_report.merge_cells('D10:F10')
-
-        # Row 11: Root Cause (Direct Affect) - 1
-        ws_report['A11'] = "Root Cause (Direct affect)"
-        ws_report['B11'] = format_datetime_for_excel(incident_details.get('rootCause1StartTime', ''))
-        ws_report['C11'] = format_datetime_for_excel(incident_details.get('rootCause1EndTime', ''))
-        ws_report['D11'] = incident_details.get('rootCause1ActionByLSP', '')
-        ws_report.merge_cells('D11:F11')
-
-        # Row 12: Rectification
-        ws_report['A12'] = "Rectification"
-        ws_report['B12'] = format_datetime_for_excel(incident_details.get('rectificationStartTime', 'N/A'))
-        ws_report['C12'] = format_datetime_for_excel(incident_details.get('rectificationEndTime', ''))
-        ws_report['D12'] = incident_details.get('rectificationActionByLSP', '')
-        ws_report.merge_cells('D12:F12')
-
-        # Row 13: Ping test and Speed test (If needed)
-        ws_report['A13'] = "Ping test and Speed test(If needed)"
-        ws_report['B13'] = format_datetime_for_excel(incident_details.get('pingTestStartTime', 'N/A'))
-        ws_report['C13'] = format_datetime_for_excel(incident_details.get('pingTestEndTime', 'N/A'))
-        ws_report['D13'] = incident_details.get('pingTestActionByLSP', 'N/A')
-        ws_report.merge_cells('D13:F13')
-
-        # Row 14: Service recovery confirmed by TSC/FSC
-        ws_report['A14'] = "Service recovery confirmed by TSC/FSC"
-        ws_report['B14'] = format_datetime_for_excel(incident_details.get('tscFscStartTime', 'N/A'))
-        ws_report['C14'] = format_datetime_for_excel(incident_details.get('tscFscEndTime', ''))
-        ws_report['D14'] = incident_details.get('tscFscActionByLSP', '')
-        ws_report.merge_cells('D14:F14')
-
-        # Row 15: Service recovery confirmed by Customer
-        ws_report['A15'] = "Service recovery confirmed by Customer"
-        ws_report['B15'] = format_datetime_for_excel(incident_details.get('customerConfirmStartTime', 'N/A'))
-        ws_report['C15'] = format_datetime_for_excel(incident_details.get('customerConfirmEndTime', ''))
-        ws_report['D15'] = incident_details.get('customerConfirmActionByLSP', '')
-        ws_report.merge_cells('D15:F15')
-
-        # Row 16: Outage duration
-        ws_report['A16'] = "Outage duration"
-        ws_report['B16'] = format_datetime_for_excel(incident_details.get('outageDurationStartTime', ''))
-        ws_report['C16'] = format_datetime_for_excel(incident_details.get('outageDurationEndTime', ''))
-        ws_report['D16'] = incident_details.get('outageDurationActionByLSP', '')
-        ws_report.merge_cells('D16:F16')
-
-        # Row 17: Empty row for spacing
-        # ws_report.merge_cells('A17:F17') # Not strictly needed if empty
-
-        # Row 18: GPS Location for Pole, GPS Location for Joint Closure
-        ws_report['A18'] = "GPS Location for Pole( if replacement or new)"
-        ws_report['B18'] = incident_details.get('gpsLocationPole', '')
-        ws_report.merge_cells('B18:C18')
-        ws_report['D18'] = "GPS Location for Joint Closure( if replacement or new)"
-        ws_report['E18'] = incident_details.get('gpsLocationJointClosure', '')
-        ws_report.merge_cells('E18:F18')
-
-        # Row 19: Media Converter/ONT/IAD, OTDR test result
-        ws_report['A19'] = "Media Converter/ONT/IAD equipment old&new serial number if replaceed"
-        ws_report['B19'] = incident_details.get('mediaConverterSerial', '')
-        ws_report.merge_cells('B19:C19')
-        ws_report['D19'] = "OTDR test result(to provide in separate sheet and (PDF or SOR file))"
-        ws_report['E19'] = incident_details.get('otdrTestResultNotes', '')
-        ws_report.merge_cells('E19:F19')
-
-        # Row 20: Sub-Root cause (External Affect), Root Cause (Direct affect) - 2
-        ws_report['A20'] = "Sub-Root cause (External Affect)"
-        ws_report['B20'] = incident_details.get('subRootCauseExternalAffect', '')
-        ws_report.merge_cells('B20:C20')
-        ws_report['D20'] = "Root Cause (Direct affect)"
-        ws_report['E20'] = incident_details.get('rootCauseDirectAffect2', '')
-        ws_report.merge_cells('E20:F20')
-
-        # Row 21: Additional Notes
-        ws_report['A21'] = "" # This was empty in your JS, so keeping it
-        ws_report.merge_cells('A21:C21') # Merge cells for "Additional Notes" label
-        ws_report['D21'] = incident_details.get('additionalNotes', '')
-        ws_report.merge_cells('D21:F21') # Merge cells for "Additional Notes" value
-
-        # Set column widths
-        ws_report.column_dimensions['A'].width = 45
-        ws_report.column_dimensions['B'].width = 20
-        ws_report.column_dimensions['C'].width = 20
-        ws_report.column_dimensions['D'].width = 30
-        ws_report.column_dimensions['E'].width = 30
-        ws_report.column_dimensions['F'].width = 20
-
-
-        # --- Create a new sheet for Photos with Embedded Images ---
-        ws_photos = wb.create_sheet("Embedded Photos")
-        ws_photos['A1'] = "Photo Label"
-        ws_photos['B1'] = "Image"
-        ws_photos.column_dimensions['A'].width = 40 # Set width for label column
-        ws_photos.column_dimensions['B'].width = 50 # Set width for image column (adjust as needed)
-
-        row_num = 2 # Start from row 2 for photo data
-
-        for photo in uploaded_photos:
-            label = photo.get('label', 'No Label')
-            base64_data = photo.get('data', '')
-
-            # Write the label to column A
-            ws_photos[f'A{row_num}'] = label
-
-            if base64_data:
-                try:
-                    # Remove the data URL prefix (e.g., "data:image/png;base64,")
-                    if ',' in base64_data:
-                        base64_decoded_string = base64_data.split(',')[1]
-                    else:
-                        base64_decoded_string = base64_data
-
-                    # Decode Base64 string to bytes
-                    img_bytes = base64.b64decode(base64_decoded_string)
-                    img_stream = io.BytesIO(img_bytes)
-
-                    # Create an openpyxl Image object
-                    # openpyxl usually infers from the bytes, but explicit is safer for some cases.
-                    img = Image(img_stream)
-
-                    # Set image dimensions (optional, but good for consistent display)
-                    # You may want to resize images on the client-side before sending
-                    # or implement more sophisticated resizing here.
-                    img.width = 300 # Example width
-                    img.height = 200 # Example height
-
-                    # Add the image to the worksheet, anchored to cell B (where the image will appear)
-                    ws_photos.add_image(img, f'B{row_num}')
-
-                    # Adjust row height to fit the image
-                    # Approx conversion from pixels to Excel row height units (1px ~ 0.75 Excel units)
-                    ws_photos.row_dimensions[row_num].height = img.height * 0.75
-
-                except Exception as img_error:
-                    print(f"Error processing image {photo.get('name')}: {img_error}")
-                    ws_photos[f'B{row_num}'] = f"Error embedding image: {img_error}"
-            else:
-                ws_photos[f'B{row_num}'] = "No image data"
-
-            row_num += 1
-
-        # Determine the dynamic filename
-        customer_name = sanitize_filename(incident_details.get('customerName', ''))
-        ticket_time = format_datetime_for_filename(incident_details.get('ticketReceivedDateTime', ''))
-        
-        if customer_name and ticket_time:
-            download_filename = f"{customer_name}_{ticket_time}_IncidentReport.xlsx"
-        elif customer_name:
-            download_filename = f"{customer_name}_IncidentReport.xlsx"
-        elif ticket_time:
-            download_filename = f"IncidentReport_{ticket_time}.xlsx"
-        else:
-            download_filename = "incident_report_with_photos.xlsx"
-
-
-        # Save the workbook to a BytesIO object
-        excel_file_stream = io.BytesIO()
-        wb.save(excel_file_stream)
-        excel_file_stream.seek(0) # Rewind to the beginning of the stream
-
-        # Send the file as a response
-        return send_file(
-            excel_file_stream,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            as_attachment=True,
-            download_name=download_filename # Use the dynamic filename here
-        )
-
+        job = report_jobs.wait(report_jobs.submit(*collected, work_dir))
     except Exception as e:
+        shutil.rmtree(work_dir, ignore_errors=True)
         print(f"An error occurred: {e}")
         return f"An internal server error occurred: {e}", 500
+    finally:
+        _export_slots.release()
+
+    if job['status'] == 'failed':
+        return f"An internal server error occurred: {job['error']}", 500
+    return send_file(
+        job['path'],
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name=job['filename'] # Use the dynamic filename here
+    )
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,190 @@
+"""
+Incident Report Template
+
+The one definition of the incident report layout: title, field labels, which form field fills
+which cell, merged ranges, column widths and cell styles. Both the incident export service
+(incident_py.py) and the blank standard template (Mail_Reader.create_standard_template) are
+rendered from it.
+
+The layout is compiled once into a row plan of fixed cells and field slots, so building a
+report only looks up the field values and appends the rows; nothing about the static layout
+is worked out again per workbook.
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.worksheet.cell_range import CellRange
+
+REPORT_SHEET_NAME = "Incident Report"
+REPORT_TITLE = "B2B_Sub-Trunk_FTTx_MSAN uplink Access fiber Incident report template_LSP_MMP_June-2025_Sr_02"
+
+# Timeline rows 7-16: (label, incidentDetails key prefix, defaults for Start/End Time and Action By LSP)
+TIMELINE_ROWS = [
+    ("WO start", 'wo', ('', '', '')),
+    ("Arrived at Customer Premise/Exchange/RSU/BTS from ………..", 'arrived', ('', '', '')),
+    ("Power meter/OTDR testing from customer/Exchange/RSU/BTS", 'powerMeter', ('N/A', 'N/A', 'N/A')),
+    ("Cable damage/cut distance(Meter or km) from customer/Exchange/ Customer Site according to OTDR Test",
+     'cableDamage', ('N/A', 'N/A', 'N/A')),
+    ("Root Cause (Direct affect)", 'rootCause1', ('', '', '')),
+    ("Rectification", 'rectification', ('N/A', '', '')),
+    ("Ping test and Speed test(If needed)", 'pingTest', ('N/A', 'N/A', 'N/A')),
+    ("Service recovery confirmed by TSC/FSC", 'tscFsc', ('N/A', '', '')),
+    ("Service recovery confirmed by Customer", 'customerConfirm', ('N/A', '', '')),
+    ("Outage duration", 'outageDuration', ('', '', '')),
+]
+TIMELINE_HEADER = ["Description", "Start Time", "End Time", "Action By LSP"]
+
+# Label/value pair rows: (left label, key, right label, key); values fill the merged B:C and E:F
+HEADER_PAIR_ROWS = [  # Rows 2-4
+    ("Ticket Received Date Time", 'ticketReceivedDateTime', "Customer Name", 'customerName'),
+    ("Circuit ID", 'circuitID', "Customer Address", 'customerAddress'),
+    ("Type of Reaction", 'typeOfReaction', "Work Order Email Title", 'workOrderEmailTitle'),
+]
+DETAIL_PAIR_ROWS = [  # Rows 18-20
+    ("GPS Location for Pole( if replacement or new)", 'gpsLocationPole',
+     "GPS Location for Joint Closure( if replacement or new)", 'gpsLocationJointClosure'),
+    ("Media Converter/ONT/IAD equipment old&new serial number if replaceed", 'mediaConverterSerial',
+     "OTDR test result(to provide in separate sheet and (PDF or SOR file))", 'otdrTestResultNotes'),
+    ("Sub-Root cause (External Affect)", 'subRootCauseExternalAffect',
+     "Root Cause (Direct affect)", 'rootCauseDirectAffect2'),
+]
+
+# Pair-row fields holding a datetime-local value
+DATETIME_FIELDS = {'ticketReceivedDateTime'}
+
+REPORT_MERGED_RANGES = (
+    ['A1:F1', 'B2:C2', 'E2:F2', 'B3:C3', 'E3:F3', 'B4:C4', 'E4:F4', 'D6:F6']
+    + [f'D{row}:F{row}' for row in range(7, 17)]
+    + ['B18:C18', 'E18:F18', 'B19:C19', 'E19:F19', 'B20:C20', 'E20:F20', 'A21:C21', 'D21:F21']
+)
+REPORT_COLUMN_WIDTHS = {'A': 45, 'B': 20, 'C': 20, 'D': 30, 'E': 30, 'F': 20}
+REPORT_COLUMNS = len(REPORT_COLUMN_WIDTHS)
+
+# Rows that get the header fill when the report is rendered with borders (the printable template)
+HEADER_ROWS = {6}
+
+# Styles are shared objects; assigning them to a cell only registers them with its workbook
+TITLE_FONT = Font(bold=True)
+TITLE_FILL = PatternFill(start_color="FFCC00", end_color="FFCC00", fill_type="solid")
+HEADER_FONT = Font(bold=True, size=12)
+HEADER_FILL = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal='center')
+THIN_BORDER = Border(left=Side(style='thin'), right=Side(style='thin'),
+                     top=Side(style='thin'), bottom=Side(style='thin'))
+
+# A cell of the row plan that is filled from the incident details
+Field = namedtuple('Field', ['key', 'default', 'is_datetime'])
+
+
+# Helper function to format date-time for Excel (YYYY-MM-DD HH:MM:SS)
+def format_datetime_for_excel(dt_string):
+    if not dt_string:
+        return ''
+    try:
+        # datetime-local input format is 'YYYY-MM-DDTHH:MM'
+        dt_object = datetime.strptime(dt_string, '%Y-%m-%dT%H:%M')
+        return dt_object.strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return dt_string # Return original if parsing fails
+
+
+@lru_cache(maxsize=None)
+def report_row_plan():
+    """
+    Compiles the "Incident Report" layout into rows 1-21.
+
+    Returns:
+        tuple[tuple]: One tuple per row; each entry is a fixed value or a Field to fill in.
+    """
+    def pair_row(left_label, left_key, right_label, right_key):
+        return (left_label, Field(left_key, '', left_key in DATETIME_FIELDS), None,
+                right_label, Field(right_key, '', right_key in DATETIME_FIELDS))
+
+    rows = [(REPORT_TITLE,)]                                  # Row 1: Title
+    rows += [pair_row(*row) for row in HEADER_PAIR_ROWS]      # Rows 2-4
+    rows.append(())                                           # Row 5: spacing
+    rows.append(tuple(TIMELINE_HEADER))                       # Row 6: table header
+    for label, prefix, (start_default, end_default, action_default) in TIMELINE_ROWS:  # Rows 7-16
+        rows.append((
+            label,
+            Field(f'{prefix}StartTime', start_default, True),
+            Field(f'{prefix}EndTime', end_default, True),
+            Field(f'{prefix}ActionByLSP', action_default, False),
+        ))
+    rows.append(())                                           # Row 17: spacing
+    rows += [pair_row(*row) for row in DETAIL_PAIR_ROWS]      # Rows 18-20
+    rows.append(("", None, None, Field('additionalNotes', '', False)))  # Row 21: notes
+    return tuple(rows)
+
+
+def incident_report_rows(ws, incident_details, bordered=False):
+    """
+    Yields the rows of the "Incident Report" sheet, filled from incident_details.
+
+    Rows can be appended to a write-only or a regular worksheet.
+
+    Args:
+        ws: The worksheet the rows are for (styled cells are bound to it).
+        incident_details (dict): Field values from the incident form.
+        bordered (bool): Draw a thin border round every cell of the non-empty rows and fill the
+            header row, as on the printable template.
+    """
+    get = incident_details.get
+    for row_num, plan in enumerate(report_row_plan(), start=1):
+        values = [
+            (format_datetime_for_excel(get(cell.key, cell.default)) if cell.is_datetime
+             else get(cell.key, cell.default)) if isinstance(cell, Field) else cell
+            for cell in plan
+        ]
+        if row_num == 1:
+            title = WriteOnlyCell(ws, values[0])
+            title.font = TITLE_FONT
+            title.fill = TITLE_FILL
+            if bordered:
+                title.alignment = HEADER_ALIGNMENT
+            yield [title]
+        elif bordered and values:
+            values += [None] * (REPORT_COLUMNS - len(values))
+            cells = []
+            for value in values:
+                cell = WriteOnlyCell(ws, value)
+                cell.border = THIN_BORDER
+                if row_num in HEADER_ROWS:
+                    cell.font = HEADER_FONT
+                    cell.fill = HEADER_FILL
+                    cell.alignment = HEADER_ALIGNMENT
+                cells.append(cell)
+            yield cells
+        else:
+            yield values
+
+
+def write_report_sheet(wb, incident_details, bordered=False, title=REPORT_SHEET_NAME):
+    """
+    Adds the filled incident report sheet to wb (write-only or regular).
+
+    Args:
+        wb: Workbook to add the sheet to.
+        incident_details (dict): Field values from the incident form.
+        bordered (bool): As for incident_report_rows().
+        title (str): Sheet name.
+
+    Returns:
+        The new worksheet.
+    """
+    ws = wb.create_sheet(title)
+    # Column widths must be set before the first row is written in write-only mode
+    for column, width in REPORT_COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+    for row in incident_report_rows(ws, incident_details, bordered):
+        ws.append(row)
+    for cell_range in REPORT_MERGED_RANGES:
+        if hasattr(ws, 'merge_cells'):
+            ws.merge_cells(cell_range)
+        else: # Write-only sheets only record the range
+            ws.merged_cells.add(CellRange(cell_range))
+    return ws
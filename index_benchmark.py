@@ -0,0 +1,196 @@
+"""
+Index Benchmark for the Report and Inventory Query Patterns
+
+Fills a SQLite stand-in database (database_setup_sqlite.sql) with generated fault reports and
+inventory transactions, then runs the statements the API issues for the report list, the
+inventory export and the ledger totals twice: once without the "Query-Pattern Indexes" section
+of the schema and once with it. Each run prints the query plan and the best time per query, so
+the effect of those indexes can be checked before they are applied to SQL Server:
+    python index_benchmark.py --rows 1000000
+"""
+
+import argparse
+import random
+import re
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from db_pool import SQLITE_SCHEMA_PATH, create_sqlite_database
+from export_api import inventory_transactions_query
+from reports_api import reports_page_query
+
+DEFAULT_ROWS = 1000000
+DEFAULT_REPEAT = 5
+INSERT_BATCH_SIZE = 50000
+PAGE_SIZE = 50
+MATERIAL_COUNT = 200
+HISTORY_DAYS = 3 * 365
+START_TIME = datetime(2023, 1, 1)
+
+INDEX_SECTION_TITLE = "Query-Pattern Indexes"
+CREATE_INDEX_PATTERN = re.compile(r"CREATE INDEX IF NOT EXISTS (\w+)\b.*?;", re.DOTALL)
+
+# Most reports are closed out; the open queue is the small, hot slice
+STATUS_WEIGHTS = {'resolved': 70, 'closed': 20, 'open': 6, 'in_progress': 4}
+TRANSACTION_TYPE_WEIGHTS = {'receipt': 30, 'issue': 55, 'return': 8, 'damage': 4, 'adjustment': 3}
+REGIONS = ["Yangon", "Mandalay", "Naypyitaw", "Bago", "Ayeyarwady", "Sagaing", "Magway", "Shan"]
+TOWNSHIPS_PER_REGION = 5
+PRIORITIES = ["low", "medium", "high", "critical"]
+
+LEDGER_TOTALS_SQL = ("SELECT material_code, transaction_type, SUM(quantity), MAX(transaction_date) "
+                     "FROM material_inventory GROUP BY material_code, transaction_type")
+
+
+def tuned_indexes(schema_path=SQLITE_SCHEMA_PATH):
+    """
+    Reads the CREATE INDEX statements of the schema's query-pattern section.
+
+    Returns:
+        list[tuple[str, str]]: (index name, statement) pairs, in script order.
+    """
+    script = Path(schema_path).read_text(encoding='utf-8')
+    start = script.index(f". {INDEX_SECTION_TITLE}")
+    # The section runs to the opening rule of the next section header
+    end = script.find("\n-- =====", script.index("\n-- =====", start) + 1)
+    section = script[start:end if end != -1 else len(script)]
+    return [(match.group(1), match.group(0)) for match in CREATE_INDEX_PATTERN.finditer(section)]
+
+
+def weighted(rng, weights):
+    """Returns one key of weights, chosen in proportion to its weight."""
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def random_time(rng):
+    """Returns a timestamp in the stored text form, within HISTORY_DAYS of START_TIME."""
+    moment = START_TIME + timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+    return moment.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def material_codes(count=MATERIAL_COUNT):
+    return [f"BM-{number:04d}" for number in range(1, count + 1)]
+
+
+def generate_dataset(path, rows, seed=0):
+    """
+    Creates the stand-in database at path and adds rows fault reports and rows inventory
+    transactions (plus MATERIAL_COUNT materials for them to reference).
+    """
+    create_sqlite_database(path)
+    rng = random.Random(seed)
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        codes = material_codes()
+        conn.executemany(
+            "INSERT OR IGNORE INTO materials_info (material_code, material_name, material_type, uom, "
+            "unit_price, created_by) VALUES (?, ?, 'Benchmark', 'Each', 1.00, 1)",
+            [(code, f"Benchmark material {code}") for code in codes])
+
+        for first in range(0, rows, INSERT_BATCH_SIZE):
+            batch = []
+            for number in range(first, min(first + INSERT_BATCH_SIZE, rows)):
+                region = rng.choice(REGIONS)
+                batch.append((f"BENCH-{number:08d}", "Benchmark", "Fiber cut", region,
+                              f"{region} T{rng.randrange(TOWNSHIPS_PER_REGION)}", random_time(rng),
+                              weighted(rng, STATUS_WEIGHTS), rng.choice(PRIORITIES)))
+            conn.executemany(
+                "INSERT INTO fault_reports (trans_num, project_name, fault_name, region, township, "
+                "raised_time, status, priority, created_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)", batch)
+
+            conn.executemany(
+                "INSERT INTO material_inventory (material_code, transaction_type, quantity, unit_cost, "
+                "transaction_date, created_by) VALUES (?, ?, ?, ?, ?, 1)",
+                [(rng.choice(codes), weighted(rng, TRANSACTION_TYPE_WEIGHTS), rng.randrange(1, 500),
+                  round(rng.uniform(0.5, 50), 2), random_time(rng)) for _ in range(len(batch))])
+            conn.commit()
+    finally:
+        conn.close()
+
+
+def benchmark_queries():
+    """
+    The statements under test, as the API builds them.
+
+    Returns:
+        list[tuple[str, str, list]]: (label, statement, parameters).
+    """
+    month_start = START_TIME + timedelta(days=HISTORY_DAYS // 2)
+    lower, upper = month_start.strftime('%Y-%m-01'), (month_start + timedelta(days=31)).strftime('%Y-%m-01')
+    return [
+        ("reports: status + region", *reports_page_query(
+            'sqlite', {'status': 'in_progress', 'region': REGIONS[0]}, PAGE_SIZE + 1)),
+        ("reports: open queue", *reports_page_query('sqlite', {'status': 'open'}, PAGE_SIZE + 1)),
+        ("reports: region", *reports_page_query('sqlite', {'region': REGIONS[1]}, PAGE_SIZE + 1)),
+        ("inventory: material month", *inventory_transactions_query(lower, upper, material_codes()[0])),
+        ("inventory: ledger totals", LEDGER_TOTALS_SQL, []),
+    ]
+
+
+def query_plan(conn, sql, params):
+    return "; ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def best_time(conn, sql, params, repeat):
+    """Returns (best elapsed seconds, rows) over repeat runs of the statement."""
+    best, rows = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, rows
+
+
+def run_benchmark(path, repeat=DEFAULT_REPEAT):
+    """
+    Times every benchmark query without, then with, the query-pattern indexes.
+
+    Returns:
+        dict: label -> {'before': (seconds, plan, rows), 'after': (seconds, plan, rows)}.
+    """
+    indexes = tuned_indexes()
+    results = {}
+    conn = sqlite3.connect(str(path))
+    try:
+        for phase in ('before', 'after'):
+            for name, statement in indexes:
+                conn.execute(f"DROP INDEX IF EXISTS {name}" if phase == 'before' else statement)
+            conn.execute("ANALYZE")
+            for label, sql, params in benchmark_queries():
+                elapsed, rows = best_time(conn, sql, params, repeat)
+                results.setdefault(label, {})[phase] = (elapsed, query_plan(conn, sql, params), rows)
+    finally:
+        conn.close()
+    return results
+
+
+def print_results(results):
+    for label, phases in results.items():
+        print(label)
+        for phase in ('before', 'after'):
+            print(f"  {phase:<6} {phases[phase][0] * 1000:10.2f} ms  {phases[phase][1]}")
+    print()
+    print(f"{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for label, phases in results.items():
+        before, after = phases['before'][0], phases['after'][0]
+        print(f"{label:<28}{before * 1000:12.2f}{after * 1000:12.2f}{before / max(after, 1e-9):9.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare report/inventory query plans and timings "
+                                                 "with and without the query-pattern indexes.")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help="Fault reports and inventory transactions to generate (each)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Runs per query; the best is kept")
+    parser.add_argument('--database', help="SQLite file to build (default: a temporary file)")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.database or Path(directory) / 'index_benchmark.db'
+        print(f"Generating {args.rows} reports and {args.rows} inventory transactions in {path} ...")
+        generate_dataset(path, args.rows)
+        print_results(run_benchmark(path, args.repeat))
@@ -0,0 +1,348 @@
+"""
+Material Inventory API (/api/inventory)
+
+Current stock per material and the inventory transaction route, as declared in
+database_config.json.
+
+Balances come from material_inventory_balances (through vw_material_inventory_summary), a
+running total kept up to date with every transaction, so listing stock reads one row per
+material instead of aggregating the whole material_inventory ledger.
+
+The transaction route also takes a JSON array or a CSV file of transactions. Bulk loads are
+checked against a cached set of active material codes and inserted with executemany in chunks,
+one database transaction per chunk, with their balance updates batched too.
+
+Audit entries go through the app's AuditQueue (audit_log.py) once the write has committed,
+instead of being inserted inside the transaction.
+"""
+
+import csv
+import io
+import threading
+import time
+import weakref
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from flask import Blueprint, jsonify, request
+
+from audit_log import current_audit_queue
+from db_pool import current_pool, fetch_dicts, json_row
+
+inventory_bp = Blueprint('inventory', __name__, url_prefix='/api/inventory')
+
+# Transaction type -> running total it adds to
+TYPE_TOTAL_COLUMNS = {
+    'receipt': 'total_receipts',
+    'issue': 'total_issues',
+    'return': 'total_returns',
+    'damage': 'total_damages',
+    'adjustment': 'total_adjustments',
+}
+# Types that take stock out; everything else (adjustments signed) adds to the balance
+OUTGOING_TYPES = {'issue', 'damage'}
+
+SUMMARY_COLUMNS = [
+    "material_code", "material_name", "material_type", "uom", "total_receipts", "total_issues",
+    "total_returns", "total_damages", "total_adjustments", "current_balance", "last_transaction_date",
+]
+
+INSERT_COLUMNS = ["material_code", "transaction_type", "quantity", "unit_cost", "transaction_ref", "notes",
+                  "created_by", "transaction_date"]
+
+# Rows per database transaction in a bulk load, and most rows accepted per request
+BULK_CHUNK_SIZE = 1000
+MAX_BULK_TRANSACTIONS = 100000
+MATERIAL_CODE_CACHE_SECONDS = 300
+
+MSSQL_ADD_TRANSACTION_SQL = """
+SET NOCOUNT ON;
+DECLARE @inventory_id INT;
+EXEC [dbo].[sp_add_inventory_transaction] @material_code = ?, @transaction_type = ?, @quantity = ?,
+    @unit_cost = ?, @transaction_ref = ?, @notes = ?, @created_by = ?, @log_action = 0,
+    @inventory_id = @inventory_id OUTPUT;
+SELECT @inventory_id;
+"""
+
+
+def error_response(message, status):
+    return jsonify({'error': message}), status
+
+
+class ActiveMaterialCodes:
+    """
+    Per-pool cache of the active material codes in materials_info.
+
+    Bulk loads validate every row against this set instead of querying per row. Entries expire
+    after ttl seconds; invalidate() drops them at once after materials_info changes.
+    """
+
+    def __init__(self, ttl=MATERIAL_CODE_CACHE_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary()  # pool -> (loaded_at, frozenset)
+
+    def get(self, pool):
+        with self._lock:
+            entry = self._entries.get(pool)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                return entry[1]
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT material_code FROM materials_info WHERE is_active = 1")
+            codes = frozenset(row[0] for row in cursor.fetchall())
+        with self._lock:
+            self._entries[pool] = (time.monotonic(), codes)
+        return codes
+
+    def invalidate(self, pool=None):
+        with self._lock:
+            if pool is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(pool, None)
+
+
+active_material_codes = ActiveMaterialCodes()
+
+
+def balance_delta(transaction_type, quantity):
+    """Signed change a transaction makes to the current balance."""
+    return -quantity if transaction_type in OUTGOING_TYPES else quantity
+
+
+def apply_balance_deltas(conn, dialect, transactions):
+    """
+    Adds transactions to the running balances, one statement per material touched.
+
+    Args:
+        conn: Pooled DB-API connection (same transaction as the material_inventory inserts).
+        dialect (str): 'mssql' or 'sqlite'.
+        transactions: (material_code, transaction_type, quantity, transaction_date) tuples.
+    """
+    totals = {}
+    for material_code, transaction_type, quantity, transaction_date in transactions:
+        entry = totals.setdefault(material_code, {
+            **{column: Decimal(0) for column in TYPE_TOTAL_COLUMNS.values()},
+            'current_balance': Decimal(0), 'last_transaction_date': None,
+        })
+        quantity = Decimal(str(quantity))
+        entry[TYPE_TOTAL_COLUMNS[transaction_type]] += quantity
+        entry['current_balance'] += balance_delta(transaction_type, quantity)
+        if entry['last_transaction_date'] is None or transaction_date > entry['last_transaction_date']:
+            entry['last_transaction_date'] = transaction_date
+
+    amount_columns = list(TYPE_TOTAL_COLUMNS.values()) + ['current_balance']
+    # SQL Server: hold the key range so two writers cannot both insert a missing balance row
+    hint = " WITH (UPDLOCK, HOLDLOCK)" if dialect == 'mssql' else ""
+    update_sql = (
+        f"UPDATE material_inventory_balances{hint} SET "
+        + ", ".join(f"{column} = {column} + ?" for column in amount_columns)
+        + ", last_transaction_date = CASE WHEN last_transaction_date IS NULL OR last_transaction_date < ? "
+          "THEN ? ELSE last_transaction_date END, updated_at = CURRENT_TIMESTAMP WHERE material_code = ?"
+    )
+    insert_sql = (
+        f"INSERT INTO material_inventory_balances (material_code, {', '.join(amount_columns)}, "
+        f"last_transaction_date) VALUES ({', '.join('?' * (len(amount_columns) + 2))})"
+    )
+    cursor = conn.cursor()
+    for material_code, entry in totals.items():
+        # sqlite3 cannot bind Decimal
+        amounts = [float(entry[column]) if dialect == 'sqlite' else entry[column] for column in amount_columns]
+        last_date = entry['last_transaction_date']
+        cursor.execute(update_sql, amounts + [last_date, last_date, material_code])
+        if cursor.rowcount == 0:
+            cursor.execute(insert_sql, [material_code] + amounts + [last_date])
+
+
+def transaction_log_text(transaction):
+    """system_logs.new_values for an inventory transaction, as sp_add_inventory_transaction writes it."""
+    text = (f"Material: {transaction['material_code']}, Type: {transaction['transaction_type']}, "
+            f"Qty: {transaction['quantity']}")
+    if transaction.get('transaction_ref'):
+        text += f", Ref: {transaction['transaction_ref']}"
+    return text
+
+
+def record_transaction(conn, dialect, transaction):
+    """
+    Records one inventory transaction and applies it to the running balance.
+
+    On SQL Server this is sp_add_inventory_transaction, which does both in one transaction;
+    the SQLite stand-in runs the same steps here. The audit entry is left to the caller.
+
+    Returns:
+        int: inventory_id of the new material_inventory row.
+    """
+    params = [transaction['material_code'], transaction['transaction_type'], transaction['quantity'],
+              transaction.get('unit_cost'), transaction.get('transaction_ref'), transaction.get('notes'),
+              transaction['created_by']]
+    cursor = conn.cursor()
+    if dialect == 'mssql':
+        cursor.execute(MSSQL_ADD_TRANSACTION_SQL, params)
+        return cursor.fetchone()[0]
+
+    transaction_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    params[2] = float(params[2])
+    cursor.execute(
+        "INSERT INTO material_inventory (material_code, transaction_type, quantity, unit_cost, transaction_ref, "
+        "notes, created_by, transaction_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        params + [transaction_date],
+    )
+    apply_balance_deltas(conn, dialect, [(transaction['material_code'], transaction['transaction_type'],
+                                          transaction['quantity'], transaction_date)])
+    return cursor.lastrowid
+
+
+def insert_transactions(conn, dialect, transactions):
+    """
+    Inserts a batch of validated transactions with their balance updates.
+
+    Runs in the caller's transaction: one executemany into material_inventory and one balance
+    statement per material. On SQL Server the insert uses pyodbc's fast_executemany, which sends
+    the whole batch in a single round trip.
+    """
+    transaction_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    rows = []
+    for transaction in transactions:
+        row = [transaction.get(column) for column in INSERT_COLUMNS]
+        row[2] = float(row[2]) if dialect == 'sqlite' else row[2]
+        row[-1] = transaction_date
+        rows.append(row)
+    cursor = conn.cursor()
+    if dialect == 'mssql':
+        cursor.fast_executemany = True
+    cursor.executemany(
+        f"INSERT INTO material_inventory ({', '.join(INSERT_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(INSERT_COLUMNS))})", rows)
+    apply_balance_deltas(conn, dialect, [(t['material_code'], t['transaction_type'], t['quantity'],
+                                          transaction_date) for t in transactions])
+
+
+def read_csv_transactions(text):
+    """Rows of a CSV upload as transaction dicts, with empty cells as missing values."""
+    reader = csv.DictReader(io.StringIO(text))
+    return [{key.strip(): (value.strip() or None) if isinstance(value, str) else value
+             for key, value in row.items() if key} for row in reader]
+
+
+def validate_transaction(data):
+    """Returns (transaction, None) with quantity as Decimal, or (None, error message)."""
+    if not isinstance(data, dict):
+        return None, "Expected a JSON object"
+    missing = [key for key in ('material_code', 'transaction_type', 'quantity', 'created_by')
+               if data.get(key) in (None, '')]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    if data['transaction_type'] not in TYPE_TOTAL_COLUMNS:
+        return None, f"transaction_type must be one of: {', '.join(TYPE_TOTAL_COLUMNS)}"
+    try:
+        quantity = Decimal(str(data['quantity']))
+    except InvalidOperation:
+        return None, "quantity must be a number"
+    if not quantity.is_finite():
+        return None, "quantity must be a number"
+    try:
+        created_by = int(data['created_by'])
+    except (TypeError, ValueError):
+        return None, "created_by must be a user id"
+    return {**data, 'quantity': quantity, 'created_by': created_by}, None
+
+
+@inventory_bp.route('/materials', methods=['GET'])
+def list_material_inventory():
+    """
+    GET /api/inventory/materials?material_type=...
+
+    Returns {"materials": [...]}: per-type totals, current balance and last transaction date of
+    every active material.
+    """
+    sql = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM vw_material_inventory_summary"
+    params = []
+    if request.args.get('material_type'):
+        sql += " WHERE material_type = ?"
+        params.append(request.args['material_type'])
+    with current_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql + " ORDER BY material_code", params)
+        rows = fetch_dicts(cursor)
+    return jsonify({'materials': [json_row(row) for row in rows]})
+
+
+@inventory_bp.route('/materials/transaction', methods=['POST'])
+def add_inventory_transaction():
+    """
+    Records one receipt/issue/return/damage/adjustment and returns the material's new summary.
+
+    A JSON array, or a text/csv body with the same field names as header, is a bulk load; see
+    add_inventory_transactions_bulk().
+    """
+    if request.mimetype == 'text/csv':
+        return add_inventory_transactions_bulk(read_csv_transactions(request.get_data(as_text=True)))
+    data = request.get_json(silent=True)
+    if isinstance(data, list):
+        return add_inventory_transactions_bulk(data)
+    transaction, message = validate_transaction(data)
+    if message:
+        return error_response(message, 400)
+
+    pool = current_pool()
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM materials_info WHERE material_code = ? AND is_active = 1",
+                       [transaction['material_code']])
+        if cursor.fetchone() is None:
+            return error_response("Material code does not exist or is inactive", 400)
+        inventory_id = record_transaction(conn, pool.dialect, transaction)
+        cursor.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM vw_material_inventory_summary "
+                       "WHERE material_code = ?", [transaction['material_code']])
+        summary = fetch_dicts(cursor)[0]
+    current_audit_queue().log(transaction['created_by'], 'INSERT', 'material_inventory', inventory_id,
+                              new_values=transaction_log_text(transaction))
+    return jsonify(json_row(summary)), 201
+
+
+def add_inventory_transactions_bulk(rows):
+    """
+    Validates every row, then inserts them BULK_CHUNK_SIZE at a time.
+
+    Nothing is written if any row is invalid. Each chunk commits on its own, so a failure part
+    way through reports how many rows were already stored. Returns 201 with
+    {"inserted": n, "materials": [codes touched]}.
+    """
+    if not rows:
+        return error_response("Expected at least one transaction", 400)
+    if len(rows) > MAX_BULK_TRANSACTIONS:
+        return error_response(f"At most {MAX_BULK_TRANSACTIONS} transactions per request", 400)
+
+    pool = current_pool()
+    active_codes = active_material_codes.get(pool)
+    transactions = []
+    for index, row in enumerate(rows):
+        transaction, message = validate_transaction(row)
+        if not message and transaction['material_code'] not in active_codes:
+            message = "Material code does not exist or is inactive"
+        if message:
+            return error_response(f"Transaction {index}: {message}", 400)
+        transactions.append(transaction)
+
+    audit = current_audit_queue()
+    inserted = 0
+    for start in range(0, len(transactions), BULK_CHUNK_SIZE):
+        chunk = transactions[start:start + BULK_CHUNK_SIZE]
+        try:
+            with pool.connection() as conn:
+                insert_transactions(conn, pool.dialect, chunk)
+        except Exception as e:
+            if inserted:
+                return jsonify({'error': f"Failed after {inserted} transactions: {e}", 'inserted': inserted}), 500
+            raise
+        # executemany does not return identities, so bulk entries carry the reference instead of record_id
+        for transaction in chunk:
+            audit.log(transaction['created_by'], 'BULK_INSERT', 'material_inventory',
+                      new_values=transaction_log_text(transaction))
+        inserted += len(chunk)
+    return jsonify({
+        'inserted': inserted,
+        'materials': sorted({transaction['material_code'] for transaction in transactions}),
+    }), 201
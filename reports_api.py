@@ -0,0 +1,370 @@
+"""
+Fault Reports API (/api/reports)
+
+List, create, get, update and delete routes for fault_reports, as declared in database_config.json.
+Reports are returned with their report_photos, report_materials and report_services rows,
+loaded in batches for the whole page rather than per report.
+
+The list is keyset-paginated on (raised_time, id), newest first: each page ends with a cursor
+holding the last row's (raised_time, id), and the next page starts strictly after it. With the
+IX_fault_reports_raised_time index (whose rows also carry the clustered id) a page is a single
+index seek whatever its depth, where OFFSET would scan and discard every earlier row.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request
+
+from db_pool import current_pool, fetch_dicts, json_row, limited_select
+
+reports_bp = Blueprint('reports', __name__, url_prefix='/api/reports')
+
+REPORT_COLUMNS = [
+    "id", "trans_num", "project_name", "fault_name", "circuit_id", "customer_name", "customer_address",
+    "pic", "region", "township", "location_lat", "location_long", "m_latitude", "m_longitude",
+    "raised_time", "cleared_time", "duration", "root_cause", "status", "priority",
+    "created_at", "updated_at", "created_by", "updated_by",
+]
+# Columns a client may change through PUT; keys, computed and audit columns are managed here
+UPDATABLE_COLUMNS = [
+    "project_name", "fault_name", "circuit_id", "customer_name", "customer_address", "pic",
+    "region", "township", "location_lat", "location_long", "m_latitude", "m_longitude",
+    "raised_time", "cleared_time", "root_cause", "status", "priority", "updated_by",
+]
+# Columns accepted when creating a report; trans_num is allocated here
+CREATABLE_COLUMNS = [column for column in UPDATABLE_COLUMNS if column != "updated_by"] + ["created_by"]
+REQUIRED_COLUMNS = ["project_name", "fault_name", "region", "township", "raised_time", "created_by"]
+# Most reports accepted by one POST
+MAX_CREATE_BATCH = 1000
+
+# One-to-many children returned with each report: key -> (table, columns)
+CHILD_TABLES = {
+    'photos': ('report_photos', [
+        "id", "report_id", "original_name", "unique_name", "file_path", "file_size", "content_type",
+        "label", "thumbnail_path", "thumbnail_size", "web_path", "web_size", "uploaded_at", "uploaded_by",
+    ]),
+    'materials': ('report_materials', [
+        "id", "report_id", "material_code", "material_name", "material_type", "uom", "material_usage",
+        "unit_cost", "total_cost", "notes", "created_at",
+    ]),
+    'services': ('report_services', [
+        "id", "report_id", "service_code", "service_name", "service_type", "uom", "service_usage",
+        "unit_cost", "total_cost", "notes", "created_at",
+    ]),
+}
+# Ids per IN (...) list; SQL Server allows at most 2100 parameters per statement
+CHILD_BATCH_SIZE = 500
+
+# Equality filters accepted by the list route
+LIST_FILTERS = ["region", "status", "township"]
+# Statuses covered by the filtered IX_fault_reports_active_raised index. The optimizer only
+# matches a filtered index against literal values, so these are written into the SQL instead
+# of being bound as parameters (safe: only these fixed strings are ever inlined), together with
+# the index's own filter predicate, which SQLite needs to see verbatim.
+ACTIVE_STATUSES = ("open", "in_progress")
+ACTIVE_STATUS_FILTER = "status IN ('open', 'in_progress')"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+SELECT_LIST = ", ".join(REPORT_COLUMNS)
+
+
+def error_response(message, status):
+    return jsonify({'error': message}), status
+
+
+def encode_cursor(row):
+    """Opaque page cursor for the (raised_time, id) of the last row on a page."""
+    raised_time = row['raised_time']
+    if isinstance(raised_time, datetime):
+        raised_time = raised_time.isoformat(sep=' ')
+    token = json.dumps([raised_time, row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, dialect):
+    """
+    Reverses encode_cursor().
+
+    Raises:
+        ValueError: If the cursor was not produced by encode_cursor().
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raised_time, report_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        report_id = int(report_id)
+        if dialect == 'mssql':
+            raised_time = datetime.fromisoformat(raised_time)
+        elif not isinstance(raised_time, str):
+            raise ValueError("raised_time must be text")
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}") from None
+    return raised_time, report_id
+
+
+def reports_page_query(dialect, filters, limit, after=None):
+    """
+    Builds the statement for one page of reports, newest first.
+
+    Args:
+        dialect (str): 'mssql' or 'sqlite'.
+        filters (dict): column -> value equality filters (LIST_FILTERS only).
+        limit (int): Rows to return.
+        after (tuple | None): (raised_time, id) of the previous page's last row.
+
+    Returns:
+        tuple[str, list]: The statement and its parameters.
+    """
+    clauses, params = [], []
+    for column in LIST_FILTERS:
+        if column == 'status' and filters.get(column) in ACTIVE_STATUSES:
+            clauses += [f"status = '{filters[column]}'", ACTIVE_STATUS_FILTER]
+        elif filters.get(column) is not None:
+            clauses.append(f"{column} = ?")
+            params.append(filters[column])
+    if after is not None:
+        # Row-value comparison spelled out: (raised_time, id) < (?, ?)
+        clauses.append("(raised_time < ? OR (raised_time = ? AND id < ?))")
+        params += [after[0], after[0], after[1]]
+    where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+
+    sql, before, trailing = limited_select(
+        dialect, SELECT_LIST, f"FROM fault_reports {where}ORDER BY raised_time DESC, id DESC", limit)
+    return sql, before + params + trailing
+
+
+def list_reports_page(conn, dialect, filters, limit, after=None):
+    """
+    Reads one page of reports, newest first.
+
+    Args:
+        conn: Pooled DB-API connection.
+        dialect, filters, limit, after: As for reports_page_query().
+
+    Returns:
+        tuple[list[dict], bool]: The rows, and whether more rows follow.
+    """
+    # One extra row tells whether another page exists
+    sql, params = reports_page_query(dialect, filters, limit + 1, after)
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = fetch_dicts(cursor)
+    return rows[:limit], len(rows) > limit
+
+
+def load_children(conn, report_ids):
+    """
+    Loads the photos, materials and services of many reports at once.
+
+    Each child table is read with "WHERE report_id IN (...)" over the whole id list (in
+    batches of CHILD_BATCH_SIZE), so a page costs one query per child table however many
+    reports it holds, instead of one per report per table.
+
+    Returns:
+        dict: report_id -> {'photos': [...], 'materials': [...], 'services': [...]}, with an
+            entry (of empty lists) for every id asked for.
+    """
+    children = {report_id: {key: [] for key in CHILD_TABLES} for report_id in report_ids}
+    ids = list(children)
+    cursor = conn.cursor()
+    for key, (table, columns) in CHILD_TABLES.items():
+        for start in range(0, len(ids), CHILD_BATCH_SIZE):
+            batch = ids[start:start + CHILD_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE report_id IN ({placeholders}) ORDER BY report_id, id",
+                batch,
+            )
+            for row in fetch_dicts(cursor):
+                children[row['report_id']][key].append(json_row(row))
+    return children
+
+
+def with_children(conn, reports):
+    """JSON rows of reports, each with its photos, materials and services attached."""
+    children = load_children(conn, [report['id'] for report in reports])
+    return [{**json_row(report), **children[report['id']]} for report in reports]
+
+
+def fetch_report(conn, key_column, key):
+    """Returns the report whose key_column ('id' or 'trans_num') equals key, or None."""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {SELECT_LIST} FROM fault_reports WHERE {key_column} = ?", [key])
+    rows = fetch_dicts(cursor)
+    return rows[0] if rows else None
+
+
+def validate_new_report(data):
+    """Returns an error message for a report that cannot be created as given, or None."""
+    if not isinstance(data, dict):
+        return "Each report must be a JSON object"
+    unknown = sorted(set(data) - set(CREATABLE_COLUMNS))
+    if unknown:
+        return f"Unknown fields: {', '.join(unknown)}"
+    missing = [column for column in REQUIRED_COLUMNS if data.get(column) in (None, '')]
+    if missing:
+        return f"Missing required fields: {', '.join(missing)}"
+    return None
+
+
+def insert_reports(conn, reports, trans_nums):
+    """
+    Inserts new reports under the given transaction numbers.
+
+    Reports sending the same set of fields are inserted together with executemany; fields a
+    report leaves out get their column defaults.
+    """
+    groups = {}
+    for report, trans_num in zip(reports, trans_nums):
+        columns = tuple(column for column in CREATABLE_COLUMNS if column in report)
+        groups.setdefault(columns, []).append([trans_num] + [report[column] for column in columns])
+    cursor = conn.cursor()
+    for columns, rows in groups.items():
+        placeholders = ", ".join("?" * (len(columns) + 1))
+        cursor.executemany(
+            f"INSERT INTO fault_reports (trans_num, {', '.join(columns)}) VALUES ({placeholders})", rows)
+
+
+def fetch_reports_by_trans_num(conn, trans_nums):
+    """The reports with the given transaction numbers, in that order."""
+    found = {}
+    cursor = conn.cursor()
+    for start in range(0, len(trans_nums), CHILD_BATCH_SIZE):
+        batch = trans_nums[start:start + CHILD_BATCH_SIZE]
+        cursor.execute(
+            f"SELECT {SELECT_LIST} FROM fault_reports WHERE trans_num IN ({', '.join('?' * len(batch))})", batch)
+        found.update((row['trans_num'], row) for row in fetch_dicts(cursor))
+    return [found[trans_num] for trans_num in trans_nums]
+
+
+@reports_bp.route('', methods=['GET'])
+def list_reports():
+    """
+    GET /api/reports?limit=50&cursor=...&region=...&status=...&township=...
+
+    Returns {"reports": [...], "next_cursor": str | null}; pass next_cursor back to get the
+    following page. Each report carries its photos, materials and services, loaded for the
+    whole page in one query per child table (4 queries per page in all).
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return error_response("limit must be an integer", 400)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return error_response(f"limit must be between 1 and {MAX_PAGE_SIZE}", 400)
+
+    pool = current_pool()
+    after = None
+    if request.args.get('cursor'):
+        try:
+            after = decode_cursor(request.args['cursor'], pool.dialect)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+    filters = {column: request.args.get(column) for column in LIST_FILTERS}
+    with pool.connection() as conn:
+        rows, has_more = list_reports_page(conn, pool.dialect, filters, limit, after)
+        reports = with_children(conn, rows)
+    return jsonify({
+        'reports': reports,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+    })
+
+
+@reports_bp.route('', methods=['POST'])
+def create_reports():
+    """
+    Creates one report (JSON object) or many (JSON array of objects).
+
+    Transaction numbers come from the app's TransNumAllocator, which reserves them in blocks,
+    so concurrent and bulk creates get unique numbers without scanning fault_reports. Returns
+    201 with the stored report, or {"reports": [...]} for an array.
+    """
+    data = request.get_json(silent=True)
+    reports = data if isinstance(data, list) else [data]
+    if not reports or data is None:
+        return error_response("Expected a report object or an array of reports", 400)
+    if len(reports) > MAX_CREATE_BATCH:
+        return error_response(f"At most {MAX_CREATE_BATCH} reports per request", 400)
+    for index, report in enumerate(reports):
+        message = validate_new_report(report)
+        if message:
+            return error_response(f"Report {index}: {message}" if isinstance(data, list) else message, 400)
+
+    trans_nums = current_app.extensions['trans_num_allocator'].allocate(len(reports))
+    try:
+        with current_pool().connection() as conn:
+            insert_reports(conn, reports, trans_nums)
+            created = fetch_reports_by_trans_num(conn, trans_nums)
+    except Exception as e:
+        if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+            return error_response(f"Invalid value: {e}", 400)
+        raise
+    if isinstance(data, list):
+        return jsonify({'reports': [json_row(report) for report in created]}), 201
+    return jsonify(json_row(created[0])), 201
+
+
+@reports_bp.route('/<int:report_id>', methods=['GET'])
+def get_report_by_id(report_id):
+    """One report with its photos, materials and services (4 queries)."""
+    with current_pool().connection() as conn:
+        report = fetch_report(conn, 'id', report_id)
+        if report is None:
+            return error_response("Report not found", 404)
+        return jsonify(with_children(conn, [report])[0])
+
+
+@reports_bp.route('/<trans_num>', methods=['GET'])
+def get_report(trans_num):
+    """One report with its photos, materials and services (4 queries)."""
+    with current_pool().connection() as conn:
+        report = fetch_report(conn, 'trans_num', trans_num)
+        if report is None:
+            return error_response("Report not found", 404)
+        return jsonify(with_children(conn, [report])[0])
+
+
+@reports_bp.route('/<trans_num>', methods=['PUT'])
+def update_report(trans_num):
+    """Updates the given columns of one report and returns the stored row."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not data:
+        return error_response("Expected a JSON object of fields to update", 400)
+    unknown = sorted(set(data) - set(UPDATABLE_COLUMNS))
+    if unknown:
+        return error_response(f"Fields cannot be updated: {', '.join(unknown)}", 400)
+
+    columns = [column for column in UPDATABLE_COLUMNS if column in data]
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    try:
+        with current_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE fault_reports SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE trans_num = ?",
+                [data[column] for column in columns] + [trans_num],
+            )
+            if cursor.rowcount == 0:
+                return error_response("Report not found", 404)
+            report = fetch_report(conn, 'trans_num', trans_num)
+    except Exception as e:
+        if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+            return error_response(f"Invalid value: {e}", 400)
+        raise
+    return jsonify(json_row(report))
+
+
+@reports_bp.route('/<trans_num>', methods=['DELETE'])
+def delete_report(trans_num):
+    """Deletes one report; its photos, materials and services go with it (ON DELETE CASCADE)."""
+    with current_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM fault_reports WHERE trans_num = ?", [trans_num])
+        deleted = cursor.rowcount
+    if deleted == 0:
+        return error_response("Report not found", 404)
+    return '', 204
@@ -0,0 +1,240 @@
+"""
+RFO Matcher Benchmark and Accuracy Harness
+
+Generates a labelled corpus of noisy root-cause strings from the RFO table (typos, casing,
+parentheses, punctuation, extra and dropped words), then for each matching strategy (exact,
+fuzzy, substring) and for the full detect_rfo_expression pipeline:
+- measures queries/second and p50/p99 latency of RFODetector and of the reference matcher
+- checks that RFODetector returns exactly what the reference (the original linear-scan
+  implementation) returns
+
+Usage:
+    python rfo_benchmark.py [--size 2000] [--seed 42] [--threshold 0.8]
+
+Exits with status 1 if any strategy disagrees with the reference.
+"""
+
+import argparse
+import difflib
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from exp_detect_improved import COMPREHENSIVE_TEST_CASES, RFODetector, RFOEntry
+
+EXTRA_WORDS = ["issue", "problem", "at site", "again", "urgent", "reported by FM", "checked", "need replace"]
+NOISE_KINDS = ("clean", "typo_drop", "typo_swap", "typo_replace", "casing", "parentheses",
+               "punctuation", "extra_words", "dropped_word")
+STRATEGIES = ("exact", "fuzzy", "substring", "pipeline")
+
+
+@dataclass(frozen=True)
+class LabelledQuery:
+    """A corpus entry: the noisy text, the code it was generated from and the noise applied."""
+    text: str
+    expected_code: Optional[str]
+    noise: str
+
+
+class ReferenceMatcher:
+    """The original linear-scan matcher, kept as the behavioural reference."""
+
+    def __init__(self, detector: RFODetector):
+        self.detector = detector
+        self.rfo_entries = detector.rfo_entries
+
+    def find_exact(self, normalized_expression: str) -> Optional[RFOEntry]:
+        for rfo in self.rfo_entries:
+            if normalized_expression == rfo.normalized_root_caused:
+                return rfo
+        return None
+
+    def find_fuzzy(self, normalized_expression: str, threshold: float) -> Optional[RFOEntry]:
+        best_match = None
+        highest_similarity = 0.0
+        for rfo in self.rfo_entries:
+            similarity = difflib.SequenceMatcher(None, normalized_expression, rfo.normalized_root_caused).ratio()
+            if similarity >= threshold and similarity > highest_similarity:
+                highest_similarity = similarity
+                best_match = rfo
+        return best_match
+
+    def find_substring(self, normalized_expression: str) -> Optional[RFOEntry]:
+        for rfo in self.rfo_entries:
+            if normalized_expression in rfo.normalized_root_caused or rfo.normalized_root_caused in normalized_expression:
+                return rfo
+        return None
+
+    def detect(self, expression_word: str, fuzzy_threshold: float = 0.8) -> Union[Tuple[str, str], str]:
+        """Same contract as RFODetector.detect_rfo_expression()."""
+        if not expression_word or not expression_word.strip():
+            return "Empty expression provided"
+        if not 0.0 <= fuzzy_threshold <= 1.0:
+            raise ValueError("fuzzy_threshold must be between 0.0 and 1.0")
+        normalized_expression = self.detector._normalize_text(expression_word)
+        if not normalized_expression:
+            return "Expression contains no valid characters"
+        match = (self.find_exact(normalized_expression)
+                 or self.find_fuzzy(normalized_expression, fuzzy_threshold)
+                 or self.find_substring(normalized_expression))
+        if match is not None:
+            return (match.code, match.root_caused)
+        return "expression need to be upgrade"
+
+
+def _add_noise(text: str, noise: str, rng: random.Random) -> str:
+    """Apply one kind of noise to a root-cause description."""
+    words = text.split()
+    if noise in ("typo_drop", "typo_swap", "typo_replace") and len(text) > 3:
+        i = rng.randrange(len(text) - 1)
+        if noise == "typo_drop":
+            return text[:i] + text[i + 1:]
+        if noise == "typo_swap":
+            return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+        return text[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + text[i + 1:]
+    if noise == "casing":
+        return rng.choice([text.upper(), text.lower(), text.title(), f"  {text}  "])
+    if noise == "parentheses":
+        return f"{text} ({rng.choice(EXTRA_WORDS)})"
+    if noise == "punctuation":
+        return rng.choice(["-", "/", ".", ","]).join(words)
+    if noise == "extra_words":
+        return f"{text} {rng.choice(EXTRA_WORDS)}" if rng.random() < 0.5 else f"{rng.choice(EXTRA_WORDS)} {text}"
+    if noise == "dropped_word" and len(words) > 1:
+        del words[rng.randrange(len(words))]
+        return " ".join(words)
+    return text
+
+
+def generate_noisy_corpus(detector: RFODetector, size: int = 2000, seed: int = 42) -> List[LabelledQuery]:
+    """
+    Build a reproducible labelled corpus: COMPREHENSIVE_TEST_CASES plus `size` noisy variants
+    of random RFO descriptions.
+
+    Labels are the code an exact match on the clean description gives (the first entry for
+    duplicated descriptions); the hand-picked cases carry no label.
+    """
+    rng = random.Random(seed)
+    corpus = [LabelledQuery(text, None, "hand_picked") for text, _ in COMPREHENSIVE_TEST_CASES]
+    for _ in range(size):
+        rfo = rng.choice(detector.rfo_entries)
+        noise = rng.choice(NOISE_KINDS)
+        expected = detector.get_rfo_by_code(rfo.code)
+        first = next(e for e in detector.rfo_entries if e.normalized_root_caused == expected.normalized_root_caused)
+        corpus.append(LabelledQuery(_add_noise(rfo.root_caused, noise, rng), first.code, noise))
+    return corpus
+
+
+def measure(fn: Callable, inputs: Sequence) -> Tuple[List, Dict[str, float]]:
+    """
+    Call fn once per input.
+
+    Returns:
+        Tuple of (results, {"qps", "p50_us", "p99_us"})
+    """
+    results = []
+    latencies = []
+    clock = time.perf_counter
+    for value in inputs:
+        start = clock()
+        results.append(fn(value))
+        latencies.append(clock() - start)
+    total = sum(latencies)
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return results, {
+        "qps": len(inputs) / total if total else float("inf"),
+        "p50_us": quantiles[49] * 1e6,
+        "p99_us": quantiles[98] * 1e6,
+    }
+
+
+def run_benchmark(size: int = 2000, seed: int = 42, threshold: float = 0.8,
+                  detector: Optional[RFODetector] = None) -> Dict[str, Dict]:
+    """
+    Benchmark each strategy of `detector` against the reference matcher on a noisy corpus.
+
+    Returns:
+        {strategy: {"indexed": stats, "reference": stats, "agreement": fraction,
+                    "mismatches": [query, ...]}}, plus {"accuracy": {noise: fraction}} for the
+        pipeline's hit rate against the corpus labels
+    """
+    detector = detector or RFODetector()
+    reference = ReferenceMatcher(detector)
+    corpus = generate_noisy_corpus(detector, size, seed)
+    texts = [query.text for query in corpus]
+    normalized = [t for t in (detector._normalize_text(text) for text in texts) if t]
+
+    cases = {
+        "exact": (normalized, detector._find_exact_match, reference.find_exact),
+        "fuzzy": (normalized, lambda t: detector._find_fuzzy_match(t, threshold),
+                  lambda t: reference.find_fuzzy(t, threshold)),
+        "substring": (normalized, detector._find_substring_match, reference.find_substring),
+        "pipeline": (texts, lambda t: detector.detect_rfo_expression(t, threshold),
+                     lambda t: reference.detect(t, threshold)),
+    }
+    results: Dict[str, Dict] = {}
+    for strategy in STRATEGIES:
+        inputs, indexed_fn, reference_fn = cases[strategy]
+        indexed_results, indexed_stats = measure(indexed_fn, inputs)
+        reference_results, reference_stats = measure(reference_fn, inputs)
+        mismatches = [value for value, got, want in zip(inputs, indexed_results, reference_results) if got != want]
+        results[strategy] = {
+            "indexed": indexed_stats,
+            "reference": reference_stats,
+            "agreement": 1 - len(mismatches) / len(inputs) if inputs else 1.0,
+            "mismatches": mismatches,
+        }
+        if strategy == "pipeline":
+            pipeline_results = indexed_results
+
+    hits: Dict[str, List[bool]] = {}
+    for query, result in zip(corpus, pipeline_results):
+        if query.expected_code is not None:
+            hits.setdefault(query.noise, []).append(isinstance(result, tuple) and result[0] == query.expected_code)
+    results["accuracy"] = {noise: sum(flags) / len(flags) for noise, flags in sorted(hits.items())}
+    return results
+
+
+def print_report(results: Dict[str, Dict]) -> None:
+    """Print the benchmark results as plain-text tables."""
+    print("=== RFO Matcher Benchmark ===\n")
+    print(f"{'strategy':<10} {'impl':<10} {'qps':>12} {'p50 (us)':>10} {'p99 (us)':>10} {'agreement':>10}")
+    for strategy in STRATEGIES:
+        row = results[strategy]
+        for impl in ("indexed", "reference"):
+            stats = row[impl]
+            agreement = f"{row['agreement']:.2%}" if impl == "indexed" else ""
+            print(f"{strategy:<10} {impl:<10} {stats['qps']:>12,.0f} {stats['p50_us']:>10.1f} "
+                  f"{stats['p99_us']:>10.1f} {agreement:>10}")
+        speedup = row["indexed"]["qps"] / row["reference"]["qps"]
+        print(f"{'':<10} speedup x{speedup:,.1f}")
+        for mismatch in row["mismatches"][:5]:
+            print(f"  MISMATCH: {mismatch!r}")
+
+    print("\n=== Pipeline accuracy against corpus labels ===\n")
+    for noise, accuracy in results["accuracy"].items():
+        print(f"{noise:<14} {accuracy:.1%}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line; returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Benchmark RFODetector against the reference matcher.")
+    parser.add_argument("--size", type=int, default=2000, help="noisy queries to generate")
+    parser.add_argument("--seed", type=int, default=42, help="corpus random seed")
+    parser.add_argument("--threshold", type=float, default=0.8, help="fuzzy_threshold to test")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.size, args.seed, args.threshold)
+    print_report(results)
+    disagreements = [s for s in STRATEGIES if results[s]["mismatches"]]
+    if disagreements:
+        print(f"\nFAILED: disagreement with the reference in {', '.join(disagreements)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+RFO Standardization Pipeline Stage
+
+Maps free-text root causes onto standard RFO codes with exp_detect_improved.RFODetector and
+writes RFO_CODE / RFO_PRIORITY columns next to them:
+- wo_file (MMP_Analysis SQL table): STD_RFO
+- B2B summary sheet: ROOT CAUSE (DIRECT AFFECT) and SUB-ROOT CAUSE (EXTERNAL AFFECT)
+
+Every text ever classified is kept in a CSV mapping table (raw text -> code), so later runs
+only send text they have not seen before to the detector.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from exp_detect_improved import RFODetector, get_detector, rfo_table_version
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+# --- Configuration Constants ---
+# IMPORTANT: Change these paths to your actual locations.
+MAPPING_FILE_PATH = Path(__file__).with_name('rfo_mapping.csv')
+B2B_EXCEL_FILE_PATH = Path('D:/My Base/Share_Analyst/B2B/ME/To Do/B2B_summary.xlsx')
+B2B_EXCEL_SHEET_NAME = 'Records'
+B2B_OUTPUT_PATH = B2B_EXCEL_FILE_PATH.with_name('B2B_summary_rfo.csv')
+WO_OUTPUT_PATH = Path('D:/My Base/Share_Analyst/SM Daily Report/wo_file_rfo.csv')
+
+SQL_SERVER = r'DESKTOP-17P73P0\SQLEXPRESS'
+SQL_DATABASE = 'MMP_Analysis'
+
+# Source column -> prefix of the RFO_CODE / RFO_PRIORITY columns written for it
+WO_FILE_RFO_COLUMNS = {"STD_RFO": ""}
+B2B_RFO_COLUMNS = {
+    "ROOT CAUSE (DIRECT AFFECT)": "ROOT_CAUSE_",
+    "SUB-ROOT CAUSE (EXTERNAL AFFECT)": "SUB_ROOT_CAUSE_",
+}
+
+FUZZY_THRESHOLD = 0.8
+# Rows read per chunk when streaming a table, and worker processes for the detector
+CHUNK_SIZE = 50000
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+MAPPING_COLUMNS = ["RAW_TEXT", "RFO_CODE", "RFO_ROOT_CAUSE", "RFO_PRIORITY", "FUZZY_THRESHOLD", "TABLE_VERSION"]
+
+
+class RFOMappingStore:
+    """
+    Persisted raw text -> RFO classification table.
+
+    Rows are only reused for the same fuzzy threshold and RFO table version they were made with.
+    Texts with no match are stored too (empty code), so they are not classified again.
+    """
+
+    def __init__(self, path: Optional[Path] = MAPPING_FILE_PATH, fuzzy_threshold: float = FUZZY_THRESHOLD):
+        """
+        Load the mapping table, if it exists.
+
+        Args:
+            path: CSV file backing the store; None keeps it in memory only
+            fuzzy_threshold: Threshold passed to the detector for new texts
+        """
+        self.path = Path(path) if path else None
+        self.fuzzy_threshold = fuzzy_threshold
+        self.table_version = rfo_table_version()
+        self.mapping: Dict[str, Dict[str, str]] = {}
+        self._dirty = False
+        if self.path and self.path.is_file():
+            self._load()
+
+    def _load(self) -> None:
+        """Read the CSV, keeping only rows that are valid for this threshold and RFO table."""
+        try:
+            table = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable RFO mapping file '{self.path}': {e}")
+            return
+        if not set(MAPPING_COLUMNS).issubset(table.columns):
+            logging.warning(f"Ignoring RFO mapping file '{self.path}': unexpected columns.")
+            return
+        valid = (table["TABLE_VERSION"] == self.table_version) & \
+            (pd.to_numeric(table["FUZZY_THRESHOLD"], errors='coerce') == self.fuzzy_threshold)
+        table = table[valid]
+        self.mapping = {
+            raw: {"RFO_CODE": code, "RFO_ROOT_CAUSE": root, "RFO_PRIORITY": priority}
+            for raw, code, root, priority in zip(table["RAW_TEXT"], table["RFO_CODE"],
+                                                 table["RFO_ROOT_CAUSE"], table["RFO_PRIORITY"])
+        }
+        # Stale rows are dropped from the file on the next save
+        self._dirty = not valid.all()
+        logging.info(f"Loaded {len(self.mapping)} RFO mapping(s) from {self.path}")
+
+    def classify(self, texts: Iterable[str], detector: RFODetector, max_workers: Optional[int] = MAX_WORKERS) -> int:
+        """
+        Classify the texts not yet in the store and add them.
+
+        Args:
+            texts: Raw root-cause texts (duplicates and already-mapped texts are skipped)
+            detector: Detector used for new texts
+            max_workers: Worker processes for large batches of new texts
+
+        Returns:
+            Number of texts newly classified
+        """
+        unseen = [text for text in dict.fromkeys(texts) if text not in self.mapping]
+        if not unseen:
+            return 0
+        result = detector.detect_rfo_expressions(unseen, self.fuzzy_threshold, max_workers=max_workers)
+        for i, text in enumerate(unseen):
+            self.mapping[text] = {column: result[column][i] or "" for column in
+                                  ("RFO_CODE", "RFO_ROOT_CAUSE", "RFO_PRIORITY")}
+        self._dirty = True
+        logging.info(f"Classified {len(unseen)} new root-cause text(s)")
+        return len(unseen)
+
+    def save(self) -> None:
+        """Write the table back (atomically), if anything changed."""
+        if not self.path or not self._dirty:
+            return
+        table = pd.DataFrame(
+            [[raw, m["RFO_CODE"], m["RFO_ROOT_CAUSE"], m["RFO_PRIORITY"]] for raw, m in self.mapping.items()],
+            columns=MAPPING_COLUMNS[:4])
+        table["FUZZY_THRESHOLD"] = self.fuzzy_threshold
+        table["TABLE_VERSION"] = self.table_version
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        table.to_csv(tmp_path, index=False, encoding='utf-8')
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        logging.info(f"Saved {len(table)} RFO mapping(s) to {self.path}")
+
+
+def standardize_rfo_columns(df: pd.DataFrame, column_prefixes: Dict[str, str], store: RFOMappingStore,
+                            detector: Optional[RFODetector] = None,
+                            max_workers: Optional[int] = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Add <prefix>RFO_CODE and <prefix>RFO_PRIORITY columns for each source column.
+
+    Args:
+        df: Frame to enrich (modified in place and returned)
+        column_prefixes: Source column -> output column prefix (see WO_FILE_RFO_COLUMNS)
+        store: Mapping table; texts it does not know yet are classified and added
+        detector: Detector for new texts (defaults to get_detector())
+        max_workers: Worker processes for large batches of new texts
+
+    Returns:
+        The same DataFrame
+    """
+    present = {col: prefix for col, prefix in column_prefixes.items() if col in df.columns}
+    for col in column_prefixes.keys() - present.keys():
+        logging.warning(f"Column '{col}' not found; no RFO columns written for it.")
+
+    texts = [text for col in present for text in df[col].dropna().unique() if isinstance(text, str)]
+    if any(text not in store.mapping for text in texts):
+        store.classify(texts, detector or get_detector(), max_workers=max_workers)
+
+    codes = {raw: m["RFO_CODE"] or None for raw, m in store.mapping.items()}
+    priorities = {raw: m["RFO_PRIORITY"] or None for raw, m in store.mapping.items()}
+    for col, prefix in present.items():
+        df[f"{prefix}RFO_CODE"] = df[col].map(codes)
+        df[f"{prefix}RFO_PRIORITY"] = df[col].map(priorities)
+    return df
+
+
+def iter_standardized_chunks(chunks: Iterable[pd.DataFrame], column_prefixes: Dict[str, str],
+                             store: RFOMappingStore, max_workers: Optional[int] = MAX_WORKERS) -> Iterator[pd.DataFrame]:
+    """
+    Stream chunks (e.g. from pd.read_sql(..., chunksize=CHUNK_SIZE)) through standardize_rfo_columns().
+
+    Chunks share the process-wide detector, and the mapping table is saved once the stream ends.
+    """
+    try:
+        for chunk in chunks:
+            yield standardize_rfo_columns(chunk, column_prefixes, store, get_detector(), max_workers)
+    finally:
+        store.save()
+
+
+def _write_chunks(chunks: Iterable[pd.DataFrame], output_path: Path) -> int:
+    """Append streamed chunks to one CSV; returns the number of rows written."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False, encoding='utf-8-sig')
+        rows += len(chunk)
+    return rows
+
+
+def standardize_wo_file(store: RFOMappingStore, output_path: Path = WO_OUTPUT_PATH) -> int:
+    """Stream wo_file from SQL Server and write it, with RFO columns, to output_path."""
+    import pyodbc
+
+    conn_str = (
+        r'DRIVER={SQL Server};'
+        f'SERVER={SQL_SERVER};'
+        f'DATABASE={SQL_DATABASE};'
+        'Trusted_Connection=yes;'
+    )
+    with pyodbc.connect(conn_str) as conn:
+        chunks = pd.read_sql("SELECT * FROM wo_file", conn, chunksize=CHUNK_SIZE)
+        return _write_chunks(iter_standardized_chunks(chunks, WO_FILE_RFO_COLUMNS, store), output_path)
+
+
+def standardize_b2b_summary(store: RFOMappingStore, file_path: Path = B2B_EXCEL_FILE_PATH,
+                            output_path: Path = B2B_OUTPUT_PATH) -> int:
+    """Read the B2B summary sheet and write it, with RFO columns, to output_path."""
+    df = pd.read_excel(file_path, sheet_name=B2B_EXCEL_SHEET_NAME)
+    df.columns = [str(col).strip().upper().replace('\xa0', ' ') for col in df.columns]
+    return _write_chunks(iter_standardized_chunks([df], B2B_RFO_COLUMNS, store), output_path)
+
+
+def main():
+    """Run the RFO standardization stage for wo_file and the B2B summary."""
+    store = RFOMappingStore()
+    for name, stage in (("wo_file", standardize_wo_file), ("B2B summary", standardize_b2b_summary)):
+        try:
+            rows = stage(store)
+            logging.info(f"{name}: {rows} row(s) standardized")
+        except Exception as e:
+            logging.error(f"{name}: RFO standardization failed: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched audit log writer and system_logs archiving (audit_log.py).
+"""
+
+import sqlite3
+import threading
+
+import pytest
+
+import audit_log
+import db_pool
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "audit.db"
+    db_pool.create_sqlite_database(path)
+    return path
+
+
+@pytest.fixture
+def pool(database):
+    pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=4, dialect="sqlite")
+    yield pool
+    pool.close_all()
+
+
+def log_rows(database, table="system_logs"):
+    with sqlite3.connect(str(database)) as conn:
+        return conn.execute(f"SELECT user_id, action, table_name, record_id, new_values FROM {table} "
+                            "ORDER BY id").fetchall()
+
+
+class TestAuditQueue:
+    """Test buffering, batching and shutdown of the audit writer."""
+
+    def test_events_written_in_batches(self, pool, database):
+        audit = audit_log.AuditQueue(pool, batch_size=50, flush_interval=5)
+        statements = []
+        real_write = audit._write
+        audit._write = lambda events: (statements.append(len(events)), real_write(events))
+        for i in range(120):
+            audit.log(1, "INSERT", "material_inventory", i, new_values=f"event {i}")
+        audit.flush()
+        assert sum(statements) == 120
+        assert max(statements) <= 50 and len(statements) <= 4
+        rows = log_rows(database)
+        assert [row[3] for row in rows] == list(range(120))
+        assert rows[0] == (1, "INSERT", "material_inventory", 0, "event 0")
+        audit.close()
+
+    def test_close_flushes_pending(self, pool, database):
+        audit = audit_log.AuditQueue(pool, flush_interval=60)
+        for i in range(10):
+            audit.log(None, "LOGIN")
+        audit.close()
+        assert len(log_rows(database)) == 10
+        assert audit.written == 10
+        # After close, events are written inline
+        audit.log(None, "LOGOUT")
+        assert len(log_rows(database)) == 11
+
+    def test_full_buffer_writes_inline(self, pool, database):
+        """A stalled writer never lets the buffer grow past max_pending, and nothing is lost."""
+        release = threading.Event()
+        audit = audit_log.AuditQueue(pool, max_pending=5, batch_size=1, flush_interval=0, put_timeout=0.01)
+        real_write = audit._write
+
+        def stalled_write(events):
+            if threading.current_thread() is audit._thread:
+                release.wait(5)
+            real_write(events)
+
+        audit._write = stalled_write
+        for i in range(20):
+            audit.log(None, "INSERT", record_id=i)
+        assert audit._queue.qsize() <= 5
+        assert len(log_rows(database)) >= 14  # at least the overflow went inline
+        release.set()
+        audit.close()
+        assert sorted(row[3] for row in log_rows(database)) == list(range(20))
+
+    def test_failed_batch_counted(self, pool):
+        audit = audit_log.AuditQueue(pool)
+        audit.log(None, None)  # action is NOT NULL
+        audit.close()
+        assert audit.failed == 1 and audit.written == 0
+
+
+class TestArchive:
+    """Test moving old entries to system_logs_archive."""
+
+    def test_archive_moves_only_old_entries(self, pool, database):
+        with sqlite3.connect(str(database)) as conn:
+            conn.executemany("INSERT INTO system_logs (action, record_id, created_at) VALUES ('INSERT', ?, ?)",
+                             [(i, "2020-01-01 00:00:00") for i in range(7)] + [(99, "2999-01-01 00:00:00")])
+        assert audit_log.archive_system_logs(pool, retention_days=90, batch_size=3) == 7
+        assert [row[3] for row in log_rows(database)] == [99]
+        archived = log_rows(database, "system_logs_archive")
+        assert [row[3] for row in archived] == list(range(7))
+        assert audit_log.archive_system_logs(pool, retention_days=90, batch_size=3) == 0
+
+    def test_schema_declares_archive_procedure(self):
+        with open("database_setup.sql", encoding="utf-8") as f:
+            sql = f.read()
+        assert "CREATE PROCEDURE [dbo].[sp_archive_system_logs]" in sql
+        assert "@log_action BIT = 1" in sql
+        assert "PRINT 'Stored Procedures Created: 4'" in sql
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
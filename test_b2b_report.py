@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Tests for the B2B report generator (B2B_report_generate.py).
+"""
+
+import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("folium")
+
+import B2B_report_generate as b2b
+
+
+def make_cases_df():
+    """Build a small B2B case frame with the columns the reports read."""
+    return pd.DataFrame({
+        "CASE TITLE": ["CASE A", "CASE B", "CASE C", "CASE D", "CASE E"],
+        "CIRCUIT ID": ["CID-1", "CID-2", "CID-3", "CID-4", "CID-5"],
+        "STATUS": ["PENDING", "PENDING", "COMPLETED", "PENDING", "ONGOING"],
+        "TOWNSHIP": ["HLAING", "HLAING", "HLAING", "NORTH/OKKALAPA", None],
+        "PIC": ["AUNG", "KYAW", "AUNG", "AUNG", "KYAW"],
+        "REPORTED": ["ME", "HANDOVER", "ME", "ME", "HANDOVER"],
+        "COMPLAINT ISSUE TIME": pd.to_datetime([
+            "2024-01-01 08:00", "2024-01-02 09:30", None, "2024-01-04 10:00", "2024-01-05 11:00"
+        ]),
+        "RECOVERY TIME": pd.to_datetime([None, "2024-01-03 09:30", None, None, None]),
+        "DURATION": [None, "1 day", None, None, None],
+        "DT_RANGE": ["<1D", "1-3D", "<1D", "<1D", "<1D"],
+        "DT_DAYS": [0.5, 1.0, 0.2, 0.1, 0.3],
+        "DT_WEEKS": [0.07, 0.14, 0.03, 0.01, 0.04],
+        "ADDRESS": ["No.1 Street", None, "  ", "No.4 Road", None],
+        "FOLLOW_UP_CONDITION": ["Call back", None, None, None, None],
+        "REMARK": [None, "ok", None, None, None],
+        "RECENT_CONVER": ["line1\nline2", None, "", None, None],
+        "LAT": [16.80, 16.81, None, 16.90, 16.95],
+        "LONG": [96.10, 96.11, 96.12, 96.20, 96.25],
+    })
+
+
+class TestGroupedReports:
+    """Test the shared grouped-report driver and the grouped HTML reports."""
+
+    def test_run_grouped_reports_single_pass(self):
+        """Each (key, STATUS) group is handed to the renderer once, in first-appearance order."""
+        df = make_cases_df()
+        seen = []
+        count = b2b.run_grouped_reports(df, ["TOWNSHIP", "STATUS"],
+                                        lambda key, group: seen.append((key, len(group))))
+        assert count == 3
+        assert seen == [
+            (("HLAING", "PENDING"), 2),
+            (("HLAING", "COMPLETED"), 1),
+            (("NORTH/OKKALAPA", "PENDING"), 1),
+        ]
+
+    def test_run_grouped_reports_thread_pool(self):
+        """Rendering through a thread pool covers the same groups."""
+        df = make_cases_df()
+        seen = []
+        count = b2b.run_grouped_reports(df, ["PIC", "STATUS"],
+                                        lambda key, group: seen.append(key), max_workers=4)
+        assert count == 4
+        assert sorted(seen) == sorted([
+            ("AUNG", "PENDING"), ("KYAW", "PENDING"), ("AUNG", "COMPLETED"), ("KYAW", "ONGOING")
+        ])
+
+    def test_grouped_html_reports_written(self, tmp_path):
+        """One report file is written per Township-Status group, with sanitized names."""
+        df = make_cases_df()
+        b2b.generate_grouped_html_reports(df, datetime.datetime(2024, 1, 1), None, tmp_path)
+        names = sorted(p.name for p in tmp_path.glob("*.html"))
+        assert names == [
+            "HLAING_COMPLETED_2024-01-01_to_all.html",
+            "HLAING_PENDING_2024-01-01_to_all.html",
+            "NORTH_OKKALAPA_PENDING_2024-01-01_to_all.html",
+        ]
+        content = (tmp_path / "HLAING_PENDING_2024-01-01_to_all.html").read_text(encoding="utf-8")
+        assert "CASE A" in content and "CASE B" in content
+        assert "2 case(s) in this report" in content
+
+    def test_grouped_pic_reports_written(self, tmp_path):
+        """PIC-Status reports use the PIC_..._Status_... filename pattern."""
+        df = make_cases_df()
+        b2b.generate_grouped_pic_status_reports(df, None, None, tmp_path, max_workers=2)
+        assert (tmp_path / "PIC_AUNG_Status_PENDING_all_to_all.html").exists()
+        assert len(list(tmp_path.glob("PIC_*.html"))) == 4
+
+
+class TestReportTemplates:
+    """Test template-compiled case cards and the shared report assets."""
+
+    def test_case_card_columns_formatting(self):
+        """Card fields are formatted column-wise with the same N/A rules as fmt_dt()."""
+        df = make_cases_df()
+        columns = b2b.case_card_columns(df)
+        assert columns["complaint_time"][0] == "2024-01-01 08:00:00"
+        assert columns["complaint_time"][2] == "N/A"
+        assert columns["duration"][:2] == ["N/A", "1 day"]
+        assert "N/A" in columns["address"][1] and "N/A" in columns["address"][2]
+        assert columns["recent_conv"][0] == "line1<br>line2"
+        assert columns["recent_conv"][2] == ""
+        cards = list(b2b.iter_case_cards(columns))
+        assert len(cards) == len(df)
+        assert cards[1]["title"] == "CASE B"
+
+    def test_single_report_links_shared_assets(self, tmp_path):
+        """The single report links the external stylesheet instead of embedding it."""
+        df = make_cases_df()
+        b2b.generate_single_html_report(df, None, None, "ALL", "ALL", "ALL", "ALL", "ALL", tmp_path)
+        content = (tmp_path / "report_all_to_all_ALL.html").read_text(encoding="utf-8")
+        assert "<style>" not in content
+        assert "assets/b2b_single_report.css" in content
+        assert "Priority List" in content and "CASE A" in content
+        assert (tmp_path / "assets" / "b2b_single_report.css").read_text(encoding="utf-8") == b2b.SINGLE_REPORT_CSS
+        assert (tmp_path / "assets" / "b2b_report.js").exists()
+
+
+class TestB2BMap:
+    """Test popup construction and the single case marker layer."""
+
+    def test_build_map_popups(self):
+        """Popups list every key column, with timestamps formatted and NA left blank."""
+        df = make_cases_df()
+        popups = b2b.build_map_popups(df)
+        assert popups.iloc[0].startswith("<b>CASE TITLE:</b> CASE A<br><b>CIRCUIT ID:</b> CID-1<br>")
+        assert "<b>COMPLAINT ISSUE TIME:</b> 2024-01-01 08:00:00<br>" in popups.iloc[0]
+        assert "<b>RECOVERY TIME:</b> <br>" in popups.iloc[0]
+        # Columns missing from the sheet still appear, empty
+        assert "<b>TICKET STATUS:</b> <br>" in popups.iloc[0]
+        assert popups.iloc[0].count("<br>") == len(b2b.MAP_POPUP_KEY_COLUMNS)
+
+    def test_map_uses_one_marker_layer(self, tmp_path):
+        """All filtered cases are emitted as one data array instead of individual markers."""
+        df = make_cases_df()
+        b2b.generate_b2b_map(df, "pending", "ALL", tmp_path)
+        content = (tmp_path / "B2B_complaints_map_pending_ALL.html").read_text(encoding="utf-8")
+        assert content.count("L.marker(") == 1
+        assert "CASE A" in content and "CASE D" in content
+        assert "CASE E" not in content  # ONGOING is filtered out
+        assert "<\\/b>" in content  # "</" is escaped inside the inline JSON
+
+    def test_bin_heatmap_points(self):
+        """Points sharing a grid cell collapse to one weighted bin at their mean position."""
+        np = pytest.importorskip("numpy")
+        lat = np.array([16.801, 16.809, 16.951])
+        lon = np.array([96.101, 96.109, 96.251])
+        bins = sorted(b2b.bin_heatmap_points(lat, lon, 0.1))
+        assert len(bins) == 2
+        assert bins[0][0] == pytest.approx(16.805)
+        assert bins[0][1] == pytest.approx(96.105)
+        assert bins[0][2] == 2
+        assert bins[1][2] == 1
+
+    def test_map_binned_heatmap_bands(self, tmp_path):
+        """Forced binning emits zoom-banded heat layers plus the zoom switcher."""
+        df = make_cases_df()
+        b2b.generate_b2b_map(df, "pending", "ALL", tmp_path, heatmap_binning=True)
+        content = (tmp_path / "B2B_complaints_map_pending_ALL.html").read_text(encoding="utf-8")
+        # Bands where binning would not shrink the data collapse into one raw-point layer
+        assert 1 <= content.count("L.heatLayer(") <= len(b2b.HEATMAP_ZOOM_BANDS)
+        assert "map.on('zoomend', update);" in content
+
+
+class TestPhotoIngestion:
+    """Test bulk, deduplicated evidence photo ingestion."""
+
+    def _make_photo_folder(self, root):
+        """Lay out <root>/<CASE TITLE>/<photo> folders, including a byte-identical pair."""
+        (root / "CASE A").mkdir(parents=True)
+        (root / "CASE A" / "pole.jpg").write_bytes(b"pole")
+        (root / "CASE A" / "pole_copy.jpg").write_bytes(b"pole")
+        (root / "CASE A" / "notes.txt").write_text("not a photo")
+        (root / "CASE_B").mkdir()
+        (root / "CASE_B" / "pole.jpg").write_bytes(b"other pole")
+        (root / "CASE Z").mkdir()
+        (root / "CASE Z" / "x.png").write_bytes(b"x")
+
+    def test_case_photo_folders(self):
+        """Folder names match the layout the single-photo upload has always used."""
+        folders = b2b.case_photo_folders(make_cases_df())
+        assert folders.iloc[0] == "CASE_A_2024-01-01_08-00-00"
+        assert folders.iloc[2] == "CASE_C_unknown_time"
+
+    def test_folder_ingestion_is_idempotent(self, tmp_path):
+        """Duplicates are skipped by content, and a second run copies nothing."""
+        source = tmp_path / "incoming"
+        gallery = tmp_path / "gallery"
+        self._make_photo_folder(source)
+        sources = b2b.collect_photo_sources(source)
+        assert len(sources) == 4
+
+        stats = b2b.ingest_case_photos(make_cases_df(), sources, gallery, max_workers=2)
+        assert stats["copied"] == 2 and stats["duplicate"] == 1 and stats["unmatched"] == 1
+        case_a = gallery / "CASE_A_2024-01-01_08-00-00"
+        assert sorted(p.name for p in case_a.iterdir()) == ["manifest.json", "pole.jpg"]
+        assert (gallery / "CASE_B_2024-01-02_09-30-00" / "pole.jpg").read_bytes() == b"other pole"
+
+        again = b2b.ingest_case_photos(make_cases_df(), sources, gallery, max_workers=2)
+        assert again["copied"] == 0 and again["duplicate"] == 3
+
+    def test_manifest_csv_renames_on_collision(self, tmp_path):
+        """A CSV manifest resolves relative paths; new content with a taken name gets a suffix."""
+        gallery = tmp_path / "gallery"
+        case_a = gallery / "CASE_A_2024-01-01_08-00-00"
+        case_a.mkdir(parents=True)
+        (case_a / "pole.jpg").write_bytes(b"copied before manifests existed")
+        (tmp_path / "pole.jpg").write_bytes(b"new pole")
+        (tmp_path / "photos.csv").write_text("CASE TITLE,PHOTO PATH\nCASE A,pole.jpg\nCASE A,missing.jpg\n")
+
+        stats = b2b.ingest_case_photos(make_cases_df(), b2b.collect_photo_sources(tmp_path / "photos.csv"), gallery)
+        assert stats["copied"] == 1 and stats["missing"] == 1
+        assert (case_a / "pole_1.jpg").read_bytes() == b"new pole"
+        manifest = b2b.load_photo_manifest(case_a)
+        assert sorted(entry["file"] for entry in manifest.values()) == ["pole.jpg", "pole_1.jpg"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
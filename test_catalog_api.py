@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached materials_info/services_info routes (catalog_api.py), run against the
+SQLite stand-in schema.
+"""
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import api_server
+import catalog_api
+import db_pool
+import inventory_api
+
+
+@pytest.fixture
+def pool(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    return db_pool.ConnectionPool(db_pool.sqlite_connector(path), max_size=2, dialect="sqlite")
+
+
+@pytest.fixture
+def client(pool):
+    return api_server.create_app(pool=pool).test_client()
+
+
+def count_catalog_loads(monkeypatch):
+    """Counts catalogue SELECTs that reach the database."""
+    loads = []
+    real_connection = db_pool.ConnectionPool.connection
+
+    def connection(self):
+        loads.append(1)
+        return real_connection(self)
+
+    monkeypatch.setattr(db_pool.ConnectionPool, "connection", connection)
+    return loads
+
+
+class TestCatalogCache:
+    """Test cached list responses, ETags and invalidation."""
+
+    def test_list_served_from_cache_with_etag(self, client, monkeypatch):
+        loads = count_catalog_loads(monkeypatch)
+        first = client.get("/api/materials_info")
+        assert first.status_code == 200
+        materials = first.get_json()
+        assert [m["material_code"] for m in materials][:2] == ["CN-001", "CN-002"]
+        assert len(materials) == 6
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        etag = first.headers["ETag"]
+
+        again = client.get("/api/materials_info")
+        assert again.data == first.data and again.headers["ETag"] == etag
+        revalidated = client.get("/api/materials_info", headers={"If-None-Match": etag})
+        assert revalidated.status_code == 304 and revalidated.data == b""
+        assert len(loads) == 1
+
+        services = client.get("/api/services_info")
+        assert services.status_code == 200 and services.headers["ETag"] != etag
+        assert len(loads) == 2
+
+    def test_writes_invalidate(self, client, pool):
+        etag = client.get("/api/materials_info").headers["ETag"]
+        inventory_api.active_material_codes.get(pool)
+
+        created = client.post("/api/materials_info", json={
+            "material_code": "SP-900", "material_name": "Splitter 1x8", "material_type": "Splitter",
+            "uom": "pcs", "unit_price": 12.5, "created_by": 1,
+        })
+        assert created.status_code == 201
+        item = created.get_json()
+        assert item["material_name"] == "Splitter 1x8" and item["is_active"] == 1
+        assert "SP-900" in inventory_api.active_material_codes.get(pool)
+
+        response = client.get("/api/materials_info", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert "SP-900" in [m["material_code"] for m in response.get_json()]
+        etag = response.headers["ETag"]
+
+        updated = client.put(f"/api/materials_info/{item['id']}", json={"is_active": 0, "updated_by": 1})
+        assert updated.status_code == 200 and updated.get_json()["is_active"] == 0
+        assert client.get("/api/materials_info", headers={"If-None-Match": etag}).status_code == 200
+
+        assert client.delete(f"/api/materials_info/{item['id']}").status_code == 204
+        assert "SP-900" not in [m["material_code"] for m in client.get("/api/materials_info").get_json()]
+
+    def test_stale_load_not_cached_after_invalidate(self, pool):
+        """A load racing a write does not put the pre-write catalogue back into the cache."""
+        cache = catalog_api.CatalogCache()
+        real_connection = pool.connection
+
+        def connection():
+            cache.invalidate(pool, "services_info")  # a write lands while the SELECT runs
+            return real_connection()
+
+        pool.connection = connection
+        cache.get(pool, "services_info")
+        assert "services_info" not in cache._entries.get(pool, {})
+
+
+class TestCatalogWrites:
+    """Test validation on the write routes."""
+
+    def test_validation(self, client):
+        assert client.post("/api/services_info", json={"service_code": "SV-9"}).status_code == 400
+        assert client.post("/api/services_info", json={"service_code": "SV-9", "service_name": "X",
+                                                       "colour": "red"}).status_code == 400
+        assert client.post("/api/materials_info", json={"material_code": "FO-001",
+                                                        "material_name": "Dup"}).status_code == 400
+        assert client.put("/api/services_info/9999", json={"uom": "m"}).status_code == 404
+        assert client.put("/api/services_info/1", json={"id": 5}).status_code == 400
+        assert client.delete("/api/services_info/9999").status_code == 404
+
+    def test_delete_in_use_conflicts(self, client):
+        response = client.post("/api/inventory/materials/transaction", json={
+            "material_code": "FO-001", "transaction_type": "receipt", "quantity": 1, "created_by": 1})
+        assert response.status_code == 201
+        fo = next(m for m in client.get("/api/materials_info").get_json() if m["material_code"] == "FO-001")
+        assert client.delete(f"/api/materials_info/{fo['id']}").status_code == 409
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
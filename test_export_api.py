@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming xlsx writer (xlsx_stream.py) and the export routes (export_api.py),
+run against the SQLite stand-in schema.
+"""
+
+import io
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+openpyxl = pytest.importorskip("openpyxl")
+
+import api_server
+import db_pool
+import xlsx_stream
+
+
+def load_workbook(data):
+    return openpyxl.load_workbook(io.BytesIO(data))
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    with sqlite3.connect(str(path)) as conn:
+        conn.executemany(
+            "INSERT INTO fault_reports (trans_num, project_name, fault_name, region, township, raised_time, "
+            "status, created_by) VALUES (?, 'FTTH', ?, ?, 'TS1', ?, 'open', 1)",
+            [(f"RPT2025{month:02d}{i:04d}", f"Fault {i}", "YGN" if i % 2 else "MDY",
+              f"2025-{month:02d}-{1 + i % 28:02d} 08:00:00") for month in (1, 2) for i in range(1, 31)])
+        conn.execute("INSERT INTO report_materials (report_id, material_code, material_name, material_usage) "
+                     "VALUES (1, 'FO-001', 'Fiber 12 core', 150)")
+        conn.executemany(
+            "INSERT INTO material_inventory (material_code, transaction_type, quantity, unit_cost, transaction_date, "
+            "created_by) VALUES (?, 'receipt', ?, 2, ?, 1)",
+            [("FO-001", i, f"2025-01-{1 + i % 28:02d} 09:00:00") for i in range(1, 41)]
+            + [("FO-002", 5, "2025-02-03 09:00:00")])
+    return path
+
+
+@pytest.fixture
+def client(database):
+    pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=2, dialect="sqlite")
+    return api_server.create_app(pool=pool).test_client()
+
+
+class TestStreamXlsx:
+    """Test the zip-streamed workbook writer."""
+
+    def test_round_trip_through_openpyxl(self):
+        rows = [(1, "a < b & c\x01", Decimal("2.50"), datetime(2025, 1, 2, 3, 4, 5), date(2025, 1, 3), True, None)]
+        data = b"".join(xlsx_stream.stream_xlsx([("Data", ["n", "s", "d", "dt", "day", "b", "none"], rows),
+                                                 ("Second", None, [["x"]], [30])]))
+        wb = openpyxl.load_workbook(io.BytesIO(data))
+        assert wb.sheetnames == ["Data", "Second"]
+        ws = wb["Data"]
+        assert [c.value for c in ws[1]] == ["n", "s", "d", "dt", "day", "b", "none"]
+        assert ws["A1"].font.b
+        assert [c.value for c in ws[2]] == [1, "a < b & c", 2.5, datetime(2025, 1, 2, 3, 4, 5),
+                                            datetime(2025, 1, 3), True, None]
+        assert ws["D2"].number_format == "yyyy-mm-dd hh:mm:ss"
+        assert wb["Second"]["A1"].value == "x"
+
+    def test_rows_consumed_lazily(self):
+        """Chunks are yielded while rows are still being produced."""
+        produced = []
+
+        def rows():
+            for i in range(50000):
+                produced.append(i)
+                yield (i, f"row {i} " * 5)
+
+        chunks = xlsx_stream.stream_xlsx([("Big", ["i", "text"], rows())], chunk_size=16 * 1024)
+        next(chunks)
+        assert 0 < len(produced) < 50000
+        rest = b"".join(chunks)
+        assert len(produced) == 50000 and rest
+
+    def test_column_letters(self):
+        assert [xlsx_stream.column_letter(i) for i in (0, 25, 26, 701, 702)] == ["A", "Z", "AA", "ZZ", "AAA"]
+
+
+class TestExportRoutes:
+    """Test the report and inventory downloads."""
+
+    def test_single_report_excel(self, client):
+        response = client.get("/api/reports/RPT2025010001/export/excel")
+        assert response.status_code == 200
+        assert response.headers["Content-Disposition"] == 'attachment; filename="RPT2025010001.xlsx"'
+        wb = load_workbook(response.data)
+        assert wb.sheetnames == ["Report", "Photos", "Materials", "Services"]
+        fields = dict(row for row in wb["Report"].iter_rows(min_row=2, values_only=True))
+        assert fields["trans_num"] == "RPT2025010001" and fields["fault_name"] == "Fault 1"
+        materials = list(wb["Materials"].iter_rows(min_row=2, values_only=True))
+        assert len(materials) == 1 and "FO-001" in materials[0]
+        assert client.get("/api/reports/NOPE/export/excel").status_code == 404
+
+    def test_report_pdf(self, client):
+        response = client.get("/api/reports/RPT2025010001/export/pdf")
+        try:
+            import reportlab  # noqa: F401
+        except ImportError:
+            assert response.status_code == 501
+        else:
+            assert response.status_code == 200 and response.data.startswith(b"%PDF")
+
+    def test_month_of_reports(self, client):
+        response = client.get("/api/reports/export/excel?month=2025-02&region=YGN")
+        assert response.status_code == 200 and response.is_streamed
+        rows = list(load_workbook(response.data)["Reports"].iter_rows(min_row=2, values_only=True))
+        assert len(rows) == 15
+        assert all(row[1].startswith("RPT202502") and row[8] == "YGN" for row in rows)
+        assert [row[14] for row in rows] == sorted(row[14] for row in rows)
+        assert client.get("/api/reports/export/excel?month=Feb").status_code == 400
+
+    def test_inventory_report(self, client):
+        response = client.get("/api/inventory/report/excel?from=2025-01-01&to=2025-01-31")
+        assert response.status_code == 200
+        wb = load_workbook(response.data)
+        assert wb.sheetnames == ["Summary", "Transactions"]
+        summary = list(wb["Summary"].iter_rows(min_row=2, values_only=True))
+        assert len(summary) == 6
+        transactions = list(wb["Transactions"].iter_rows(min_row=2, values_only=True))
+        assert len(transactions) == 40
+        assert {row[2] for row in transactions} == {"FO-001"}
+        assert transactions[0][3] and transactions[0][8] == transactions[0][6] * 2  # material_name, total_value
+        only_fo2 = client.get("/api/inventory/report/excel?material_code=FO-002")
+        assert len(list(load_workbook(only_fo2.data)["Transactions"].iter_rows(min_row=2))) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
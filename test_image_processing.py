@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for photo downscaling before embedding (image_processing.py).
+"""
+
+import pytest
+
+PILImage = pytest.importorskip("PIL.Image")
+
+import image_processing
+
+
+def save_photo(path, size=(1200, 800), mode="RGB", color="red", exif_orientation=None):
+    """Write a solid-colour photo, optionally tagged with an EXIF orientation."""
+    img = PILImage.new(mode, size, color)
+    options = {}
+    if exif_orientation is not None:
+        exif = PILImage.Exif()
+        exif[0x0112] = exif_orientation
+        exif[0x010F] = "PhoneMaker"
+        options["exif"] = exif.tobytes()
+    img.save(path, **options)
+    return path
+
+
+class TestDownscaleImage:
+    """Test resizing, re-encoding and metadata stripping of single photos."""
+
+    def test_pixel_box_scales_with_dpi(self):
+        """The display box is scaled from Excel's 96 DPI to the target DPI."""
+        assert image_processing.pixel_box((300, 200), 96) == (300, 200)
+        assert image_processing.pixel_box((300, 200), 192) == (600, 400)
+
+    def test_resized_to_box_and_exif_stripped(self, tmp_path):
+        """Orientation is applied to the pixels, then the EXIF block is dropped."""
+        source = save_photo(tmp_path / "in.jpg", size=(800, 1200), exif_orientation=6)
+        output = image_processing.downscale_image(str(source), str(tmp_path / "out.jpg"), (300, 200))
+        with PILImage.open(output) as img:
+            assert img.format == "JPEG"
+            assert img.size == (600, 400)
+            assert not img.getexif()
+            assert round(img.info["dpi"][0]) == image_processing.DEFAULT_DPI
+
+    def test_keep_aspect_fits_inside_box(self, tmp_path):
+        """keep_aspect shrinks within the box without stretching."""
+        source = save_photo(tmp_path / "in.png", size=(1000, 1000))
+        output = image_processing.downscale_image(str(source), str(tmp_path / "out.jpg"), (300, 200),
+                                                  dpi=96, keep_aspect=True)
+        with PILImage.open(output) as img:
+            assert img.size == (200, 200)
+
+    def test_transparency_flattened_on_white(self, tmp_path):
+        """Transparent PNG areas become white in the JPEG."""
+        source = save_photo(tmp_path / "in.png", mode="RGBA", color=(0, 0, 0, 0))
+        output = image_processing.downscale_image(str(source), str(tmp_path / "out.jpg"), (30, 20), dpi=96)
+        with PILImage.open(output) as img:
+            assert img.mode == "RGB"
+            assert min(img.getpixel((10, 10))) > 250
+
+    def test_webp_rejected(self, tmp_path):
+        """Only formats Excel can render are accepted."""
+        source = save_photo(tmp_path / "in.jpg")
+        with pytest.raises(ValueError):
+            image_processing.downscale_image(str(source), str(tmp_path / "out.webp"), (300, 200),
+                                             image_format="WEBP")
+
+
+class TestDownscaleImages:
+    """Test the parallel batch entry point."""
+
+    def test_errors_reported_per_photo(self, tmp_path):
+        """A bad file yields its exception in place; the other photos are still processed."""
+        good = save_photo(tmp_path / "good.jpg")
+        bad = tmp_path / "bad.jpg"
+        bad.write_bytes(b"not an image")
+        jobs = [(str(good), str(tmp_path / "a.jpg")), (str(bad), str(tmp_path / "b.jpg")),
+                (str(good), str(tmp_path / "c.jpg"))]
+        errors = image_processing.downscale_images(jobs, (300, 200), max_workers=3)
+        assert errors[0] is None and errors[2] is None
+        assert isinstance(errors[1], OSError)
+        assert (tmp_path / "a.jpg").exists() and (tmp_path / "c.jpg").exists()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tests for the incident report Excel export service (incident_py.py).
+"""
+
+import base64
+import io
+import json
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+openpyxl = pytest.importorskip("openpyxl")
+PILImage = pytest.importorskip("PIL.Image")
+
+import incident_py
+
+
+def make_jpeg(size=(800, 600), color="blue"):
+    """Encode a solid-colour JPEG."""
+    buf = io.BytesIO()
+    PILImage.new("RGB", size, color).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+INCIDENT_DETAILS = {
+    "ticketReceivedDateTime": "2025-06-01T10:30",
+    "customerName": "ACME Co",
+    "circuitID": "CID-1",
+    "woStartTime": "2025-06-01T11:00",
+    "additionalNotes": "Spliced at pole 12",
+}
+
+
+@pytest.fixture(autouse=True)
+def job_store(tmp_path_factory, monkeypatch):
+    """Give every test its own result cache."""
+    store = incident_py.ReportJobStore(str(tmp_path_factory.mktemp("report_cache")), max_workers=2)
+    monkeypatch.setattr(incident_py, "report_jobs", store)
+    return store
+
+
+@pytest.fixture
+def client():
+    incident_py.app.config["TESTING"] = True
+    return incident_py.app.test_client()
+
+
+def load_response_workbook(response):
+    """Read the xlsx returned by the export endpoint."""
+    return openpyxl.load_workbook(io.BytesIO(response.data))
+
+
+class TestIncidentExport:
+    """Test the streamed incident workbook export."""
+
+    def test_json_export(self, client):
+        """Base64 JSON uploads still produce the full report and embedded photo."""
+        payload = {
+            "incidentDetails": INCIDENT_DETAILS,
+            "uploadedPhotos": [
+                {"label": "Before", "name": "a.jpg",
+                 "data": "data:image/jpeg;base64," + base64.b64encode(make_jpeg()).decode()},
+                {"label": "Missing", "data": ""},
+            ],
+        }
+        response = client.post("/generate_excel_with_images", json=payload)
+        assert response.status_code == 200
+        assert "ACME_Co_2025-06-01_1030_IncidentReport.xlsx" in response.headers["Content-Disposition"]
+        wb = load_response_workbook(response)
+        report = wb["Incident Report"]
+        assert report["B2"].value == "2025-06-01 10:30:00"
+        assert report["E2"].value == "ACME Co"
+        assert report["B7"].value == "2025-06-01 11:00:00"
+        assert report["B9"].value == "N/A"
+        assert report["D21"].value == "Spliced at pole 12"
+        assert report["A1"].font.b
+        assert "D7:F7" in {str(r) for r in report.merged_cells.ranges}
+        photos = wb["Embedded Photos"]
+        assert photos["A2"].value == "Before" and len(photos._images) == 1
+        assert photos["B3"].value == "No image data"
+        assert photos.row_dimensions[2].height == 150
+        response.close()
+
+    def test_multipart_export(self, client):
+        """Photos can be uploaded as multipart files with parallel labels."""
+        data = {
+            "incidentDetails": json.dumps(INCIDENT_DETAILS),
+            "labels": ["Pole", "Closure"],
+            "photos": [(io.BytesIO(make_jpeg()), "pole.jpg"), (io.BytesIO(b"not an image"), "closure.jpg")],
+        }
+        response = client.post("/generate_excel_with_images", data=data, content_type="multipart/form-data")
+        assert response.status_code == 200
+        photos = load_response_workbook(response)["Embedded Photos"]
+        assert [photos["A2"].value, photos["A3"].value] == ["Pole", "Closure"]
+        assert len(photos._images) == 1
+        assert photos["B3"].value.startswith("Error embedding image")
+        response.close()
+
+    def test_photos_downscaled_before_embedding(self, client):
+        """Embedded photos are re-encoded at the display box size instead of the original."""
+        original = make_jpeg(size=(3000, 2000))
+        payload = {
+            "incidentDetails": INCIDENT_DETAILS,
+            "uploadedPhotos": [{"label": "Site", "data": base64.b64encode(original).decode()}],
+        }
+        response = client.post("/generate_excel_with_images", json=payload)
+        image = load_response_workbook(response)["Embedded Photos"]._images[0]
+        embedded = PILImage.open(io.BytesIO(image._data()))
+        assert embedded.format == "JPEG"
+        assert embedded.size == (incident_py.PHOTO_DISPLAY_WIDTH * 2, incident_py.PHOTO_DISPLAY_HEIGHT * 2)
+        response.close()
+
+    def test_temp_files_removed_after_response(self, client, tmp_path, monkeypatch):
+        """The spooled photos and workbook are deleted once the response is closed."""
+        monkeypatch.setattr(incident_py.tempfile, "tempdir", str(tmp_path))
+        response = client.post("/generate_excel_with_images", json={"incidentDetails": INCIDENT_DETAILS})
+        assert response.status_code == 200
+        response.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_busy_server_returns_503(self, client, monkeypatch):
+        """When every export slot is taken the request is refused instead of queued forever."""
+        monkeypatch.setattr(incident_py, "_export_slots", incident_py.threading.BoundedSemaphore(1))
+        monkeypatch.setattr(incident_py, "EXPORT_SLOT_TIMEOUT", 0.01)
+        incident_py._export_slots.acquire()
+        response = client.post("/generate_excel_with_images", json={"incidentDetails": INCIDENT_DETAILS})
+        assert response.status_code == 503
+
+    def test_empty_request(self, client):
+        """A request without data is rejected."""
+        response = client.post("/generate_excel_with_images", json={})
+        assert response.status_code == 400
+
+
+class TestReportJobs:
+    """Test the submit / poll / download job API and its result cache."""
+
+    def test_submit_poll_download(self, client, job_store):
+        """A submitted job can be polled and its workbook downloaded once done."""
+        response = client.post("/jobs", json={"incidentDetails": INCIDENT_DETAILS})
+        assert response.status_code == 202
+        job = response.get_json()
+        assert job["status_url"] == f"/jobs/{job['id']}"
+        job_store.wait(job_store.get(job["id"]))
+
+        status = client.get(job["status_url"]).get_json()
+        assert status["status"] == "done"
+        assert status["filename"] == "ACME_Co_2025-06-01_1030_IncidentReport.xlsx"
+        download = client.get(job["download_url"])
+        assert download.status_code == 200
+        assert load_response_workbook(download)["Incident Report"]["E2"].value == "ACME Co"
+        download.close()
+
+    def test_identical_payload_built_once(self, client, job_store, monkeypatch):
+        """Resubmitting the same payload reuses the job and the cached workbook."""
+        builds = []
+        write = incident_py.write_incident_workbook
+        monkeypatch.setattr(incident_py, "write_incident_workbook",
+                            lambda *args: builds.append(args) or write(*args))
+        payload = {
+            "incidentDetails": INCIDENT_DETAILS,
+            "uploadedPhotos": [{"label": "Site", "data": base64.b64encode(make_jpeg()).decode()}],
+        }
+        first = client.post("/jobs", json=payload).get_json()
+        job_store.wait(job_store.get(first["id"]))
+        second = client.post("/jobs", json=payload).get_json()
+        assert second["id"] == first["id"] and second["status"] == "done"
+        assert client.post("/generate_excel_with_images", json=payload).status_code == 200
+        assert len(builds) == 1
+
+        changed = dict(payload, incidentDetails=dict(INCIDENT_DETAILS, customerName="Other"))
+        assert client.post("/jobs", json=changed).get_json()["id"] != first["id"]
+
+    def test_failed_job_reported_and_retried(self, client, job_store, monkeypatch):
+        """A failed build shows up in the status, and the next submission tries again."""
+        def fail(*args):
+            raise RuntimeError("disk full")
+        monkeypatch.setattr(incident_py, "write_incident_workbook", fail)
+        job = client.post("/jobs", json={"incidentDetails": INCIDENT_DETAILS}).get_json()
+        job_store.wait(job_store.get(job["id"]))
+        assert client.get(job["status_url"]).get_json()["error"] == "disk full"
+        assert client.get(job["download_url"]).status_code == 500
+
+        monkeypatch.undo()
+        monkeypatch.setattr(incident_py, "report_jobs", job_store)
+        retry = client.post("/jobs", json={"incidentDetails": INCIDENT_DETAILS}).get_json()
+        job_store.wait(job_store.get(retry["id"]))
+        assert client.get(retry["download_url"]).status_code == 200
+
+    def test_unknown_job(self, client):
+        """Unknown ids are a 404 for both status and download."""
+        assert client.get("/jobs/deadbeef").status_code == 404
+        assert client.get("/jobs/deadbeef/download").status_code == 404
+
+    def test_oldest_results_evicted(self, tmp_path):
+        """Only max_results finished workbooks are kept."""
+        store = incident_py.ReportJobStore(str(tmp_path / "cache"), max_workers=1, max_results=1)
+        jobs = []
+        for name in ("A", "B"):
+            work_dir = tmp_path / name
+            work_dir.mkdir()
+            jobs.append(store.wait(store.submit({"customerName": name}, [], str(work_dir))))
+        assert store.get(jobs[0]["id"]) is None
+        assert store.get(jobs[1]["id"])["status"] == "done"
+        assert [p.name for p in (tmp_path / "cache").iterdir()] == [f"{jobs[1]['id']}.xlsx"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
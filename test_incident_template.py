@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared incident report template (incident_template.py).
+"""
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+import incident_template
+
+
+class TestReportRowPlan:
+    """Test the precompiled row plan and filling it in."""
+
+    def test_plan_compiled_once(self):
+        """The static layout is compiled once and reused."""
+        assert incident_template.report_row_plan() is incident_template.report_row_plan()
+        plan = incident_template.report_row_plan()
+        assert len(plan) == 21
+        assert plan[6][1] == incident_template.Field("woStartTime", "", True)
+
+    def test_rows_filled_from_details(self):
+        """Field slots take the form values, datetime fields formatted, defaults otherwise."""
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("x")
+        rows = list(incident_template.incident_report_rows(ws, {
+            "ticketReceivedDateTime": "2025-06-01T10:30",
+            "customerName": "ACME Co",
+            "woStartTime": "2025-06-01T11:00",
+        }))
+        assert rows[0][0].value == incident_template.REPORT_TITLE and rows[0][0].font.b
+        assert rows[1] == ["Ticket Received Date Time", "2025-06-01 10:30:00", None, "Customer Name", "ACME Co"]
+        assert rows[6] == ["WO start", "2025-06-01 11:00:00", "", ""]
+        assert rows[8][1:] == ["N/A", "N/A", "N/A"]
+
+    def test_bordered_regular_sheet(self):
+        """The printable variant borders every cell and merges the same ranges on a regular sheet."""
+        wb = openpyxl.Workbook()
+        ws = incident_template.write_report_sheet(wb, {}, bordered=True, title="Template")
+        assert ws.title == "Template"
+        assert ws["A6"].fill.fgColor.rgb == "00D9D9D9"
+        assert ws["A7"].border.left.style == "thin"
+        assert {str(r) for r in ws.merged_cells.ranges} == set(incident_template.REPORT_MERGED_RANGES)
+
+
+class TestStandardTemplate:
+    """Test that Mail_Reader's blank template is rendered from the shared layout."""
+
+    def test_create_standard_template(self, tmp_path, monkeypatch):
+        import Mail_Reader
+        monkeypatch.chdir(tmp_path)
+        Mail_Reader.create_standard_template()
+        (path,) = tmp_path.glob("Standardized_Incident_Report_Template_*.xlsx")
+        wb = openpyxl.load_workbook(path)
+        assert wb.sheetnames == ["Template", "Photos"]
+        template = wb["Template"]
+        assert template["A1"].value == incident_template.REPORT_TITLE
+        assert template["E2"].value == "FTTH pole & Cable damages in Swebo"
+        assert template["D16"].value == "=C16-B16"
+        assert [template.cell(row=row, column=1).value for row in range(7, 17)] == \
+            [label for label, _, _ in incident_template.TIMELINE_ROWS]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the query-pattern indexes and their benchmark (index_benchmark.py).
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("flask")
+
+import index_benchmark
+
+TUNED_INDEXES = {
+    "IX_fault_reports_status_region_raised", "IX_fault_reports_region_raised",
+    "IX_fault_reports_active_raised", "IX_material_inventory_code_date", "IX_material_inventory_code_type",
+}
+
+
+@pytest.fixture(scope="module")
+def results(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bench") / "bench.db"
+    index_benchmark.generate_dataset(path, 3000)
+    return index_benchmark.run_benchmark(path, repeat=1)
+
+
+class TestIndexSections:
+    """Test that both schema scripts define the same query-pattern indexes."""
+
+    def test_sqlite_section_parsed(self):
+        assert {name for name, _ in index_benchmark.tuned_indexes()} == TUNED_INDEXES
+
+    def test_sql_server_indexes_idempotent(self):
+        script = Path(__file__).with_name("database_setup.sql").read_text(encoding="utf-8")
+        for name in TUNED_INDEXES:
+            assert f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}'" in script
+        assert "WHERE [status] IN ('open', 'in_progress')" in script
+
+
+class TestBenchmark:
+    """Test that the tuned indexes serve the API's queries without changing their results."""
+
+    def test_plans_use_tuned_indexes(self, results):
+        expected = {
+            "reports: status + region": "IX_fault_reports_status_region_raised",
+            "reports: open queue": "IX_fault_reports_active_raised",
+            "reports: region": "IX_fault_reports_region_raised",
+            "inventory: material month": "IX_material_inventory_code_date",
+            "inventory: ledger totals": "IX_material_inventory_code_type",
+        }
+        for label, index in expected.items():
+            assert index not in results[label]["before"][1]
+            assert index in results[label]["after"][1]
+
+    def test_results_unchanged(self, results):
+        for phases in results.values():
+            assert phases["before"][2] == phases["after"][2]
+            assert phases["after"][2]
+
+    def test_sorts_avoided(self, results):
+        for label in ("inventory: material month", "inventory: ledger totals"):
+            assert "TEMP B-TREE" not in results[label]["after"][1]
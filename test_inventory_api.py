@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for the material inventory API and its maintained balances (inventory_api.py),
+run against the SQLite stand-in schema.
+"""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import api_server
+import db_pool
+import inventory_api
+
+LEDGER_SUMMARY_SQL = """
+SELECT material_code,
+       SUM(CASE WHEN transaction_type IN ('receipt', 'return', 'adjustment') THEN quantity ELSE -quantity END),
+       MAX(transaction_date)
+FROM material_inventory GROUP BY material_code ORDER BY material_code
+"""
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    return path
+
+
+@pytest.fixture
+def client(database):
+    pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=2, dialect="sqlite")
+    return api_server.create_app(pool=pool).test_client()
+
+
+def post_transaction(client, material_code, transaction_type, quantity):
+    return client.post("/api/inventory/materials/transaction", json={
+        "material_code": material_code, "transaction_type": transaction_type, "quantity": quantity,
+        "created_by": 1,
+    })
+
+
+class TestMaintainedBalance:
+    """Test that the balance table tracks the ledger."""
+
+    def test_transactions_update_balance(self, client):
+        for transaction_type, quantity in [("receipt", 100), ("issue", 30), ("return", 5),
+                                           ("damage", 2.5), ("adjustment", -1)]:
+            assert post_transaction(client, "FO-001", transaction_type, quantity).status_code == 201
+        materials = {m["material_code"]: m for m in client.get("/api/inventory/materials").get_json()["materials"]}
+        fo = materials["FO-001"]
+        assert (fo["total_receipts"], fo["total_issues"], fo["total_returns"], fo["total_damages"],
+                fo["total_adjustments"]) == (100, 30, 5, 2.5, -1)
+        assert fo["current_balance"] == 71.5
+        assert fo["last_transaction_date"]
+        # Materials with no transactions are listed with zero totals
+        assert materials["CN-001"]["current_balance"] == 0
+        assert materials["CN-001"]["last_transaction_date"] is None
+        assert len(materials) == 6
+
+    def test_balance_matches_ledger(self, client, database):
+        """The maintained balance equals a full aggregation of material_inventory."""
+        for i in range(30):
+            code = ["FO-001", "CN-002", "TO-001"][i % 3]
+            post_transaction(client, code, ["receipt", "issue", "return", "damage", "adjustment"][i % 5], i + 1)
+        client.application.extensions["audit_queue"].flush()
+        with sqlite3.connect(str(database)) as conn:
+            ledger = conn.execute(LEDGER_SUMMARY_SQL).fetchall()
+            balances = conn.execute("SELECT material_code, current_balance, last_transaction_date "
+                                    "FROM material_inventory_balances ORDER BY material_code").fetchall()
+            logs = conn.execute("SELECT COUNT(*) FROM system_logs WHERE table_name = 'material_inventory'").fetchone()
+        assert balances == ledger
+        assert logs[0] == 30
+
+    def test_summary_query_reads_balance_table(self, database):
+        """Listing stock does not touch the transaction ledger."""
+        with sqlite3.connect(str(database)) as conn:
+            plan = " ".join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM vw_material_inventory_summary"))
+        assert "material_inventory_balances" in plan
+        assert "material_inventory " not in plan + " "
+
+    def test_apply_balance_deltas_batches_per_material(self, database):
+        """Bulk deltas cost one statement per material, whatever the number of rows."""
+        conn = sqlite3.connect(str(database))
+        statements = []
+        conn.set_trace_callback(statements.append)
+        rows = [("FO-001", "receipt", 1, "2025-01-01 08:00:00")] * 50 + [("FO-002", "issue", 2, "2025-01-02 08:00:00")]
+        inventory_api.apply_balance_deltas(conn, "sqlite", rows)
+        assert sum(sql.startswith(("UPDATE", "INSERT")) for sql in statements) == 4
+        assert conn.execute("SELECT current_balance FROM material_inventory_balances "
+                            "WHERE material_code = 'FO-001'").fetchone()[0] == 50
+
+
+class TestTransactionValidation:
+    """Test request validation on the transaction route."""
+
+    def test_rejected(self, client):
+        assert post_transaction(client, "NOPE", "receipt", 1).status_code == 400
+        assert post_transaction(client, "FO-001", "stolen", 1).status_code == 400
+        assert post_transaction(client, "FO-001", "receipt", "lots").status_code == 400
+        assert client.post("/api/inventory/materials/transaction", json={"material_code": "FO-001"}).status_code == 400
+
+    def test_material_type_filter(self, client):
+        materials = client.get("/api/inventory/materials?material_type=Cable").get_json()["materials"]
+        assert [m["material_code"] for m in materials] == ["FO-001", "FO-002"]
+
+
+class TestBulkTransactions:
+    """Test JSON-array and CSV bulk loads."""
+
+    def test_json_array_in_chunks(self, client, database, monkeypatch):
+        monkeypatch.setattr(inventory_api, "BULK_CHUNK_SIZE", 4)
+        rows = [{"material_code": "FO-001", "transaction_type": "receipt", "quantity": 2, "created_by": 1,
+                 "transaction_ref": f"GRN-{i}"} for i in range(10)]
+        rows.append({"material_code": "CN-001", "transaction_type": "receipt", "quantity": "1.5", "created_by": 1})
+        response = client.post("/api/inventory/materials/transaction", json=rows)
+        assert response.status_code == 201
+        assert response.get_json() == {"inserted": 11, "materials": ["CN-001", "FO-001"]}
+        client.application.extensions["audit_queue"].flush()
+        with sqlite3.connect(str(database)) as conn:
+            assert conn.execute(LEDGER_SUMMARY_SQL).fetchall() == conn.execute(
+                "SELECT material_code, current_balance, last_transaction_date FROM material_inventory_balances "
+                "WHERE current_balance <> 0 ORDER BY material_code").fetchall()
+            audit = conn.execute("SELECT new_values FROM system_logs WHERE action = 'BULK_INSERT' "
+                                 "ORDER BY id").fetchall()
+        assert len(audit) == 11
+        assert audit[0][0] == "Material: FO-001, Type: receipt, Qty: 2, Ref: GRN-0"
+
+    def test_csv_body(self, client):
+        body = ("material_code,transaction_type,quantity,unit_cost,transaction_ref,notes,created_by\n"
+                "FO-002,receipt,500,1.2,GRN-1,,1\n"
+                "FO-002,issue,120,,JOB-7,splice,1\n")
+        response = client.post("/api/inventory/materials/transaction", data=body, content_type="text/csv")
+        assert response.status_code == 201
+        assert response.get_json()["inserted"] == 2
+        materials = client.get("/api/inventory/materials?material_type=Cable").get_json()["materials"]
+        assert [m["current_balance"] for m in materials if m["material_code"] == "FO-002"] == [380]
+
+    def test_invalid_row_rejects_whole_load(self, client, database):
+        rows = [{"material_code": "FO-001", "transaction_type": "receipt", "quantity": 1, "created_by": 1},
+                {"material_code": "NOPE", "transaction_type": "receipt", "quantity": 1, "created_by": 1}]
+        response = client.post("/api/inventory/materials/transaction", json=rows)
+        assert response.status_code == 400
+        assert response.get_json()["error"].startswith("Transaction 1:")
+        with sqlite3.connect(str(database)) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM material_inventory").fetchone()[0] == 0
+        assert client.post("/api/inventory/materials/transaction", json=[]).status_code == 400
+
+    def test_material_codes_cached(self, database):
+        """Validation queries materials_info once per TTL, and invalidate() forces a reload."""
+        pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=1, dialect="sqlite")
+        cache = inventory_api.ActiveMaterialCodes(ttl=60)
+        codes = cache.get(pool)
+        assert "FO-001" in codes and len(codes) == 6
+        with pool.connection() as conn:
+            conn.execute("UPDATE materials_info SET is_active = 0 WHERE material_code = 'FO-001'")
+        assert cache.get(pool) is codes
+        cache.invalidate(pool)
+        assert "FO-001" not in cache.get(pool)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled fault reports API (api_server.py, reports_api.py, db_pool.py),
+run against the SQLite stand-in schema.
+"""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+
+import api_server
+import db_pool
+
+REGIONS = ["YGN", "MDY"]
+STATUSES = ["open", "in_progress", "resolved"]
+
+
+def seed_reports(path, count=25):
+    """Insert count reports; every third pair shares a raised_time to exercise the id tie-break."""
+    with sqlite3.connect(str(path)) as conn:
+        conn.executemany(
+            "INSERT INTO fault_reports (trans_num, project_name, fault_name, region, township, raised_time, "
+            "cleared_time, status, created_by) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1)",
+            [
+                (f"RPT202501{i:04d}", "FTTH", f"Fault {i}", REGIONS[i % 2], f"TS{i % 3}",
+                 f"2025-01-{1 + (i // 2) % 28:02d} 08:00:00", "2025-02-01 08:00:00" if i == 1 else None,
+                 STATUSES[i % 3])
+                for i in range(1, count + 1)
+            ],
+        )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    seed_reports(path)
+    return path
+
+
+@pytest.fixture
+def pool(database):
+    return db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=2, timeout=1, dialect="sqlite")
+
+
+@pytest.fixture
+def client(pool):
+    app = api_server.create_app(pool=pool)
+    app.config["TESTING"] = True
+    return app.test_client()
+
+
+def walk_pages(client, query=""):
+    """Follow next_cursor until the last page; returns the pages' trans_nums."""
+    pages, cursor = [], None
+    while True:
+        url = f"/api/reports?{query}" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url).get_json()
+        pages.append([report["trans_num"] for report in body["reports"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+class TestConnectionPool:
+    """Test the bounded connection pool."""
+
+    def test_connections_reused(self, pool):
+        """A returned connection is handed out again instead of opening a new one."""
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+
+    def test_bounded(self, database):
+        """Callers beyond max_size wait, then get PoolTimeout."""
+        pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=1, timeout=0.05,
+                                      dialect="sqlite")
+        with pool.connection():
+            with pytest.raises(db_pool.PoolTimeout):
+                with pool.connection():
+                    pass
+
+    def test_rollback_on_error(self, pool):
+        """A failing block leaves no partial writes behind."""
+        with pytest.raises(RuntimeError):
+            with pool.connection() as conn:
+                conn.execute("DELETE FROM fault_reports")
+                raise RuntimeError("boom")
+        with pool.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM fault_reports").fetchone()[0] == 25
+
+    def test_mssql_connection_string(self):
+        """The ODBC string is built from database_config.json's connection block."""
+        conn_str = db_pool.mssql_connection_string({
+            "server": "HOST\\SQLEXPRESS", "database": "api", "user": "u", "password": "p",
+            "options": {"encrypt": False, "trustServerCertificate": True},
+        })
+        assert "SERVER=HOST\\SQLEXPRESS;DATABASE=api;UID=u;PWD=p;" in conn_str
+        assert conn_str.endswith("Encrypt=no;TrustServerCertificate=yes;")
+
+
+class TestReportsList:
+    """Test keyset pagination and filters on GET /api/reports."""
+
+    def test_first_page_newest_first(self, client):
+        body = client.get("/api/reports?limit=5").get_json()
+        assert [r["trans_num"] for r in body["reports"]] == [
+            "RPT2025010025", "RPT2025010024", "RPT2025010023", "RPT2025010022", "RPT2025010021"]
+        assert body["next_cursor"]
+
+    def test_pages_cover_every_report_once(self, client):
+        """Walking the cursors visits each report exactly once, ties on raised_time included."""
+        pages = walk_pages(client, "limit=4")
+        seen = [trans_num for page in pages for trans_num in page]
+        assert len(pages) == 7
+        assert sorted(seen) == sorted(set(seen)) and len(seen) == 25
+
+    def test_filters(self, client):
+        pages = walk_pages(client, "limit=3&region=YGN&status=open")
+        seen = {trans_num for page in pages for trans_num in page}
+        expected = {f"RPT202501{i:04d}" for i in range(1, 26) if i % 2 == 0 and i % 3 == 0}
+        assert seen == expected
+
+    def test_invalid_arguments(self, client):
+        assert client.get("/api/reports?limit=0").status_code == 400
+        assert client.get("/api/reports?limit=abc").status_code == 400
+        assert client.get("/api/reports?cursor=not-a-cursor").status_code == 400
+
+    def test_page_query_uses_raised_time_index(self, database):
+        """The page query is an index walk with no separate sort step."""
+        from reports_api import list_reports_page
+        conn = sqlite3.connect(str(database))
+        statements = []
+        conn.set_trace_callback(statements.append)
+        list_reports_page(conn, "sqlite", {}, 50, ("2025-01-05 08:00:00", 9))
+        plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statements[-1]))
+        assert "IX_fault_reports_raised_time" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestReportItem:
+    """Test get/update/delete of single reports."""
+
+    def test_get_by_trans_num_and_id(self, client):
+        report = client.get("/api/reports/RPT2025010001").get_json()
+        assert report["fault_name"] == "Fault 1"
+        assert report["duration"] == 31 * 1440
+        assert client.get(f"/api/reports/{report['id']}").get_json()["trans_num"] == "RPT2025010001"
+        assert client.get("/api/reports/NOPE").status_code == 404
+
+    def test_update(self, client):
+        response = client.put("/api/reports/RPT2025010002", json={"status": "closed", "pic": "AUNG"})
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "closed"
+        assert client.put("/api/reports/RPT2025010002", json={"id": 5}).status_code == 400
+        assert client.put("/api/reports/RPT2025010002", json={"status": "bogus"}).status_code == 400
+        assert client.put("/api/reports/NOPE", json={"pic": "X"}).status_code == 404
+
+    def test_delete(self, client):
+        assert client.delete("/api/reports/RPT2025010003").status_code == 204
+        assert client.get("/api/reports/RPT2025010003").status_code == 404
+        assert client.delete("/api/reports/RPT2025010003").status_code == 404
+
+    def test_busy_pool_returns_503(self, client, pool):
+        """Requests that cannot get a connection are answered with 503."""
+        pool.timeout = 0.01
+        held = [pool.connection(), pool.connection()]
+        for ctx in held:
+            ctx.__enter__()
+        try:
+            assert client.get("/api/reports").status_code == 503
+        finally:
+            for ctx in held:
+                ctx.__exit__(None, None, None)
+
+
+class TestReportChildren:
+    """Test batched loading of photos, materials and services."""
+
+    @pytest.fixture
+    def traced_client(self, database):
+        """A client whose pool records every SQL statement it runs."""
+        with sqlite3.connect(str(database)) as conn:
+            report_ids = [row[0] for row in conn.execute("SELECT id FROM fault_reports ORDER BY id")]
+            conn.executemany(
+                "INSERT INTO report_photos (report_id, original_name, unique_name, file_path, file_size, "
+                "content_type, uploaded_by) VALUES (?, 'a.jpg', ?, ?, 10, 'image/jpeg', 1)",
+                [(rid, f"u{rid}.jpg", f"uploads/u{rid}.jpg") for rid in report_ids],
+            )
+            conn.executemany(
+                "INSERT INTO report_materials (report_id, material_code, material_name, material_usage, unit_cost) "
+                "VALUES (?, 'FO-001', 'Single Mode Fiber Optic Cable', ?, 15.5)",
+                [(rid, n) for rid in report_ids for n in (1, 2)],
+            )
+            conn.execute("INSERT INTO report_services (report_id, service_code, service_name, service_usage, "
+                         "unit_cost) VALUES (?, 'SV-001', 'Fiber Splicing Service', 3, 25)", [report_ids[-1]])
+        statements = []
+
+        def connect():
+            conn = db_pool.sqlite_connector(database)()
+            conn.set_trace_callback(lambda sql: sql.lstrip().upper().startswith("SELECT") and statements.append(sql))
+            return conn
+
+        pool = db_pool.ConnectionPool(connect, max_size=1, dialect="sqlite")
+        return api_server.create_app(pool=pool).test_client(), statements
+
+    def test_list_page_takes_four_queries(self, traced_client):
+        """A page costs one report query plus one per child table, whatever its size."""
+        client, statements = traced_client
+        for limit in (5, 20):
+            statements.clear()
+            reports = client.get(f"/api/reports?limit={limit}").get_json()["reports"]
+            assert len(reports) == limit
+            assert len(statements) == 4
+        newest = reports[0]
+        assert newest["trans_num"] == "RPT2025010025"
+        assert [m["material_usage"] for m in newest["materials"]] == [1, 2]
+        assert newest["materials"][0]["total_cost"] == 15.5
+        assert newest["photos"][0]["unique_name"] == f"u{newest['id']}.jpg"
+        assert newest["services"][0]["total_cost"] == 75
+        assert reports[1]["services"] == []
+
+    def test_detail_includes_children(self, traced_client):
+        client, statements = traced_client
+        statements.clear()
+        report = client.get("/api/reports/RPT2025010001").get_json()
+        assert len(report["photos"]) == 1 and len(report["materials"]) == 2
+        assert len(statements) == 4
+
+    def test_children_batched(self, traced_client, monkeypatch):
+        """Long id lists are split into IN batches."""
+        import reports_api
+        client, statements = traced_client
+        monkeypatch.setattr(reports_api, "CHILD_BATCH_SIZE", 2)
+        statements.clear()
+        reports = client.get("/api/reports?limit=5").get_json()["reports"]
+        assert len(statements) == 1 + 3 * 3
+        assert all(len(report["materials"]) == 2 for report in reports)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tests for the RFO expression detector (exp_detect_improved.py).
+"""
+
+import pytest
+
+import exp_detect_improved as rfo_module
+from exp_detect_improved import RFODetector
+from rfo_benchmark import ReferenceMatcher, generate_noisy_corpus, run_benchmark
+
+
+def reference_detect(detector, expression_word, fuzzy_threshold=0.8):
+    """The original linear-scan matcher, kept as the behavioural reference."""
+    return ReferenceMatcher(detector).detect(expression_word, fuzzy_threshold)
+
+
+def noisy_queries(detector, count=150, seed=7):
+    """Root-cause strings with typos, dropped words, extra words and casing noise."""
+    edge_cases = ["()", "a", "dg", "dbd modul issue"]
+    return edge_cases + [query.text for query in generate_noisy_corpus(detector, count, seed)]
+
+
+class TestIndexedMatcher:
+    """The indexed matcher must return exactly what the linear scan returned."""
+
+    @pytest.mark.parametrize("threshold", [0.0, 0.5, 0.8, 0.95, 1.0])
+    def test_matches_reference(self, threshold):
+        """Same results as the reference on noisy queries, at several thresholds."""
+        detector = RFODetector()
+        for query in noisy_queries(detector):
+            assert detector.detect_rfo_expression(query, threshold) == \
+                reference_detect(detector, query, threshold), query
+
+    def test_matches_reference_without_rapidfuzz(self, monkeypatch):
+        """The pure-Python bound pruning gives the same results as the rapidfuzz path."""
+        monkeypatch.setattr(rfo_module, "rapidfuzz_process", None)
+        detector = RFODetector()
+        for query in noisy_queries(detector, seed=11):
+            assert detector.detect_rfo_expression(query) == reference_detect(detector, query), query
+
+    def test_duplicate_text_returns_first_entry(self):
+        """Exact hits on repeated descriptions resolve to the earliest code."""
+        detector = RFODetector()
+        assert detector.detect_rfo_expression("Night Time Access") == ("00124", "Night Time Access")
+
+    def test_invalid_threshold(self):
+        """Thresholds outside [0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            RFODetector().detect_rfo_expression("BTS, CPRI", 1.5)
+
+
+class TestBatchDetection:
+    """Test the deduplicating batch API."""
+
+    def test_batch_matches_single_calls(self):
+        """Each value gets what detect_rfo_expression() returns for it, aligned with the input."""
+        detector = RFODetector()
+        values = ["BTS, CPRI", None, "bts cpri", "", "Unknown Issue", "battry cells fault", 42]
+        result = detector.detect_rfo_expressions(values)
+        assert list(result) == ["RFO_CODE", "RFO_ROOT_CAUSE", "RFO_PRIORITY"]
+        assert result["RFO_CODE"] == ["00001", None, "00001", None, None, "00131", None]
+        assert result["RFO_ROOT_CAUSE"][5] == "Battery Cells Fault"
+        assert result["RFO_PRIORITY"][0] == "Critical Impact"
+
+    def test_each_distinct_text_classified_once(self, monkeypatch):
+        """Duplicates (after normalization) and repeat calls reuse earlier results."""
+        detector = RFODetector()
+        calls = []
+        original = detector._match_normalized
+        monkeypatch.setattr(detector, "_match_normalized",
+                            lambda text, threshold: calls.append(text) or original(text, threshold))
+        detector.detect_rfo_expressions(["Fire", " fire ", "FIRE", "Flood"])
+        detector.detect_rfo_expressions(["fire", "Flood"])
+        assert sorted(calls) == ["fire", "flood"]
+
+    def test_series_returns_aligned_frame(self):
+        """A pandas Series yields a DataFrame on the same index."""
+        pd = pytest.importorskip("pandas")
+        series = pd.Series(["Fire", "Cable Stolen", None], index=[10, 20, 30])
+        frame = RFODetector().detect_rfo_expressions(series)
+        assert list(frame.index) == [10, 20, 30]
+        assert frame.loc[20, "RFO_CODE"] == "00176"
+        assert pd.isna(frame.loc[30, "RFO_CODE"])
+
+    def test_process_pool_matches_in_process(self, monkeypatch):
+        """Fanning out to worker processes gives the same columns."""
+        monkeypatch.setattr(rfo_module, "PARALLEL_MIN_UNIQUE", 10)
+        monkeypatch.setattr(rfo_module, "PARALLEL_CHUNK_SIZE", 20)
+        detector = RFODetector()
+        queries = noisy_queries(detector, count=60, seed=3)
+        assert RFODetector().detect_rfo_expressions(queries, max_workers=2) == \
+            detector.detect_rfo_expressions(queries)
+
+
+class TestLookups:
+    """Test the indexed code, priority and search lookups."""
+
+    def test_get_rfo_by_code(self):
+        """Codes resolve through the index; unknown codes give None."""
+        detector = RFODetector()
+        assert detector.get_rfo_by_code("00001").root_caused == "BTS, CPRI"
+        assert detector.get_rfo_by_code("0104").root_caused == "Car accident"
+        assert detector.get_rfo_by_code("99999") is None
+
+    def test_get_rfos_by_priority(self):
+        """Buckets hold the same entries, in table order, as a filter over rfo_entries."""
+        detector = RFODetector()
+        for priority in rfo_module.Priority:
+            assert detector.get_rfos_by_priority(priority) == \
+                [rfo for rfo in detector.rfo_entries if rfo.priority == priority]
+
+    @pytest.mark.parametrize("term", ["power", "DG", "a", "fiber cut", "cable", "xyz", "(reset)", "pump fault"])
+    def test_search_rfos_matches_scan(self, term):
+        """Trigram-filtered search returns what a substring scan returns."""
+        detector = RFODetector()
+        normalized = detector._normalize_text(term)
+        expected = [rfo for rfo in detector.rfo_entries if normalized and normalized in rfo.normalized_root_caused]
+        assert detector.search_rfos(term) == expected
+
+    def test_code_priority_map_vectorised(self):
+        """The code -> priority map enriches a code column with one .map() call."""
+        pd = pytest.importorskip("pandas")
+        detector = RFODetector()
+        codes = pd.Series(["00001", "00108", None, "nope"])
+        priorities = codes.map(detector.code_priority_map())
+        assert priorities.tolist()[:2] == ["Critical Impact", "Contextual Factor"]
+        assert priorities.iloc[2:].isna().all()
+
+    def test_entries_are_immutable(self):
+        """RFOEntry is frozen and slotted."""
+        rfo = RFODetector().rfo_entries[0]
+        with pytest.raises(AttributeError):
+            rfo.code = "changed"
+        assert not hasattr(rfo, "__dict__")
+
+
+class TestSharedDetector:
+    """Test the process-wide detector and the on-disk index cache."""
+
+    def test_get_detector_is_shared(self):
+        """Every caller, including concurrent first callers, gets the same instance."""
+        import threading
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(rfo_module.get_detector()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(d is rfo_module.get_detector() for d in results)
+        assert rfo_module.detect_rfo_expression("BTS, CPRI") == ("00001", "BTS, CPRI")
+
+    def test_index_cache_round_trip(self, tmp_path, monkeypatch):
+        """A detector loaded from the cache has the same entries and indexes as a parsed one."""
+        monkeypatch.setattr(rfo_module, "INDEX_CACHE_PATH", str(tmp_path / "rfo_index"))
+        parsed = RFODetector()
+        assert (tmp_path / "rfo_index").is_file()
+        monkeypatch.setattr(RFODetector, "_parse_rfo_data", lambda self: pytest.fail("cache not used"))
+        cached = RFODetector()
+        assert cached.rfo_entries == parsed.rfo_entries
+        assert cached._ngram_index == parsed._ngram_index
+        assert cached._ngram_counts == parsed._ngram_counts
+        assert cached.detect_rfo_expression("battry cells fault") == ("00131", "Battery Cells Fault")
+
+    def test_index_cache_invalidated_by_table_change(self, tmp_path, monkeypatch):
+        """Changing _DATA_STRING makes the cached index stale."""
+        monkeypatch.setattr(rfo_module, "INDEX_CACHE_PATH", str(tmp_path / "rfo_index"))
+        RFODetector()
+        monkeypatch.setattr(RFODetector, "_DATA_STRING", "Code\tRoot_Caused\tPriority\n00001\tFire\tMinor Impact\n")
+        detector = RFODetector()
+        assert [rfo.code for rfo in detector.rfo_entries] == ["00001"]
+        assert detector.detect_rfo_expression("fire") == ("00001", "Fire")
+
+    def test_corrupt_cache_ignored(self, tmp_path, monkeypatch):
+        """An unreadable cache file falls back to parsing."""
+        path = tmp_path / "rfo_index"
+        path.write_bytes(b"not marshal data")
+        monkeypatch.setattr(rfo_module, "INDEX_CACHE_PATH", str(path))
+        assert len(RFODetector().rfo_entries) == len(RFODetector(use_cache=False).rfo_entries)
+
+
+class TestBenchmarkHarness:
+    """Test the benchmark corpus and its agreement check."""
+
+    def test_corpus_is_labelled_and_reproducible(self):
+        """The corpus includes the hand-picked cases and is the same for the same seed."""
+        detector = RFODetector()
+        corpus = generate_noisy_corpus(detector, size=50, seed=1)
+        assert len(corpus) == len(rfo_module.COMPREHENSIVE_TEST_CASES) + 50
+        assert corpus == generate_noisy_corpus(detector, size=50, seed=1)
+        assert all(q.expected_code for q in corpus if q.noise != "hand_picked")
+
+    def test_benchmark_agrees_with_reference(self):
+        """Every strategy of the indexed detector agrees with the reference."""
+        results = run_benchmark(size=60, seed=5)
+        for strategy in ("exact", "fuzzy", "substring", "pipeline"):
+            assert results[strategy]["mismatches"] == [], strategy
+            assert results[strategy]["indexed"]["qps"] > 0
+        assert results["accuracy"]["clean"] == 1.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
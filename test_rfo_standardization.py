@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the RFO standardization pipeline stage (rfo_standardization.py).
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+import rfo_standardization as rfo_std
+from exp_detect_improved import RFODetector
+
+
+class CountingDetector(RFODetector):
+    """Detector that records which texts it was asked to classify."""
+
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+
+    def detect_rfo_expressions(self, expressions, fuzzy_threshold=0.8, max_workers=None):
+        expressions = list(expressions)
+        self.seen.extend(expressions)
+        return super().detect_rfo_expressions(expressions, fuzzy_threshold, max_workers=None)
+
+
+class TestRFOStandardization:
+    """Test column enrichment and the persisted mapping table."""
+
+    def test_b2b_columns_enriched(self):
+        """Each root-cause column gets its own prefixed code and priority columns."""
+        df = pd.DataFrame({
+            "ROOT CAUSE (DIRECT AFFECT)": ["FIBER CUT BB", "CABLE STOLEN", None],
+            "SUB-ROOT CAUSE (EXTERNAL AFFECT)": ["CONSTRUCTION", "UNKNOWN THING", "FLOOD"],
+        })
+        store = rfo_std.RFOMappingStore(path=None)
+        rfo_std.standardize_rfo_columns(df, rfo_std.B2B_RFO_COLUMNS, store, max_workers=None)
+        assert df["ROOT_CAUSE_RFO_CODE"].tolist()[:2] == ["00208", "00176"]
+        assert pd.isna(df["ROOT_CAUSE_RFO_CODE"].iloc[2])
+        assert df["SUB_ROOT_CAUSE_RFO_PRIORITY"].iloc[0] == "Contextual Factor"
+        assert pd.isna(df["SUB_ROOT_CAUSE_RFO_CODE"].iloc[1])
+
+    def test_mapping_persists_and_skips_known_text(self, tmp_path):
+        """A second run over the same texts classifies nothing; only new text reaches the detector."""
+        path = tmp_path / "rfo_mapping.csv"
+        chunks = [pd.DataFrame({"STD_RFO": ["Fire", "Fire", "BTS, CPRI"]}),
+                  pd.DataFrame({"STD_RFO": ["Flood", "nonsense text"]})]
+        first = CountingDetector()
+        store = rfo_std.RFOMappingStore(path)
+        out = [rfo_std.standardize_rfo_columns(c, rfo_std.WO_FILE_RFO_COLUMNS, store, first, None) for c in chunks]
+        store.save()
+        assert sorted(first.seen) == ["BTS, CPRI", "Fire", "Flood", "nonsense text"]
+        assert out[0]["RFO_CODE"].tolist() == ["00108", "00108", "00001"]
+
+        saved = pd.read_csv(path, dtype=str, keep_default_na=False)
+        assert set(saved["RAW_TEXT"]) == {"Fire", "BTS, CPRI", "Flood", "nonsense text"}
+
+        second = CountingDetector()
+        store = rfo_std.RFOMappingStore(path)
+        df = rfo_std.standardize_rfo_columns(pd.DataFrame({"STD_RFO": ["Fire", "Cable Stolen"]}),
+                                             rfo_std.WO_FILE_RFO_COLUMNS, store, second, None)
+        assert second.seen == ["Cable Stolen"]
+        assert df["RFO_CODE"].tolist() == ["00108", "00176"]
+
+    def test_stale_mappings_ignored(self, tmp_path):
+        """Rows made with another threshold are not reused."""
+        path = tmp_path / "rfo_mapping.csv"
+        store = rfo_std.RFOMappingStore(path, fuzzy_threshold=0.8)
+        store.classify(["Fire"], RFODetector(), max_workers=None)
+        store.save()
+        assert "Fire" in rfo_std.RFOMappingStore(path, fuzzy_threshold=0.8).mapping
+        assert rfo_std.RFOMappingStore(path, fuzzy_threshold=0.9).mapping == {}
+
+    def test_iter_standardized_chunks_saves_store(self, tmp_path):
+        """Streaming chunks writes the mapping table when the stream is exhausted."""
+        path = tmp_path / "rfo_mapping.csv"
+        store = rfo_std.RFOMappingStore(path)
+        chunks = (pd.DataFrame({"STD_RFO": [text]}) for text in ["Fire", "Flood"])
+        out = list(rfo_std.iter_standardized_chunks(chunks, rfo_std.WO_FILE_RFO_COLUMNS, store, max_workers=None))
+        assert [c["RFO_CODE"].iloc[0] for c in out] == ["00108", "00109"]
+        assert path.is_file()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
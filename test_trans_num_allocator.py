@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for block-based transaction number allocation (trans_num_allocator.py) and the
+report create route that uses it.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+import db_pool
+from trans_num_allocator import TransNumAllocator, format_trans_num
+
+JANUARY = datetime(2025, 1, 15, 9, 0)
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    with sqlite3.connect(str(path)) as conn:
+        conn.executemany(
+            "INSERT INTO fault_reports (trans_num, project_name, fault_name, region, township, raised_time, "
+            "created_by) VALUES (?, 'FTTH', 'Fault', 'YGN', 'TS', '2025-01-01 08:00:00', 1)",
+            [("RPT2025010007",), ("RPT2025010003",), ("RPT2024120050",)],
+        )
+    return path
+
+
+def make_pool(database, statements=None):
+    def connect():
+        conn = db_pool.sqlite_connector(database)()
+        if statements is not None:
+            conn.set_trace_callback(statements.append)
+        return conn
+    return db_pool.ConnectionPool(connect, max_size=4, dialect="sqlite")
+
+
+def counter(database, period):
+    with sqlite3.connect(str(database)) as conn:
+        row = conn.execute("SELECT last_value FROM trans_num_counters WHERE prefix = 'RPT' AND period = ?",
+                           [period]).fetchone()
+    return row[0] if row else None
+
+
+class TestTransNumAllocator:
+    """Test block reservation, seeding and uniqueness."""
+
+    def test_format(self):
+        assert format_trans_num("RPT", "202506", 12) == "RPT2025060012"
+
+    def test_seeded_from_existing_reports(self, database):
+        """The first block of a month continues after numbers created before the counter existed."""
+        allocator = TransNumAllocator(make_pool(database), block_size=5, clock=lambda: JANUARY)
+        assert allocator.next() == "RPT2025010008"
+        assert counter(database, "202501") == 12
+
+    def test_one_round_trip_per_block(self, database):
+        """Numbers are served from the reserved block until it runs out."""
+        statements = []
+        allocator = TransNumAllocator(make_pool(database, statements), block_size=5, clock=lambda: JANUARY)
+        numbers = [allocator.next() for _ in range(7)]
+        assert numbers == [f"RPT20250100{n:02d}" for n in range(8, 15)]
+        assert sum("UPDATE trans_num_counters" in sql for sql in statements) == 2
+        assert counter(database, "202501") == 17
+
+    def test_bulk_allocation_is_consecutive(self, database):
+        """A request bigger than a block reserves what it needs in one go."""
+        allocator = TransNumAllocator(make_pool(database), block_size=5, clock=lambda: JANUARY)
+        allocator.next()
+        numbers = allocator.allocate(30)
+        assert numbers[0] == "RPT2025010009" and numbers[-1] == "RPT2025010038"
+        assert len(set(numbers)) == 30
+
+    def test_month_rollover(self, database):
+        """Leftover numbers of the old month are dropped when the month changes."""
+        now = [JANUARY]
+        allocator = TransNumAllocator(make_pool(database), block_size=5, clock=lambda: now[0])
+        allocator.next()
+        now[0] = datetime(2025, 2, 1)
+        assert allocator.next() == "RPT2025020001"
+
+    def test_concurrent_workers_never_collide(self, database):
+        """Several workers (own allocator and pool each) with several threads get unique numbers."""
+        allocators = [TransNumAllocator(make_pool(database), block_size=7, clock=lambda: JANUARY)
+                      for _ in range(3)]
+        results = []
+
+        def work(allocator):
+            results.extend(allocator.next() for _ in range(40))
+
+        threads = [threading.Thread(target=work, args=(allocator,)) for allocator in allocators for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 240 and len(set(results)) == 240
+
+
+class TestCreateRoute:
+    """Test POST /api/reports."""
+
+    @pytest.fixture
+    def client(self, database):
+        pytest.importorskip("flask")
+        pytest.importorskip("flask_cors")
+        import api_server
+        app = api_server.create_app(pool=make_pool(database))
+        app.extensions["trans_num_allocator"]._clock = lambda: JANUARY
+        return app.test_client()
+
+    def new_report(self, **fields):
+        report = {"project_name": "FTTH", "fault_name": "Cable cut", "region": "YGN", "township": "HLAING",
+                  "raised_time": "2025-01-15 08:00:00", "created_by": 1}
+        report.update(fields)
+        return report
+
+    def test_create_one(self, client):
+        response = client.post("/api/reports", json=self.new_report(priority="high"))
+        assert response.status_code == 201
+        report = response.get_json()
+        assert report["trans_num"] == "RPT2025010008"
+        assert report["priority"] == "high" and report["status"] == "open"
+        assert client.get("/api/reports/RPT2025010008").status_code == 200
+
+    def test_create_many(self, client):
+        """A bulk import gets consecutive numbers; mixed field sets keep their defaults."""
+        reports = [self.new_report(fault_name=f"F{i}") for i in range(5)] + [self.new_report(status="closed")]
+        response = client.post("/api/reports", json=reports)
+        assert response.status_code == 201
+        created = response.get_json()["reports"]
+        assert [r["trans_num"] for r in created] == [f"RPT20250100{n:02d}" for n in range(8, 14)]
+        assert [r["fault_name"] for r in created[:5]] == [f"F{i}" for i in range(5)]
+        assert created[5]["status"] == "closed"
+
+    def test_validation(self, client):
+        assert client.post("/api/reports", json={"fault_name": "x"}).status_code == 400
+        assert client.post("/api/reports", json=self.new_report(trans_num="X")).status_code == 400
+        response = client.post("/api/reports", json=[self.new_report(), {"region": "YGN"}])
+        assert response.status_code == 400 and "Report 1" in response.get_json()["error"]
+        assert client.post("/api/reports", json=self.new_report(status="bogus")).status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
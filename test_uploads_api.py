@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for photo uploads and their generated variants (uploads_api.py), run against the SQLite
+stand-in schema.
+"""
+
+import io
+import sqlite3
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+PILImage = pytest.importorskip("PIL.Image")
+
+import api_server
+import db_pool
+import uploads_api
+
+
+def make_photo(size=(3000, 2000), image_format="JPEG"):
+    """A noisy camera-sized photo, so the original is large and the variants are not trivial."""
+    img = PILImage.effect_noise(size, 60).convert("RGB")
+    data = io.BytesIO()
+    img.save(data, image_format, quality=95)
+    return data.getvalue()
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / "api.db"
+    db_pool.create_sqlite_database(path)
+    with sqlite3.connect(str(path)) as conn:
+        conn.execute("INSERT INTO fault_reports (trans_num, project_name, fault_name, region, township, "
+                     "raised_time, status, created_by) VALUES ('RPT2025010001', 'FTTH', 'Fiber cut', 'YGN', "
+                     "'TS1', '2025-01-01 08:00:00', 'open', 1)")
+    return path
+
+
+@pytest.fixture
+def app(database, tmp_path):
+    pool = db_pool.ConnectionPool(db_pool.sqlite_connector(database), max_size=2, dialect="sqlite")
+    app = api_server.create_app(pool=pool)
+    app.extensions["file_storage"] = app.extensions["file_storage"]._replace(upload_path=tmp_path / "uploads")
+    return app
+
+
+def upload(client, files, **form):
+    data = {"uploaded_by": "1", "trans_num": "RPT2025010001", **form}
+    data["photos"] = [(io.BytesIO(content), name, content_type) for name, content, content_type in files]
+    return client.post("/api/uploads/photos", data=data, content_type="multipart/form-data")
+
+
+class TestSettings:
+    """Test reading file_storage from database_config.json."""
+
+    def test_config_values(self):
+        settings = uploads_api.file_storage_settings()
+        assert settings.photo_quality == 85
+        assert settings.thumbnail_size == (200, 200)
+        assert settings.max_file_size == 10 * 1024 * 1024
+        assert "image/jpeg" in settings.allowed_types
+        assert settings.upload_path.name == "uploads"
+
+    def test_parsers(self):
+        assert uploads_api.parse_size("512KB") == 512 * 1024
+        assert uploads_api.parse_dimensions("320 x 240") == (320, 240)
+        with pytest.raises(ValueError):
+            uploads_api.parse_dimensions("big")
+
+
+class TestPhotoUpload:
+    """Test storing originals, rendering variants and recording them."""
+
+    def test_upload_creates_variants(self, app, database):
+        client = app.test_client()
+        response = upload(client, [("pole.jpg", make_photo(), "image/jpeg"),
+                                   ("splice.png", make_photo((800, 1200), "PNG"), "image/png")],
+                          labels=["Pole", ""])
+        assert response.status_code == 201
+        photos = response.get_json()["photos"]
+        assert [p["original_name"] for p in photos] == ["pole.jpg", "splice.png"]
+        assert photos[0]["label"] == "Pole" and photos[1]["label"] is None
+
+        root = app.extensions["file_storage"].upload_path
+        with PILImage.open(root / photos[0]["thumbnail_path"]) as thumb:
+            assert thumb.format == "JPEG" and thumb.size == (200, 133)
+        with PILImage.open(root / photos[1]["web_path"]) as web:
+            assert max(web.size) <= 1280
+        assert photos[0]["thumbnail_size"] < 20 * 1024 < photos[0]["file_size"]
+        assert photos[0]["file_path"].startswith("originals/") and photos[0]["unique_name"].endswith(".jpg")
+
+        thumb = client.get(photos[0]["thumbnail_url"])
+        assert thumb.status_code == 200 and thumb.mimetype == "image/jpeg"
+        assert "max-age=31536000" in thumb.headers["Cache-Control"]
+        thumb.close()
+
+        report = client.get("/api/reports/RPT2025010001").get_json()
+        assert [p["thumbnail_path"] for p in report["photos"]] == [p["thumbnail_path"] for p in photos]
+
+    def test_rejected_upload_keeps_nothing(self, app, database):
+        client = app.test_client()
+        response = upload(client, [("pole.jpg", make_photo((400, 300)), "image/jpeg"),
+                                   ("broken.jpg", b"not an image", "image/jpeg")])
+        assert response.status_code == 400
+        assert "broken.jpg" in response.get_json()["error"]
+        root = app.extensions["file_storage"].upload_path
+        assert [p for p in root.rglob("*") if p.is_file()] == []
+        with sqlite3.connect(str(database)) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM report_photos").fetchone()[0] == 0
+
+    def test_validation(self, app):
+        client = app.test_client()
+        photo = [("pole.jpg", make_photo((100, 100)), "image/jpeg")]
+        assert upload(client, [("notes.txt", b"hello", "text/plain")]).status_code == 400
+        assert upload(client, photo, trans_num="NOPE").status_code == 404
+        assert upload(client, photo, uploaded_by="someone").status_code == 400
+        assert upload(client, []).status_code == 400
+
+    def test_file_too_large(self, app):
+        app.extensions["file_storage"] = app.extensions["file_storage"]._replace(max_file_size=1024)
+        response = upload(app.test_client(), [("pole.jpg", make_photo((400, 300)), "image/jpeg")])
+        assert response.status_code == 413
+        root = app.extensions["file_storage"].upload_path
+        assert [p for p in root.rglob("*") if p.is_file()] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,129 @@
+"""
+Transaction Number Allocation
+
+Hands out fault report numbers (<prefix><YYYYMM><0001>) without a MAX() scan of fault_reports
+and without collisions between concurrent creates.
+
+Numbers come from the trans_num_counters table in blocks: each allocator reserves block_size
+numbers with one counter update (sp_allocate_trans_nums on SQL Server) and then serves them from
+memory, so a worker only touches the database once per block. Numbers left in a block when
+the worker stops, or when the month rolls over, are simply never used; the sequence can have
+gaps but never duplicates.
+"""
+
+import threading
+from datetime import datetime
+
+DEFAULT_PREFIX = 'RPT'
+DEFAULT_BLOCK_SIZE = 20
+SEQUENCE_DIGITS = 4
+
+# SQL Server: the stored procedure locks the counter row and seeds it on first use each month
+MSSQL_ALLOCATE_SQL = """
+SET NOCOUNT ON;
+DECLARE @period CHAR(6) = ?, @first_value INT;
+EXEC [dbo].[sp_allocate_trans_nums] @prefix = ?, @count = ?, @period = @period OUTPUT,
+    @first_value = @first_value OUTPUT;
+SELECT @first_value;
+"""
+
+
+def current_period(now=None):
+    """Year-month part of a transaction number, e.g. '202506'."""
+    return (now or datetime.now()).strftime('%Y%m')
+
+
+def format_trans_num(prefix, period, value):
+    """<prefix><YYYYMM><sequence>, the sequence zero-padded to SEQUENCE_DIGITS."""
+    return f"{prefix}{period}{value:0{SEQUENCE_DIGITS}d}"
+
+
+def reserve_block(conn, dialect, prefix, period, count):
+    """
+    Reserves count consecutive numbers for (prefix, period) on conn.
+
+    The caller's transaction must be committed for the reservation to stick (the pool does
+    this when the with-block exits).
+
+    Returns:
+        int: The first number of the block.
+    """
+    cursor = conn.cursor()
+    if dialect == 'mssql':
+        cursor.execute(MSSQL_ALLOCATE_SQL, [period, prefix, count])
+        return cursor.fetchone()[0]
+
+    # SQLite: the UPDATE takes the database write lock, so the read-modify-write is atomic
+    cursor.execute(
+        "UPDATE trans_num_counters SET last_value = last_value + ?, updated_at = CURRENT_TIMESTAMP "
+        "WHERE prefix = ? AND period = ? RETURNING last_value",
+        [count, prefix, period],
+    )
+    row = cursor.fetchone()
+    if row is None:
+        # First allocation this month: continue from any numbers created before the counter existed
+        cursor.execute(
+            f"SELECT COALESCE(MAX(CAST(substr(trans_num, -{SEQUENCE_DIGITS}) AS INTEGER)), 0) "
+            "FROM fault_reports WHERE trans_num LIKE ?",
+            [f"{prefix}{period}%"],
+        )
+        last_value = cursor.fetchone()[0] + count
+        cursor.execute("INSERT INTO trans_num_counters (prefix, period, last_value) VALUES (?, ?, ?)",
+                       [prefix, period, last_value])
+    else:
+        last_value = row[0]
+    return last_value - count + 1
+
+
+class TransNumAllocator:
+    """
+    Thread-safe source of unique transaction numbers for one API worker.
+
+    Keeps the unused part of the last reserved block in memory; requests for more numbers
+    than are left (or from a new month) reserve a fresh block first.
+    """
+
+    def __init__(self, pool, prefix=DEFAULT_PREFIX, block_size=DEFAULT_BLOCK_SIZE, clock=datetime.now):
+        """
+        Args:
+            pool (ConnectionPool): Pool to reserve blocks through.
+            prefix (str): Transaction number prefix.
+            block_size (int): Numbers reserved per database round trip.
+            clock (callable): Returns the current datetime (the month of the numbers).
+        """
+        self.pool = pool
+        self.prefix = prefix
+        self.block_size = block_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._period = None
+        self._next = 0
+        self._end = 0 # One past the last reserved number
+
+    def allocate(self, count=1):
+        """
+        Returns count unique transaction numbers, in increasing order.
+
+        Numbers from one call are consecutive unless the current block runs out part way.
+        """
+        period = current_period(self._clock())
+        numbers = []
+        with self._lock:
+            if period != self._period:
+                self._period, self._next, self._end = period, 0, 0
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    # Bulk requests reserve everything they still need in one go
+                    size = max(self.block_size, count - len(numbers))
+                    with self.pool.connection() as conn:
+                        self._next = reserve_block(conn, self.pool.dialect, self.prefix, period, size)
+                    self._end = self._next + size
+                take = min(count - len(numbers), self._end - self._next)
+                numbers.extend(format_trans_num(self.prefix, period, value)
+                               for value in range(self._next, self._next + take))
+                self._next += take
+        return numbers
+
+    def next(self):
+        """Returns one new transaction number."""
+        return self.allocate(1)[0]
@@ -0,0 +1,265 @@
+"""
+Photo Upload API (/api/uploads/photos, /uploads/<filename>)
+
+Stores report photos under file_storage.upload_path (database_config.json) and records them in
+report_photos. Each upload is streamed to disk in chunks, then a shared worker pool renders two
+JPEG variants with image_processing.downscale_image():
+
+    thumbnails/  fits file_storage.thumbnail_size (200x200), for lists and previews
+    web/         fits WEB_VARIANT_SIZE, for viewing on screen
+
+both at file_storage.photo_quality. Originals are kept under originals/. Every stored name is
+unique and never rewritten, so /uploads/ responses are cacheable indefinitely.
+"""
+
+import json
+import os
+import re
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from flask import Blueprint, current_app, jsonify, request, send_from_directory
+from PIL import Image
+
+from db_pool import CONFIG_PATH, current_pool, fetch_dicts, json_row
+from image_processing import MAX_WORKERS, SCREEN_DPI, downscale_image
+
+uploads_bp = Blueprint('uploads', __name__)
+
+FileStorageSettings = namedtuple(
+    'FileStorageSettings', ['upload_path', 'max_file_size', 'allowed_types', 'photo_quality', 'thumbnail_size'])
+
+DEFAULT_MAX_FILE_SIZE = 10 * 1024 * 1024
+DEFAULT_PHOTO_QUALITY = 85
+DEFAULT_THUMBNAIL_SIZE = (200, 200)
+WEB_VARIANT_SIZE = (1280, 1280)
+UPLOAD_CHUNK_SIZE = 64 * 1024
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+ORIGINALS_DIR = 'originals'
+THUMBNAILS_DIR = 'thumbnails'
+WEB_DIR = 'web'
+
+PHOTO_COLUMNS = [
+    "id", "report_id", "original_name", "unique_name", "file_path", "file_size", "content_type", "label",
+    "thumbnail_path", "thumbnail_size", "web_path", "web_size", "uploaded_at", "uploaded_by",
+]
+PHOTO_EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp'}
+
+# Shared by all requests, so concurrent uploads cannot start more encoders than there are cores
+variant_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='photo-variants')
+
+
+class UploadTooLarge(Exception):
+    """Raised when an uploaded file exceeds file_storage.max_file_size."""
+
+
+def error_response(message, status):
+    return jsonify({'error': message}), status
+
+
+def parse_size(text):
+    """'10MB' -> bytes (B, KB, MB and GB, base 1024)."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B)?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size {text!r}")
+    power = ['B', 'KB', 'MB', 'GB'].index((match.group(2) or 'B').upper())
+    return int(float(match.group(1)) * 1024 ** power)
+
+
+def parse_dimensions(text):
+    """'200x200' -> (200, 200)."""
+    match = re.fullmatch(r'\s*(\d+)\s*[xX]\s*(\d+)\s*', str(text))
+    if not match:
+        raise ValueError(f"Invalid dimensions {text!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def file_storage_settings(config_path=CONFIG_PATH):
+    """Reads file_storage from database_config.json; upload_path is resolved next to the config file."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        options = json.load(f).get('file_storage', {})
+    return FileStorageSettings(
+        upload_path=(Path(config_path).parent / options.get('upload_path', './uploads')).resolve(),
+        max_file_size=parse_size(options['max_file_size']) if 'max_file_size' in options else DEFAULT_MAX_FILE_SIZE,
+        allowed_types=frozenset(options.get('allowed_types', PHOTO_EXTENSIONS)),
+        photo_quality=options.get('photo_quality', DEFAULT_PHOTO_QUALITY),
+        thumbnail_size=(parse_dimensions(options['thumbnail_size']) if 'thumbnail_size' in options
+                        else DEFAULT_THUMBNAIL_SIZE),
+    )
+
+
+def save_stream(stream, path, max_size):
+    """
+    Copies an upload stream to path in UPLOAD_CHUNK_SIZE pieces.
+
+    Returns:
+        int: Bytes written.
+
+    Raises:
+        UploadTooLarge: Once more than max_size bytes arrive (the partial file is removed).
+    """
+    size = 0
+    try:
+        with open(path, 'wb') as out:
+            while True:
+                chunk = stream.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLarge()
+                out.write(chunk)
+    except BaseException:
+        remove_quietly(path)
+        raise
+    return size
+
+
+def remove_quietly(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def render_variants(settings, jobs):
+    """
+    Renders the thumbnail and web variant of every saved original in the worker pool.
+
+    Args:
+        settings (FileStorageSettings): Sizes and quality to use.
+        jobs: (original_path, thumbnail_path, web_path) tuples.
+
+    Returns:
+        list: One entry per job, in order: None on success, or the exception it raised.
+    """
+    futures = []
+    for original, thumbnail, web in jobs:
+        futures.append((
+            variant_executor.submit(downscale_image, original, thumbnail, settings.thumbnail_size, SCREEN_DPI,
+                                    settings.photo_quality, 'JPEG', True),
+            variant_executor.submit(downscale_image, original, web, WEB_VARIANT_SIZE, SCREEN_DPI,
+                                    settings.photo_quality, 'JPEG', True),
+        ))
+    errors = []
+    for pair in futures:
+        error = None
+        for future in pair:
+            try:
+                future.result()
+            except (OSError, ValueError, Image.DecompressionBombError) as e:
+                error = error or e
+        errors.append(error)
+    return errors
+
+
+def with_urls(photo):
+    """A report_photos row as JSON, with the /uploads/ URL of the original and each variant."""
+    row = json_row(photo)
+    for key, column in (('url', 'file_path'), ('thumbnail_url', 'thumbnail_path'), ('web_url', 'web_path')):
+        row[key] = f"/uploads/{row[column]}" if row.get(column) else None
+    return row
+
+
+@uploads_bp.route('/api/uploads/photos', methods=['POST'])
+def upload_photos():
+    """
+    POST /api/uploads/photos (multipart/form-data)
+
+    Fields: report_id or trans_num, uploaded_by, one or more "photos" files and optionally one
+    "labels" value per file. All files are stored and processed before any row is written; if one
+    is rejected, none are kept. Returns 201 with {"photos": [...]}, each carrying url,
+    thumbnail_url and web_url.
+    """
+    settings = current_app.extensions['file_storage']
+    files = [f for f in request.files.getlist('photos') if f.filename]
+    if not files:
+        return error_response("No photos uploaded", 400)
+    try:
+        uploaded_by = int(request.form['uploaded_by'])
+    except (KeyError, ValueError):
+        return error_response("uploaded_by must be a user id", 400)
+    labels = request.form.getlist('labels')
+    for upload in files:
+        if upload.mimetype not in settings.allowed_types:
+            return error_response(f"{upload.filename}: file type {upload.mimetype or 'unknown'} is not allowed", 400)
+
+    pool = current_pool()
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        if request.form.get('report_id'):
+            cursor.execute("SELECT id FROM fault_reports WHERE id = ?", [request.form['report_id']])
+        else:
+            cursor.execute("SELECT id FROM fault_reports WHERE trans_num = ?", [request.form.get('trans_num')])
+        found = cursor.fetchone()
+    if found is None:
+        return error_response("Report not found", 404)
+    report_id = found[0]
+
+    for folder in (ORIGINALS_DIR, THUMBNAILS_DIR, WEB_DIR):
+        (settings.upload_path / folder).mkdir(parents=True, exist_ok=True)
+
+    photos, written = [], []
+    try:
+        for index, upload in enumerate(files):
+            stem = uuid.uuid4().hex
+            unique_name = stem + PHOTO_EXTENSIONS.get(upload.mimetype, Path(upload.filename).suffix.lower())
+            paths = {
+                'file_path': f"{ORIGINALS_DIR}/{unique_name}",
+                'thumbnail_path': f"{THUMBNAILS_DIR}/{stem}.jpg",
+                'web_path': f"{WEB_DIR}/{stem}.jpg",
+            }
+            original = settings.upload_path / paths['file_path']
+            written.append(original)
+            try:
+                file_size = save_stream(upload.stream, original, settings.max_file_size)
+            except UploadTooLarge:
+                return error_response(f"{upload.filename}: larger than {settings.max_file_size} bytes", 413)
+            photos.append({
+                'report_id': report_id, 'original_name': upload.filename, 'unique_name': unique_name,
+                'file_size': file_size, 'content_type': upload.mimetype,
+                'label': labels[index] if index < len(labels) and labels[index] else None,
+                'uploaded_by': uploaded_by, **paths,
+            })
+
+        jobs = [tuple(settings.upload_path / photo[key] for key in ('file_path', 'thumbnail_path', 'web_path'))
+                for photo in photos]
+        written.extend(path for job in jobs for path in job[1:])
+        for photo, job, error in zip(photos, jobs, render_variants(settings, jobs)):
+            if error is not None:
+                return error_response(f"{photo['original_name']}: not a readable image", 400)
+            photo['thumbnail_size'] = os.path.getsize(job[1])
+            photo['web_size'] = os.path.getsize(job[2])
+
+        columns = [column for column in PHOTO_COLUMNS if column in photos[0]]
+        try:
+            with pool.connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(
+                    f"INSERT INTO report_photos ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    [[photo[column] for column in columns] for photo in photos])
+                cursor.execute(
+                    f"SELECT {', '.join(PHOTO_COLUMNS)} FROM report_photos WHERE report_id = ? AND unique_name IN "
+                    f"({', '.join('?' * len(photos))}) ORDER BY id",
+                    [report_id] + [photo['unique_name'] for photo in photos])
+                stored = fetch_dicts(cursor)
+        except Exception as e:
+            if type(e).__name__ == 'IntegrityError':  # sqlite3 and pyodbc both use this name
+                return error_response(f"Invalid value: {e}", 400)
+            raise
+        written = []
+    finally:
+        # Anything still listed belongs to a rejected upload
+        remove_quietly(*written)
+    return jsonify({'photos': [with_urls(photo) for photo in stored]}), 201
+
+
+@uploads_bp.route('/uploads/<path:filename>', methods=['GET'])
+def serve_upload(filename):
+    """Stored originals and variants; names are unique, so clients may cache them for good."""
+    return send_from_directory(current_app.extensions['file_storage'].upload_path, filename,
+                               max_age=STATIC_MAX_AGE)
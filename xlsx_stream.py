@@ -0,0 +1,220 @@
+"""
+Streaming XLSX Writer
+
+Writes an .xlsx workbook as a sequence of byte chunks while its rows are still being produced,
+so an export can start downloading at once and never holds the workbook in memory. openpyxl's
+write-only mode keeps memory flat too, but it can only hand the file over after save(); here
+each worksheet is written straight into a zip stream (zipfile supports unseekable outputs with
+data descriptors) and the bytes are yielded as they are compressed.
+
+Cells hold numbers, booleans, dates/datetimes (as Excel serials with a date format) and inline
+strings; there is no shared-strings table, which would need every string before the first row.
+"""
+
+import io
+import re
+import zipfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+# Bytes buffered before a chunk is yielded
+CHUNK_SIZE = 64 * 1024
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Style indexes in STYLES_XML: 0 general, 1 header (bold, grey fill), 2 date, 3 date-time
+HEADER_STYLE = 1
+DATE_STYLE = 2
+DATETIME_STYLE = 3
+
+# Characters XML 1.0 cannot carry
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>'
+)
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2"><numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="3"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFD9D9D9"/></patternFill></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+SHEET_OPEN_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable file object that collects what zipfile writes until it is drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._size = 0
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._size += len(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def pending(self):
+        return self._size
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks, self._size = [], 0
+        return data
+
+
+def column_letter(index):
+    """0 -> 'A', 26 -> 'AA'."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def excel_serial(value):
+    """A date or datetime as an Excel serial day number."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    delta = value.replace(tzinfo=None) - EXCEL_EPOCH
+    return delta.days + delta.seconds / 86400 + delta.microseconds / 86400e6
+
+
+def cell_xml(reference, value, style=0):
+    """One <c> element, or '' for an empty cell."""
+    style_attr = f' s="{style}"' if style else ''
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{reference}" t="b"{style_attr}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c r="{reference}"{style_attr}><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        return f'<c r="{reference}" s="{style or DATETIME_STYLE}"><v>{excel_serial(value)!r}</v></c>'
+    if isinstance(value, date):
+        return f'<c r="{reference}" s="{style or DATE_STYLE}"><v>{excel_serial(value)}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+    return f'<c r="{reference}" t="inlineStr"{style_attr}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def sheet_xml(header, rows, column_widths=None):
+    """
+    Yields the XML of one worksheet piece by piece.
+
+    Args:
+        header (list[str] | None): Bold first row, frozen when scrolling.
+        rows: Iterable of row sequences.
+        column_widths (list[float] | None): Width per column, in characters.
+    """
+    yield SHEET_OPEN_XML
+    if header:
+        yield ('<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+               'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>')
+    if column_widths:
+        yield '<cols>' + ''.join(
+            f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+            for i, width in enumerate(column_widths, start=1)) + '</cols>'
+    yield '<sheetData>'
+    letters = [column_letter(i) for i in range(len(header or ()))]
+    row_num = 0
+    if header:
+        row_num = 1
+        yield '<row r="1">' + ''.join(
+            cell_xml(f'{letters[i]}1', value, HEADER_STYLE) for i, value in enumerate(header)) + '</row>'
+    for row in rows:
+        row_num += 1
+        while len(letters) < len(row):
+            letters.append(column_letter(len(letters)))
+        yield f'<row r="{row_num}">' + ''.join(
+            cell_xml(f'{letters[i]}{row_num}', value) for i, value in enumerate(row)) + '</row>'
+    yield '</sheetData></worksheet>'
+
+
+def stream_xlsx(sheets, chunk_size=CHUNK_SIZE):
+    """
+    Yields the bytes of an .xlsx workbook.
+
+    Args:
+        sheets: Iterable of (name, header, rows) or (name, header, rows, column_widths). Each
+            sheet's rows are consumed lazily while it is written, in order.
+        chunk_size (int): Bytes gathered before each yield.
+    """
+    sink = _ChunkSink()
+    names = []
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for sheet in sheets:
+            name, header, rows = sheet[:3]
+            column_widths = sheet[3] if len(sheet) > 3 else None
+            names.append(name)
+            part = archive.open(f'xl/worksheets/sheet{len(names)}.xml', 'w', force_zip64=True)
+            with part:
+                for piece in sheet_xml(header, rows, column_widths):
+                    part.write(piece.encode('utf-8'))
+                    if sink.pending() >= chunk_size:
+                        yield sink.drain()
+        if not names:
+            raise ValueError("A workbook needs at least one sheet")
+
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(sheets=''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, len(names) + 1))))
+        archive.writestr('_rels/.rels', ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(f'<sheet name="{escape(name[:31], {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, name in enumerate(names, start=1))
+            + '</sheets></workbook>'))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join('<Relationship Id="rId{0}" '
+                      'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      'Target="worksheets/sheet{0}.xml"/>'.format(i) for i in range(1, len(names) + 1))
+            + '<Relationship Id="rId{0}" '
+              'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+              'Target="styles.xml"/></Relationships>'.format(len(names) + 1)))
+        archive.writestr('xl/styles.xml', STYLES_XML)
+    yield sink.drain()